@@ -5,11 +5,14 @@ Cleans addresses, validates data, and adds context before geocoding
 """
 
 import pandas as pd
-import json
 import os
 from typing import Dict, List, Optional
 import anthropic  # pip install anthropic
 
+from ai_batch import (DEFAULT_CACHE_PATH, BatchEnricher, BatchTask, FakeClient, JsonlCheckpoint, ResponseCache,
+                      parse_json_response)
+from school_data import canonical_school_columns
+
 # ============================================================================
 # CONFIGURATION
 # ============================================================================
@@ -21,6 +24,14 @@ ANTHROPIC_API_KEY = os.environ.get("ANTHROPIC_API_KEY", "")
 # Model to use
 MODEL = "claude-3-5-sonnet-20241022"
 
+# Batched mode: records per prompt, concurrent requests, response cache file
+BATCH_SIZE = 10
+CONCURRENCY = 4
+RESPONSE_CACHE = DEFAULT_CACHE_PATH
+
+# Append-only progress log shared by both enrichment passes; delete it to start over
+CHECKPOINT_PATH = "ai_enrichment_checkpoint.jsonl"
+
 # ============================================================================
 # AI ENRICHMENT FUNCTIONS
 # ============================================================================
@@ -63,65 +74,132 @@ Return ONLY valid JSON (no markdown):
             messages=[{"role": "user", "content": prompt}]
         )
         
-        response_text = message.content[0].text.strip()
-        
-        # Remove markdown code blocks if present
-        if response_text.startswith("```"):
-            response_text = response_text.split("```")[1]
-            if response_text.startswith("json"):
-                response_text = response_text[4:]
-        
-        result = json.loads(response_text)
-        return result
+        # Tolerates a markdown code block around the JSON
+        return parse_json_response(message.content[0].text)
         
     except Exception as e:
         print(f"  ⚠ AI enrichment failed for {row.get('Institution Name', 'unknown')[:40]}: {e}")
-        return {
-            "cleaned_address": row.get('Address', ''),
-            "city": row.get('City', ''),
-            "state": row.get('State', ''),
-            "zip": None,
-            "confidence": "failed",
-            "corrections_made": [],
-            "needs_review": True
-        }
+        return address_fallback(row)
 
 
-def batch_enrich_addresses(df: pd.DataFrame, 
-                          batch_size: int = 10,
-                          save_every: int = 50) -> pd.DataFrame:
+def address_fallback(row) -> Dict:
+    """Original values, flagged for review, when the AI could not answer"""
+    return {
+        "cleaned_address": row.get('Address', ''),
+        "city": row.get('City', ''),
+        "state": row.get('State', ''),
+        "zip": None,
+        "confidence": "failed",
+        "corrections_made": [],
+        "needs_review": True
+    }
+
+
+ADDRESS_TASK = BatchTask(
+    name="address",
+    fields=["Institution Name", "Address", "City", "State"],
+    instructions="""Validate and standardize the address of each trade school record below.
+
+Tasks for each record:
+1. Identify any obvious errors or inconsistencies
+2. Standardize to USPS format (abbreviations, capitalization)
+3. Fill in missing city/state if you can infer from address
+4. Extract ZIP code if present""",
+    schema={
+        "cleaned_address": "street address in USPS format",
+        "city": "city name",
+        "state": "two-letter state code",
+        "zip": "ZIP code or null",
+        "confidence": "high|medium|low",
+        "corrections_made": ["list of changes made"],
+        "needs_review": False
+    },
+    fallback=address_fallback,
+    max_tokens_per_record=250
+)
+
+
+def fake_address_responder(record: Dict) -> Dict:
+    """Offline stand-in answer for FakeClient: echoes the record, uppercasing the state"""
+    return {
+        "cleaned_address": record.get("Address") or "",
+        "city": record.get("City") or "",
+        "state": str(record.get("State") or "").upper(),
+        "zip": None,
+        "confidence": "high" if record.get("Address") else "low",
+        "corrections_made": [],
+        "needs_review": not record.get("Address")
+    }
+
+
+def run_batched_task(df: pd.DataFrame, task: BatchTask, client,
+                     batch_size: int = BATCH_SIZE,
+                     concurrency: int = CONCURRENCY,
+                     cache_path: str = RESPONSE_CACHE,
+                     checkpoint_path: str = CHECKPOINT_PATH,
+                     report_every: int = 50) -> List[Dict]:
     """
-    Enrich all addresses with AI validation
-    Saves progress periodically
+    One result per row for `task`, resuming from the checkpoint and the response
+    cache; only records with no stored answer are sent
     """
+    cache = ResponseCache(cache_path)
+    checkpoint = JsonlCheckpoint(checkpoint_path)
+    enricher = BatchEnricher(client, task, MODEL, batch_size=batch_size, concurrency=concurrency,
+                             cache=cache, checkpoint=checkpoint)
+    
+    def progress(done: int, total: int):
+        if done % report_every < batch_size or done == total:
+            print(f"  Progress: {done}/{total} remaining records ({done / total * 100:.1f}%)")
+    
+    try:
+        results = enricher.run(df.to_dict('records'), progress=progress)
+    finally:
+        cache.close()
     
+    stats = enricher.stats
+    print(f"  ✓ {stats['resumed']} resumed from {checkpoint_path} | {stats['cached']} from cache"
+          f" | {stats['requests']} requests | {stats['failed']} failed | {stats['empty']} empty")
+    return results
+
+
+def _api_client(client):
+    """The given client, or an Anthropic client from ANTHROPIC_API_KEY (None if unset)"""
+    if client is not None:
+        return client
     if not ANTHROPIC_API_KEY:
         print("❌ ERROR: ANTHROPIC_API_KEY not set")
         print("   Set it with: export ANTHROPIC_API_KEY=your_key_here")
-        return df
+        return None
+    return anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
+
+
+def batch_enrich_addresses(df: pd.DataFrame, 
+                          batch_size: int = BATCH_SIZE,
+                          save_every: int = 50,
+                          concurrency: int = CONCURRENCY,
+                          client=None,
+                          cache_path: str = RESPONSE_CACHE,
+                          checkpoint_path: str = CHECKPOINT_PATH) -> pd.DataFrame:
+    """
+    Enrich all addresses with AI validation
+    Packs batch_size records into each prompt, runs up to `concurrency` requests
+    at once and caches answers by record content, so unchanged records are never
+    re-sent. Every answered batch is appended to the checkpoint, so an interrupted
+    run resumes where it stopped. Pass a client (e.g. ai_batch.FakeClient) to
+    bypass the API key.
+    """
     
-    client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
+    client = _api_client(client)
+    if client is None:
+        return df
     
     print(f"\n🤖 AI Address Enrichment")
     print(f"   Processing {len(df)} addresses...")
-    print(f"   Model: {MODEL}")
+    print(f"   Model: {MODEL} | {batch_size} records/request | {concurrency} concurrent")
     
-    enriched_data = []
-    
-    for idx, row in df.iterrows():
-        # Enrich this row
-        result = clean_address_with_ai(row, client)
-        enriched_data.append(result)
-        
-        # Progress
-        if (idx + 1) % 10 == 0:
-            print(f"  Progress: {idx+1}/{len(df)} ({((idx+1)/len(df)*100):.1f}%)")
-        
-        # Periodic save
-        if (idx + 1) % save_every == 0:
-            temp_df = pd.DataFrame(enriched_data)
-            temp_df.to_csv("ai_enrichment_progress.csv", index=False)
-            print(f"  💾 Progress saved ({idx+1} records)")
+    enriched_data = run_batched_task(df, ADDRESS_TASK, client, batch_size=batch_size, concurrency=concurrency,
+                                     cache_path=cache_path, checkpoint_path=checkpoint_path,
+                                     report_every=save_every)
     
     # Create enriched dataframe
     enriched_df = pd.DataFrame(enriched_data)
@@ -146,8 +224,9 @@ def batch_enrich_addresses(df: pd.DataFrame,
     
     if needs_review > 0:
         print(f"\n⚠  {needs_review} records need manual review")
+        review_columns = ['Institution Name', 'Address', 'ai_cleaned_address', 'ai_confidence']
         review_df = result_df[result_df['ai_needs_review'] == True][
-            ['Institution Name', 'Address', 'ai_cleaned_address', 'ai_confidence']
+            [c for c in review_columns if c in result_df.columns]
         ]
         review_df.to_csv("addresses_needing_review.csv", index=False)
         print(f"   Saved to: addresses_needing_review.csv")
@@ -184,32 +263,86 @@ Provide educated estimates as JSON:
             messages=[{"role": "user", "content": prompt}]
         )
         
-        response_text = message.content[0].text.strip()
-        if response_text.startswith("```"):
-            response_text = response_text.split("```")[1]
-            if response_text.startswith("json"):
-                response_text = response_text[4:]
-        
-        return json.loads(response_text)
+        return parse_json_response(message.content[0].text)
         
     except Exception as e:
-        return {
-            "institution_type": "unknown",
-            "estimated_annual_enrollment": None,
-            "estimated_seats_per_program": None,
-            "likely_accreditation": [],
-            "confidence": "failed",
-            "reasoning": str(e)
-        }
+        return institution_fallback(row, str(e))
+
+
+def institution_fallback(row, reason: str = "no answer") -> Dict:
+    return {
+        "institution_type": "unknown",
+        "estimated_annual_enrollment": None,
+        "estimated_seats_per_program": None,
+        "likely_accreditation": [],
+        "confidence": "failed",
+        "reasoning": reason
+    }
+
+
+INSTITUTION_TASK = BatchTask(
+    name="institution_type",
+    fields=["Institution Name", "Program_Count", "State"],
+    instructions="""Based on the trade school information below (Program_Count is the number of
+programs offered), provide educated estimates for each record.""",
+    schema={
+        "institution_type": "community_college|technical_institute|career_center|apprenticeship|private_vocational",
+        "estimated_annual_enrollment": "number (typical for this type)",
+        "estimated_seats_per_program": "number",
+        "likely_accreditation": ["list of likely accreditors"],
+        "confidence": "high|medium|low",
+        "reasoning": "brief explanation"
+    },
+    fallback=institution_fallback,
+    max_tokens_per_record=200
+)
+
+
+def fake_institution_responder(record: Dict) -> Dict:
+    """Offline stand-in answer for FakeClient, derived from the name and program count"""
+    name = str(record.get("Institution Name") or "").lower()
+    kind = "community_college" if "community" in name else "technical_institute" if "tech" in name \
+        else "career_center"
+    programs = int(record.get("Program_Count") or 0)
+    return {
+        "institution_type": kind,
+        "estimated_annual_enrollment": 500 + 150 * programs,
+        "estimated_seats_per_program": 20,
+        "likely_accreditation": [],
+        "confidence": "low",
+        "reasoning": "offline estimate"
+    }
+
+
+def fake_responder(record: Dict) -> Dict:
+    """One FakeClient for both passes: address records carry an Address field"""
+    return fake_address_responder(record) if "Address" in record else fake_institution_responder(record)
+
+
+def batch_infer_institution_types(df: pd.DataFrame, client=None, **kwargs) -> pd.DataFrame:
+    """
+    infer_institution_type over every row in batches, sharing the address pass's
+    checkpoint and response cache; adds ai_institution_type, ai_estimated_* ...
+    """
+    client = _api_client(client)
+    if client is None:
+        return df
+    
+    print(f"\n🏫 AI Institution Profiles")
+    print(f"   Processing {len(df)} institutions...")
+    profiles = pd.DataFrame(run_batched_task(df, INSTITUTION_TASK, client, **kwargs))
+    profiles = profiles.rename(columns={"confidence": "type_confidence", "reasoning": "type_reasoning"})
+    return pd.concat([df.reset_index(drop=True), profiles.add_prefix('ai_')], axis=1)
 
 
 # ============================================================================
 # MAIN WORKFLOW
 # ============================================================================
 
-def run_ai_enrichment(input_csv: str, output_csv: str = "trade_schools_ai_enriched.csv"):
+def run_ai_enrichment(input_csv: str, output_csv: str = "trade_schools_ai_enriched.csv",
+                      limit: Optional[int] = None, client=None, fake: bool = False):
     """
-    Run complete AI enrichment pipeline
+    Run complete AI enrichment pipeline (all records unless `limit` is given)
     """
     
     print("="*70)
@@ -220,15 +353,23 @@ def run_ai_enrichment(input_csv: str, output_csv: str = "trade_schools_ai_enrich
     
     # Load data
     print("\n1. Loading data...")
-    df = pd.read_csv(input_csv)
-    print(f"   Loaded {len(df)} records")
+    # Raw, curated (snake_case) or geocoded CSV: add the canonical Institution Name /
+    # Address / City / State / Program_Count columns the prompts and cache keys read
+    df = canonical_school_columns(pd.read_csv(input_csv))
     
     # Address cleaning
     print("\n2. AI address validation and cleaning...")
-    df_enriched = batch_enrich_addresses(df.head(100))  # Start with first 100
+    if limit:
+        df = df.head(limit)
+    client = FakeClient(fake_responder) if fake else client
+    df_enriched = batch_enrich_addresses(df, client=client)
+    
+    # Institution type / capacity estimates (same checkpoint, so reruns skip finished records)
+    print("\n3. AI institution type and capacity estimates...")
+    df_enriched = batch_infer_institution_types(df_enriched, client=client)
     
     # Save results
-    print(f"\n3. Saving enriched data to {output_csv}...")
+    print(f"\n4. Saving enriched data to {output_csv}...")
     df_enriched.to_csv(output_csv, index=False)
     
     print("\n✅ AI Enrichment Complete!")
@@ -240,6 +381,8 @@ def run_ai_enrichment(input_csv: str, output_csv: str = "trade_schools_ai_enrich
     print("  - ai_confidence: Quality score (high/medium/low)")
     print("  - ai_corrections_made: List of corrections")
     print("  - ai_needs_review: Flag for manual review")
+    print("  - ai_institution_type, ai_estimated_annual_enrollment, ai_estimated_seats_per_program,")
+    print("    ai_likely_accreditation, ai_type_confidence, ai_type_reasoning: Institution profile")
     
     print("\n💡 Next Steps:")
     print("  1. Review addresses_needing_review.csv if it exists")
@@ -252,8 +395,13 @@ def run_ai_enrichment(input_csv: str, output_csv: str = "trade_schools_ai_enrich
 if __name__ == "__main__":
     import sys
     
+    # --fake answers locally (no API key, no network); --limit N processes the first N records
+    fake = "--fake" in sys.argv
+    limit = int(sys.argv[sys.argv.index("--limit") + 1]) if "--limit" in sys.argv else None
+    args = [a for a in sys.argv[1:] if not a.startswith("--") and a != str(limit)]
+    
     # Check for API key
-    if not ANTHROPIC_API_KEY:
+    if not ANTHROPIC_API_KEY and not fake:
         print("\n❌ ERROR: ANTHROPIC_API_KEY environment variable not set")
         print("\nTo use this script:")
         print("  1. Get an API key from https://console.anthropic.com")
@@ -265,15 +413,14 @@ if __name__ == "__main__":
     input_file = "trade_schools_curated.csv"
     
     # Override from command line if provided
-    if len(sys.argv) > 1:
-        input_file = sys.argv[1]
+    if args:
+        input_file = args[0]
     
     # Check file exists
     if not os.path.exists(input_file):
         print(f"\n❌ ERROR: File not found: {input_file}")
-        print("\nUsage: python ai-data-enrichment.py [input_file.csv]")
+        print("\nUsage: python ai-data-enrichment.py [input_file.csv] [--limit N] [--fake]")
         sys.exit(1)
     
     # Run enrichment
-    run_ai_enrichment(input_file)
-
+    run_ai_enrichment(input_file, limit=limit, fake=fake)
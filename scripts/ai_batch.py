@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Batched, concurrent LLM enrichment with a content-addressed response cache.
+
+Many records are packed into one prompt, and several of those prompts are sent
+at once with a configurable concurrency limit. Each record's answer is stored
+under a SHA-256 of the task, model and the record's own fields, so unchanged
+records are never re-sent. The client is anything with an Anthropic-style
+messages.create(); FakeClient answers locally for offline runs.
+
+Progress is also appended, batch by batch, to a JSONL checkpoint (one line per
+answered record, tagged with task and record key); a restarted run loads it and
+skips every record already done. Several tasks can share one checkpoint file.
+
+Usage:
+  enricher = BatchEnricher(client, ADDRESS_TASK, MODEL, batch_size=10, concurrency=4,
+                           cache=ResponseCache(), checkpoint=JsonlCheckpoint("progress.jsonl"))
+  results = enricher.run(records)     # one result dict per record, in order
+"""
+
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Sequence
+
+
+DEFAULT_CACHE_PATH = "enrichment_cache.sqlite"
+
+
+@dataclass
+class BatchTask:
+    """What to ask about each record, and what to return when the model can't answer"""
+    name: str
+    fields: Sequence[str]
+    instructions: str
+    schema: Dict
+    fallback: Callable[[Dict], Dict]
+    max_tokens_per_record: int = 300
+    version: str = "1"
+
+
+def clean_value(value):
+    """JSON-safe record value: NaN/None -> None, numpy scalars -> Python"""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+def record_fields(task: BatchTask, record: Dict) -> Dict:
+    return {f: clean_value(record.get(f)) for f in task.fields}
+
+
+def is_empty_record(task: BatchTask, record: Dict) -> bool:
+    """True when none of the task's fields has a value (nothing to ask, nothing to key on)"""
+    return all(v is None or v == "" for v in record_fields(task, record).values())
+
+
+def record_key(task: BatchTask, model: str, record: Dict) -> str:
+    """Content address of one record's request"""
+    payload = {"task": task.name, "version": task.version, "model": model, "fields": record_fields(task, record)}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def parse_json_response(text: str):
+    """JSON from a model reply, tolerating a ```json fenced block"""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("```")[1]
+        if text.startswith("json"):
+            text = text[4:]
+    return json.loads(text)
+
+
+def build_batch_prompt(task: BatchTask, batch: List[Dict]) -> str:
+    records = "\n".join(json.dumps({"id": i, **fields}, default=str) for i, fields in enumerate(batch))
+    schema = json.dumps({"id": 0, **task.schema}, indent=2)
+    return f"""{task.instructions}
+
+Records (one JSON object per line):
+{records}
+
+Return ONLY a valid JSON array (no markdown) with exactly one object per record,
+in any order, each carrying the record's "id":
+[{schema}]"""
+
+
+# ============================================================================
+# RESPONSE CACHE
+# ============================================================================
+
+class ResponseCache:
+    """Record key -> parsed response, in one SQLite table (WAL)"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, task TEXT NOT NULL, response TEXT NOT NULL, created_at TEXT NOT NULL)"
+        )
+        self.conn.commit()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Dict]:
+        found = {}
+        unique = list(dict.fromkeys(keys))
+        with self._lock:
+            for start in range(0, len(unique), 500):
+                chunk = unique[start:start + 500]
+                rows = self.conn.execute(
+                    f"SELECT key, response FROM responses WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                )
+                found.update((k, json.loads(r)) for k, r in rows)
+        return found
+
+    def put_many(self, task: str, items: Dict[str, Dict]):
+        stamp = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO responses (key, task, response, created_at) VALUES (?, ?, ?, ?)",
+                [(k, task, json.dumps(v), stamp) for k, v in items.items()]
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+
+# ============================================================================
+# CHECKPOINT
+# ============================================================================
+
+class JsonlCheckpoint:
+    """
+    Append-only {"task", "key", "result"} lines. Each batch costs one append, so
+    total checkpoint I/O is linear in the number of records; a torn last line
+    from an interrupted write is ignored on load.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._done: Dict[str, Dict[str, Dict]] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, "rb+") as f:
+                data = f.read()
+                # Drop a torn last line so the next append starts on a fresh line
+                complete = data.rfind(b"\n") + 1
+                if complete < len(data):
+                    f.truncate(complete)
+            for line in data[:complete].decode("utf-8").splitlines():
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                self._done.setdefault(entry["task"], {})[entry["key"]] = entry["result"]
+
+    def done(self, task: str) -> Dict[str, Dict]:
+        """key -> result for every record of `task` already checkpointed"""
+        return self._done.get(task, {})
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self._done.values())
+
+    def append(self, task: str, items: Dict[str, Dict]):
+        lines = "".join(json.dumps({"task": task, "key": k, "result": v}, default=str) + "\n"
+                        for k, v in items.items())
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+            self._done.setdefault(task, {}).update(items)
+
+
+# ============================================================================
+# BATCH ENRICHER
+# ============================================================================
+
+class BatchEnricher:
+    """Send uncached records in batches of `batch_size`, up to `concurrency` requests at once"""
+
+    def __init__(self, client, task: BatchTask, model: str, batch_size: int = 10, concurrency: int = 4,
+                 cache: Optional[ResponseCache] = None, checkpoint: Optional[JsonlCheckpoint] = None,
+                 temperature: float = 0):
+        self.client = client
+        self.task = task
+        self.model = model
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.cache = cache
+        self.checkpoint = checkpoint
+        self.temperature = temperature
+        self.stats = {"records": 0, "empty": 0, "resumed": 0, "cached": 0, "requests": 0, "failed": 0}
+
+    def _request(self, batch: List[Dict]) -> Dict[int, Dict]:
+        """One API call for a batch; returns {position: result} for the records it answered"""
+        message = self.client.messages.create(
+            model=self.model,
+            max_tokens=self.task.max_tokens_per_record * len(batch) + 100,
+            temperature=self.temperature,
+            messages=[{"role": "user", "content": build_batch_prompt(self.task, batch)}]
+        )
+        answers = parse_json_response(message.content[0].text)
+        if isinstance(answers, dict):
+            answers = [answers]
+        out = {}
+        for answer in answers:
+            position = answer.pop("id", None) if isinstance(answer, dict) else None
+            if isinstance(position, int) and 0 <= position < len(batch):
+                out[position] = answer
+        return out
+
+    def _send(self, batch_keys: List[str], batch: List[Dict]) -> Dict[str, Dict]:
+        try:
+            answered = self._request(batch)
+        except Exception as e:
+            print(f"  ⚠ Batch of {len(batch)} failed: {e}")
+            answered = {}
+        # Records the model skipped in a multi-record batch get one more try on their own
+        missing = [i for i in range(len(batch)) if i not in answered]
+        if missing and len(batch) > 1:
+            for i in missing:
+                try:
+                    single = self._request([batch[i]])
+                    if 0 in single:
+                        answered[i] = single[0]
+                except Exception as e:
+                    print(f"  ⚠ Record retry failed: {e}")
+        return {batch_keys[i]: answer for i, answer in answered.items()}
+
+    def run(self, records: Sequence[Dict], progress: Optional[Callable[[int, int], None]] = None) -> List[Dict]:
+        """
+        One result per record, in input order (task.fallback for records that failed).
+        Records with every task field empty would all share one content key, so they
+        are never deduplicated or sent: each gets task.fallback. If no record has any
+        field, the input does not match the task and ValueError is raised.
+        """
+        empty = [is_empty_record(self.task, r) for r in records]
+        if records and all(empty):
+            raise ValueError(f"{self.task.name}: no record has any of the fields {list(self.task.fields)}")
+        keys = [None if e else record_key(self.task, self.model, r) for r, e in zip(records, empty)]
+        self.stats["records"] += len(records)
+        self.stats["empty"] += sum(empty)
+
+        # Resume from the checkpoint first, then the response cache
+        done = self.checkpoint.done(self.task.name) if self.checkpoint is not None else {}
+        results = {k: done[k] for k in keys if k in done}
+        self.stats["resumed"] += sum(1 for k in keys if k in results)
+        if self.cache is not None:
+            cached = self.cache.get_many([k for k in keys if k is not None and k not in results])
+            self.stats["cached"] += sum(1 for k in keys if k in cached)
+            results.update(cached)
+            if self.checkpoint is not None and cached:
+                self.checkpoint.append(self.task.name, cached)
+
+        pending = {}
+        for key, record in zip(keys, records):
+            if key is not None and key not in results:
+                pending.setdefault(key, record_fields(self.task, record))
+        pending_keys = list(pending)
+        batches = [pending_keys[i:i + self.batch_size] for i in range(0, len(pending_keys), self.batch_size)]
+
+        sent = 0
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            futures = [pool.submit(self._send, b, [pending[k] for k in b]) for b in batches]
+            self.stats["requests"] += len(futures)
+            for future in as_completed(futures):
+                answered = future.result()
+                if answered:
+                    if self.cache is not None:
+                        self.cache.put_many(self.task.name, answered)
+                    if self.checkpoint is not None:
+                        self.checkpoint.append(self.task.name, answered)
+                results.update(answered)
+                sent += self.batch_size
+                if progress:
+                    progress(min(sent, len(pending_keys)), len(pending_keys))
+
+        out = []
+        for key, record in zip(keys, records):
+            if key in results:
+                out.append(dict(results[key]))
+            elif key is None:
+                out.append(self.task.fallback(record))
+            else:
+                self.stats["failed"] += 1
+                out.append(self.task.fallback(record))
+        return out
+
+
+# ============================================================================
+# FAKE CLIENT
+# ============================================================================
+
+class _FakeText:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class _FakeMessage:
+    def __init__(self, text: str):
+        self.content = [_FakeText(text)]
+
+
+class FakeClient:
+    """
+    Local stand-in for anthropic.Anthropic: parses the records out of a batch
+    prompt and answers each one with responder(record_fields). Counts calls.
+    """
+
+    def __init__(self, responder: Callable[[Dict], Dict], drop_every: int = 0):
+        self.responder = responder
+        self.drop_every = drop_every
+        self.calls = 0
+        self.records_seen = 0
+        self.messages = self
+        self._lock = threading.Lock()
+
+    def create(self, model: str, max_tokens: int, messages: List[Dict], temperature: float = 0, **kwargs):
+        with self._lock:
+            self.calls += 1
+        prompt = messages[-1]["content"]
+        section = prompt.split("Records (one JSON object per line):\n", 1)[1].split("\n\n", 1)[0]
+        answers = []
+        for line in section.splitlines():
+            record = json.loads(line)
+            with self._lock:
+                self.records_seen += 1
+                seen = self.records_seen
+            if self.drop_every and seen % self.drop_every == 0:
+                continue
+            answers.append({"id": record.pop("id"), **self.responder(record)})
+        return _FakeMessage(json.dumps(answers))
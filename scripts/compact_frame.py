@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Compact in-memory representation of the cleaned trade school frame.
+
+ - State / City become pandas categoricals
+ - Program_List becomes integer program codes in CSR form
+   (offsets[i]:offsets[i + 1] slices one flat code array)
+ - contact quality flags become nullable booleans
+
+The exploded school x program matchmaking table is built from the codes, so
+program names are never copied once per (school, program) pair.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+QUALITY_FLAGS = {
+    "Has_Email": "Contact Email",
+    "Has_Website": "Website",
+    "Has_Contact_Name": "Contact Name",
+}
+CATEGORICAL_COLUMNS = ["State", "City"]
+
+
+@dataclass
+class ProgramLists:
+    """Ragged per-school program lists as offsets into one flat array of program codes"""
+    programs: List[str]
+    offsets: np.ndarray
+    codes: np.ndarray
+
+    @classmethod
+    def from_lists(cls, lists: pd.Series) -> "ProgramLists":
+        """Encode a Series of program-name lists; codes follow first-appearance order"""
+        exploded = lists.reset_index(drop=True).explode().dropna()
+        codes, programs = pd.factorize(exploded)
+        counts = np.bincount(exploded.index.to_numpy(dtype=np.int64), minlength=len(lists))
+        offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        dtype = np.int16 if len(programs) < np.iinfo(np.int16).max else np.int32
+        return cls(programs.tolist(), offsets, codes.astype(dtype))
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def counts(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.offsets.nbytes + self.codes.nbytes + sum(len(p) for p in self.programs))
+
+    def row_ids(self) -> np.ndarray:
+        """School position of every entry in the flat code array"""
+        return np.repeat(np.arange(len(self)), self.counts)
+
+    def to_matrix(self) -> np.ndarray:
+        """Boolean school x program membership matrix"""
+        matrix = np.zeros((len(self), len(self.programs)), dtype=bool)
+        matrix[self.row_ids(), self.codes] = True
+        return matrix
+
+    def to_lists(self) -> List[List[str]]:
+        names = np.asarray(self.programs, dtype=object)
+        return [names[self.codes[a:b]].tolist() for a, b in zip(self.offsets[:-1], self.offsets[1:])]
+
+    def exploded(self):
+        """
+        (row_ids, codes) with one entry per (school, program) pair, matching
+        DataFrame.explode: schools without programs keep one entry with code -1.
+        """
+        counts = self.counts
+        lengths = np.maximum(counts, 1)
+        out_offsets = np.zeros(len(self) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=out_offsets[1:])
+
+        out_codes = np.full(out_offsets[-1], -1, dtype=self.codes.dtype)
+        owner = self.row_ids()
+        within = np.arange(len(self.codes)) - self.offsets[owner]
+        out_codes[out_offsets[owner] + within] = self.codes
+        return np.repeat(np.arange(len(self)), lengths), out_codes
+
+
+@dataclass
+class CompactSchoolFrame:
+    """Cleaned school frame with categorical geography and integer-coded programs"""
+    frame: pd.DataFrame
+    programs: ProgramLists
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "CompactSchoolFrame":
+        frame = df.drop(columns=["Programs", "Program_List", "Program_Array"], errors="ignore").reset_index(drop=True)
+        for col in CATEGORICAL_COLUMNS:
+            if col in frame.columns:
+                frame[col] = frame[col].astype("category")
+        for flag, source in QUALITY_FLAGS.items():
+            if source in frame.columns:
+                frame[flag] = frame[source].notna().astype("boolean")
+        if "Program_Count" in frame.columns:
+            frame["Program_Count"] = pd.to_numeric(frame["Program_Count"], downcast="integer")
+        return cls(frame, ProgramLists.from_lists(df["Program_List"]))
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.frame.memory_usage(deep=True).sum()) + self.programs.nbytes
+
+    def program_column(self) -> pd.Series:
+        """Program_List rebuilt as Python lists (for code that still expects them)"""
+        return pd.Series(self.programs.to_lists(), index=self.frame.index, dtype=object)
+
+    def matchmaking_frame(self, columns: List[str]) -> pd.DataFrame:
+        """
+        School x program table (one row per offered program); equivalent to exploding
+        Program_List. A "program" entry in `columns` places the categorical program column.
+        """
+        rows, codes = self.programs.exploded()
+        school_columns = [c for c in columns if c != "program"]
+        out = self.frame[school_columns].take(rows).reset_index(drop=True)
+        out["program"] = pd.Categorical.from_codes(codes, categories=self.programs.programs)
+        return out[columns if "program" in columns else school_columns + ["program"]]
+
+
+def memory_report(df: pd.DataFrame, compact: CompactSchoolFrame,
+                  matchmaking_columns: Optional[List[str]] = None) -> Dict[str, int]:
+    """Bytes used by the object-based frame versus the compact one (and their matchmaking tables)"""
+    report = {
+        "object_frame_bytes": int(df.memory_usage(deep=True).sum()),
+        "compact_frame_bytes": compact.nbytes,
+    }
+    if matchmaking_columns:
+        school_columns = [c for c in matchmaking_columns if c != "program"]
+        exploded = df.explode("Program_List")[school_columns + ["Program_List"]]
+        report["object_matchmaking_bytes"] = int(exploded.memory_usage(deep=True).sum())
+        report["compact_matchmaking_bytes"] = int(
+            compact.matchmaking_frame(matchmaking_columns).memory_usage(deep=True).sum()
+        )
+    report["saved_bytes"] = sum(v for k, v in report.items() if k.startswith("object_")) - sum(
+        v for k, v in report.items() if k.startswith("compact_")
+    )
+    return report
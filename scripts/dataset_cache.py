@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Content-hashed columnar cache for cleaned DataFrames (NumPy .npz, no pickle).
+
+A cache file is keyed on the SHA-256 of the input file and a cleaning-code
+version, so editing either the data or the cleaning logic (with a version bump)
+invalidates it automatically. Columns are stored column-by-column:
+
+ - string/object columns: factorized int32 codes + distinct values as a UTF-8 blob
+   (plus a per-value type code when str mixes with int / float / bool values;
+   any other object type is rejected rather than silently stringified)
+ - numeric/bool columns: the raw NumPy array
+ - list-of-string columns: CSR offsets + codes (see compact_frame.ProgramLists)
+ - list-of-dict columns (e.g. Contacts): CSR offsets + one coded column per key
+"""
+
+import hashlib
+import json
+import os
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+CACHE_DIRNAME = ".cache"
+
+# Type codes for the distinct values of a mixed object column
+_VALUE_TYPES = (str, int, float, bool)
+
+
+def file_digest(path: str, block_size: int = 1 << 20) -> str:
+    """SHA-256 hex digest of a file, read in blocks"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def cache_path_for(source_path: str, version: str, cache_dir: Optional[str] = None,
+                   digest: Optional[str] = None) -> str:
+    """<cache_dir>/<source stem>.<digest prefix>.v<version>.npz (cache_dir defaults next to the source)"""
+    cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(source_path)), CACHE_DIRNAME)
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    digest = digest or file_digest(source_path)
+    return os.path.join(cache_dir, f"{stem}.{digest[:16]}.v{version}.npz")
+
+
+# ============================================================================
+# COLUMN ENCODING
+# ============================================================================
+
+def _value_type(value) -> int:
+    """Index into _VALUE_TYPES for one distinct value (TypeError for anything else)"""
+    if isinstance(value, str):
+        return 0
+    if isinstance(value, (bool, np.bool_)):
+        return 3
+    if isinstance(value, (int, np.integer)):
+        return 1
+    if isinstance(value, (float, np.floating)):
+        return 2
+    raise TypeError(f"cannot cache {type(value).__name__} values in an object column")
+
+
+def _encode_strings(values: pd.Series, prefix: str, arrays: Dict[str, np.ndarray]):
+    """Factorized int32 codes plus the distinct values as one UTF-8 blob with offsets"""
+    codes, uniques = pd.factorize(values.astype(object), use_na_sentinel=True)
+    types = np.fromiter(map(_value_type, uniques), np.int8, len(uniques))
+    if types.any():
+        # Mixed column: keep each value's type so it round-trips as written. factorize treats
+        # True == 1 == 1.0 as one value, so only one non-str type may appear in a column.
+        if len({_value_type(v) for v in values.dropna()} - {0}) > 1:
+            raise TypeError(f"cannot cache a column mixing {', '.join(sorted({type(v).__name__ for v in values.dropna()}))}")
+        arrays[f"{prefix}:types"] = types
+    encoded = [str(u).encode("utf-8") for u in uniques]
+    arrays[f"{prefix}:codes"] = codes.astype(np.int32)
+    arrays[f"{prefix}:blob"] = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    arrays[f"{prefix}:offsets"] = _offsets(np.fromiter(map(len, encoded), np.int64, len(encoded)))
+
+
+def _decode_strings(arrays, prefix: str) -> np.ndarray:
+    codes = arrays[f"{prefix}:codes"]
+    blob = arrays[f"{prefix}:blob"].tobytes()
+    bounds = arrays[f"{prefix}:offsets"]
+    values = np.empty(len(bounds) - 1, dtype=object)
+    values[:] = [blob[a:b].decode("utf-8") for a, b in zip(bounds[:-1], bounds[1:])]
+    if f"{prefix}:types" in arrays:
+        types = arrays[f"{prefix}:types"]
+        values[:] = [v if t == 0 else _parse_value(v, _VALUE_TYPES[t]) for v, t in zip(values, types)]
+    out = np.empty(len(codes), dtype=object)
+    valid = codes >= 0
+    out[valid] = values[codes[valid]]
+    out[~valid] = None
+    return out
+
+
+def _parse_value(text: str, kind: type):
+    return text == "True" if kind is bool else kind(text)
+
+
+def _offsets(lengths: np.ndarray) -> np.ndarray:
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return offsets
+
+
+def _column_kind(values: pd.Series) -> str:
+    if pd.api.types.is_bool_dtype(values) or pd.api.types.is_numeric_dtype(values):
+        return "numeric"
+    sample = values.dropna()
+    first = sample.iloc[0] if len(sample) else None
+    if isinstance(first, list):
+        nested = next((x for lst in sample for x in lst), None)
+        return "records" if isinstance(nested, dict) else "list"
+    return "string"
+
+
+def encode_frame(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Encode a frame into plain NumPy arrays plus a JSON manifest"""
+    arrays: Dict[str, np.ndarray] = {"__index__": df.index.to_numpy()}
+    columns = []
+    for col in df.columns:
+        values = df[col]
+        kind = _column_kind(values)
+        meta = {"name": col, "kind": kind}
+        prefix = f"col{len(columns)}"
+        if kind == "numeric":
+            meta["dtype"] = str(values.dtype)
+            arrays[prefix] = values.to_numpy()
+        elif kind == "string":
+            _encode_strings(values, prefix, arrays)
+        else:
+            lists = [lst if isinstance(lst, list) else [] for lst in values]
+            arrays[f"{prefix}:offsets"] = _offsets(np.fromiter((len(l) for l in lists), np.int64, len(lists)))
+            flat = [x for lst in lists for x in lst]
+            if kind == "list":
+                _encode_strings(pd.Series(flat, dtype=object), f"{prefix}:items", arrays)
+            else:
+                keys = list(dict.fromkeys(k for rec in flat for k in rec))
+                meta["keys"] = keys
+                for j, key in enumerate(keys):
+                    _encode_strings(pd.Series([rec.get(key) for rec in flat], dtype=object),
+                                    f"{prefix}:key{j}", arrays)
+        columns.append(meta)
+    arrays["__meta__"] = np.asarray(json.dumps({"columns": columns}))
+    return arrays
+
+
+def decode_frame(arrays, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Inverse of encode_frame; with `columns`, only those columns' arrays are read"""
+    meta = json.loads(str(arrays["__meta__"]))
+    wanted = None if columns is None else set(columns)
+    data = {}
+    for i, col in enumerate(meta["columns"]):
+        if wanted is not None and col["name"] not in wanted:
+            continue
+        prefix, kind = f"col{i}", col["kind"]
+        if kind == "numeric":
+            data[col["name"]] = pd.Series(arrays[prefix]).astype(col["dtype"]).to_numpy()
+        elif kind == "string":
+            data[col["name"]] = _decode_strings(arrays, prefix)
+        else:
+            offsets = arrays[f"{prefix}:offsets"]
+            if kind == "list":
+                flat = _decode_strings(arrays, f"{prefix}:items")
+            else:
+                fields = [_decode_strings(arrays, f"{prefix}:key{j}") for j in range(len(col["keys"]))]
+                flat = [dict(zip(col["keys"], vals)) for vals in zip(*fields)] if fields else []
+            data[col["name"]] = [list(flat[a:b]) for a, b in zip(offsets[:-1], offsets[1:])]
+    frame = pd.DataFrame(data, index=pd.Index(arrays["__index__"]))
+    return frame if columns is None else frame[[c for c in columns if c in frame.columns]]
+
+
+# ============================================================================
+# CACHE API
+# ============================================================================
+
+def save_frame(df: pd.DataFrame, path: str):
+    """Write the encoded frame atomically (tmp file + rename)"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, **encode_frame(df))
+    os.replace(tmp, path)
+
+
+def load_frame(path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    # NpzFile reads members lazily, so a column subset only touches its own arrays
+    with np.load(path, allow_pickle=False) as arrays:
+        return decode_frame(arrays, columns)
+
+
+def _remove_stale(source_path: str, path: str):
+    """Drop older cache files for the same source file"""
+    cache_dir = os.path.dirname(path)
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    for name in os.listdir(cache_dir):
+        other = os.path.join(cache_dir, name)
+        if other != path and name.startswith(stem + ".") and name.endswith(".npz"):
+            try:
+                os.remove(other)
+            except OSError:
+                pass
+
+
+def cached_frame(source_path: str, build: Callable[[], pd.DataFrame], version: str,
+                 cache_dir: Optional[str] = None, refresh: bool = False) -> pd.DataFrame:
+    """
+    Return build()'s frame for source_path, from the cache when the source file and
+    version are unchanged. A failed read falls back to rebuilding.
+    """
+    path = cache_path_for(source_path, version, cache_dir)
+    if not refresh and os.path.exists(path):
+        try:
+            return load_frame(path)
+        except Exception as e:
+            print(f"⚠ Could not read cache {path}: {e}")
+
+    df = build()
+    try:
+        save_frame(df, path)
+        _remove_stale(source_path, path)
+    except (OSError, TypeError) as e:
+        print(f"⚠ Could not write cache {path}: {e}")
+    return df
+
+
+def cached_columns(source_path: str, version: str, columns: List[str],
+                   cache_dir: Optional[str] = None) -> Optional[pd.DataFrame]:
+    """Load selected columns from an existing, up-to-date cache (None when there is none)"""
+    if not os.path.exists(source_path):
+        return None
+    path = cache_path_for(source_path, version, cache_dir)
+    if not os.path.exists(path):
+        return None
+    return load_frame(path, columns)
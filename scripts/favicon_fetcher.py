@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Parallel favicon downloader with conditional refreshes.
+
+Domains are fetched on a thread pool through one connection-pooled
+requests.Session, with a cap on concurrent requests per upstream host (all
+icons come from the same favicon service, so that cap is what keeps us polite).
+Each icon's ETag / Last-Modified / SHA-256 is kept in favicon_meta.json next to
+the PNGs; a refresh sends If-None-Match / If-Modified-Since and a 304 leaves the
+file untouched.
+
+Stdlib + requests only, like fetch-favicons.py.
+
+Usage:
+  fetcher = FaviconFetcher(OUTPUT_DIR)
+  stats = fetcher.fetch_all(domains, refresh=True)
+
+  # serial loop vs parallel fetch vs conditional refresh on a local stub server
+  python scripts/favicon_fetcher.py [--domains 300] [--latency 0.05]
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+FAVICON_URL = "https://www.google.com/s2/favicons?domain={domain}&sz=64"
+META_FILENAME = "favicon_meta.json"
+
+
+def favicon_path(output_dir: str, domain: str) -> str:
+    return os.path.join(output_dir, f"{domain}.png")
+
+
+def load_meta(output_dir: str) -> Dict[str, Dict]:
+    path = os.path.join(output_dir, META_FILENAME)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_meta(output_dir: str, meta: Dict[str, Dict]):
+    """Write favicon_meta.json atomically (tmp file + rename)"""
+    path = os.path.join(output_dir, META_FILENAME)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+class FaviconFetcher:
+    """
+    `concurrency` worker threads overall; at most `per_host` requests in flight
+    to any one host (and that many pooled connections per host).
+    """
+
+    def __init__(self, output_dir: str, url_template: str = FAVICON_URL, concurrency: int = 16,
+                 per_host: int = 8, timeout: float = 10.0):
+        self.output_dir = output_dir
+        self.url_template = url_template
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=per_host)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._host_slots = defaultdict(lambda: threading.BoundedSemaphore(self.per_host))
+        self._slots_lock = threading.Lock()
+
+    def close(self):
+        self.session.close()
+
+    def _slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urllib.parse.urlsplit(url).netloc
+        with self._slots_lock:
+            return self._host_slots[host]
+
+    def fetch(self, domain: str, meta: Optional[Dict], refresh: bool) -> Tuple[str, Optional[Dict]]:
+        """
+        Download (or revalidate) one icon. Returns (status, new meta) where status
+        is downloaded | unchanged | skipped | failed.
+        """
+        out_path = favicon_path(self.output_dir, domain)
+        exists = os.path.exists(out_path) and os.path.getsize(out_path) > 0
+        if exists and not refresh:
+            return "skipped", meta
+
+        headers = {}
+        if exists and meta:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        url = self.url_template.format(domain=urllib.parse.quote(domain))
+        try:
+            with self._slot(url):
+                resp = self.session.get(url, headers=headers, timeout=self.timeout)
+        except requests.RequestException:
+            return "failed", meta
+
+        stamp = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        if resp.status_code == 304 and exists:
+            return "unchanged", {**(meta or {}), "checked_at": stamp}
+        if resp.status_code != 200 or not resp.content:
+            return "failed", meta
+
+        digest = hashlib.sha256(resp.content).hexdigest()
+        # Same bytes as before (servers without validators): keep the file as is
+        same = bool(exists and meta and meta.get("sha256") == digest)
+        if not same:
+            tmp = out_path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(resp.content)
+            os.replace(tmp, out_path)
+        return "unchanged" if same else "downloaded", {
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+            "sha256": digest,
+            "bytes": len(resp.content),
+            "checked_at": stamp,
+        }
+
+    def fetch_all(self, domains: Iterable[str], refresh: bool = False) -> Dict[str, int]:
+        """Fetch every domain in parallel; metadata is saved once at the end"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        meta = load_meta(self.output_dir)
+        counts = {"downloaded": 0, "unchanged": 0, "skipped": 0, "failed": 0}
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            futures = {pool.submit(self.fetch, d, meta.get(d), refresh): d for d in domains}
+            for future in as_completed(futures):
+                status, entry = future.result()
+                counts[status] += 1
+                if entry is not None:
+                    meta[futures[future]] = entry
+
+        save_meta(self.output_dir, meta)
+        return counts
+
+
+# ============================================================================
+# LOCAL STUB SERVER
+# ============================================================================
+
+class StubFaviconServer:
+    """
+    Favicon-service stand-in on localhost: GET /s2/favicons?domain=<d> returns a
+    small deterministic PNG-like payload with ETag and Last-Modified, and honours
+    If-None-Match with 304. Tracks the most concurrent requests it saw.
+
+    For tests: `validators=False` drops ETag / Last-Modified (and ignores
+    If-None-Match), domains in `fail_domains` answer 500, and changing
+    `revision` changes every payload.
+    """
+
+    def __init__(self, latency: float = 0.05, validators: bool = True, fail_domains: Iterable[str] = ()):
+        self.latency = latency
+        self.validators = validators
+        self.fail_domains = set(fail_domains)
+        self.revision = ""
+        self.hits = 0
+        self.not_modified = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.last_modified = formatdate(usegmt=True)
+        lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with lock:
+                    stub.hits += 1
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                try:
+                    time.sleep(stub.latency)
+                    domain = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query).get("domain", [""])[0]
+                    # Most sites fall back to one shared default icon
+                    if domain in stub.fail_domains:
+                        self.send_response(500)
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    body = b"\x89PNG-default" if domain.endswith(".edu") else b"\x89PNG-" + domain.encode()
+                    body += stub.revision.encode()
+                    etag = '"%s"' % hashlib.sha1(body).hexdigest()
+                    if stub.validators and self.headers.get("If-None-Match") == etag:
+                        with lock:
+                            stub.not_modified += 1
+                        self.send_response(304)
+                        self.send_header("ETag", etag)
+                        self.end_headers()
+                        return
+                    self.send_response(200)
+                    self.send_header("Content-Type", "image/png")
+                    self.send_header("Content-Length", str(len(body)))
+                    if stub.validators:
+                        self.send_header("ETag", etag)
+                        self.send_header("Last-Modified", stub.last_modified)
+                    self.end_headers()
+                    self.wfile.write(body)
+                finally:
+                    with lock:
+                        stub.in_flight -= 1
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url_template(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}/s2/favicons?domain={{domain}}&sz=64"
+
+    def __enter__(self) -> "StubFaviconServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _serial_baseline(url_template: str, domains, output_dir: str) -> int:
+    """The old loop: one unpooled requests.get per domain plus a 0.05s sleep"""
+    downloaded = 0
+    for domain in domains:
+        try:
+            resp = requests.get(url_template.format(domain=domain), timeout=10)
+            if resp.status_code == 200 and resp.content:
+                with open(favicon_path(output_dir, domain), "wb") as f:
+                    f.write(resp.content)
+                downloaded += 1
+        except Exception:
+            pass
+        time.sleep(0.05)
+    return downloaded
+
+
+def main() -> int:
+    def option(name: str, default: float) -> float:
+        return float(sys.argv[sys.argv.index(name) + 1]) if name in sys.argv else default
+
+    n = int(option("--domains", 300))
+    latency = option("--latency", 0.05)
+    domains = [f"school{i}.{'edu' if i % 3 else 'org'}" for i in range(n)]
+    workdir = tempfile.mkdtemp(prefix="favicons-")
+
+    try:
+        with StubFaviconServer(latency=latency) as stub:
+            print(f"Stub favicon service, {latency * 1000:.0f} ms latency, {n} domains")
+
+            serial_dir = os.path.join(workdir, "serial")
+            os.makedirs(serial_dir)
+            start = time.perf_counter()
+            _serial_baseline(stub.url_template, domains, serial_dir)
+            print(f"  serial loop:          {time.perf_counter() - start:6.2f}s")
+
+            fetcher = FaviconFetcher(os.path.join(workdir, "parallel"), url_template=stub.url_template)
+            start = time.perf_counter()
+            counts = fetcher.fetch_all(domains)
+            print(f"  parallel fetch:       {time.perf_counter() - start:6.2f}s | {counts}"
+                  f" | max in flight {stub.max_in_flight}")
+
+            stub.not_modified = 0
+            start = time.perf_counter()
+            counts = fetcher.fetch_all(domains, refresh=True)
+            print(f"  conditional refresh:  {time.perf_counter() - start:6.2f}s | {counts}"
+                  f" | 304s {stub.not_modified}")
+            fetcher.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Deduplicate downloaded favicons and pack them into sprite sheets.
+
+Every src/assets/favicons/<domain>.png is hashed; identical files (and files
+that decode to identical pixels, e.g. the service's default globe icon) are
+stored once. Unique icons are scaled to one cell size and packed in a grid on a
+few sheet PNGs, and favicon-sprites.json maps each domain to its sheet and
+pixel offset, so a map page loads a handful of images instead of one per marker.
+
+PNG and ICO (PNG or 24/32-bit BMP entries) are decoded with NumPy + zlib; JPEG,
+GIF and WebP icons need Pillow and are otherwise listed under "unpacked" so the
+page keeps loading them individually.
+
+Usage:
+  python scripts/favicon_sprites.py [--cell 32] [--per-sheet 1024]
+"""
+
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+from typing import Dict, List
+
+import numpy as np
+
+try:
+    from PIL import Image  # optional: decodes JPEG/GIF/WebP icons too
+except ImportError:
+    Image = None
+
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+ICON_DIR = os.path.join(REPO_ROOT, "src", "assets", "favicons")
+SPRITE_DIR = os.path.join(REPO_ROOT, "src", "assets", "favicon-sprites")
+INDEX_FILENAME = "favicon-sprites.json"
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+ICO_SIGNATURE = b"\x00\x00\x01\x00"
+CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+
+# ============================================================================
+# PNG / ICO CODEC
+# ============================================================================
+
+def _unfilter(raw: bytes, height: int, stride: int, bpp: int) -> np.ndarray:
+    """Undo PNG per-row filters; returns (height, stride) uint8"""
+    out = np.zeros((height, stride), dtype=np.uint8)
+    prev = np.zeros(stride, dtype=np.int32)
+    pos = 0
+    for y in range(height):
+        ftype = raw[pos]
+        line = np.frombuffer(raw, dtype=np.uint8, count=stride, offset=pos + 1).astype(np.int32)
+        pos += stride + 1
+        if ftype == 0:
+            row = line
+        elif ftype == 1:  # Sub: running sum per channel
+            padded = np.zeros(-(-stride // bpp) * bpp, dtype=np.int32)
+            padded[:stride] = line
+            row = (np.cumsum(padded.reshape(-1, bpp), axis=0) % 256).ravel()[:stride]
+        elif ftype == 2:  # Up
+            row = (line + prev) % 256
+        elif ftype in (3, 4):  # Average / Paeth depend on the reconstructed left byte
+            row = line.tolist()
+            up = prev.tolist()
+            for x in range(stride):
+                left = row[x - bpp] if x >= bpp else 0
+                if ftype == 3:
+                    pred = (left + up[x]) >> 1
+                else:
+                    up_left = up[x - bpp] if x >= bpp else 0
+                    p = left + up[x] - up_left
+                    pa, pb, pc = abs(p - left), abs(p - up[x]), abs(p - up_left)
+                    pred = left if pa <= pb and pa <= pc else up[x] if pb <= pc else up_left
+                row[x] = (row[x] + pred) & 0xFF
+            row = np.asarray(row, dtype=np.int32)
+        else:
+            raise ValueError(f"bad PNG filter type {ftype}")
+        out[y] = row
+        prev = row
+    return out
+
+
+def read_png(data: bytes) -> np.ndarray:
+    """Decode a non-interlaced PNG to (h, w, 4) RGBA uint8"""
+    if not data.startswith(PNG_SIGNATURE):
+        raise ValueError("not a PNG")
+    pos, idat, palette, trns = 8, [], None, None
+    width = height = depth = ctype = None
+    while pos + 8 <= len(data):
+        length, kind = struct.unpack(">I4s", data[pos:pos + 8])
+        body = data[pos + 8:pos + 8 + length]
+        pos += 12 + length
+        if kind == b"IHDR":
+            width, height, depth, ctype, _, _, interlace = struct.unpack(">IIBBBBB", body)
+            if interlace:
+                raise ValueError("interlaced PNG")
+        elif kind == b"PLTE":
+            palette = np.frombuffer(body, dtype=np.uint8).reshape(-1, 3)
+        elif kind == b"tRNS":
+            trns = body
+        elif kind == b"IDAT":
+            idat.append(body)
+        elif kind == b"IEND":
+            break
+    if width is None or ctype not in CHANNELS:
+        raise ValueError("unsupported PNG")
+    if depth != 8 and not (ctype in (0, 3) and depth in (1, 2, 4)):
+        raise ValueError(f"unsupported PNG bit depth {depth}")
+
+    channels = CHANNELS[ctype]
+    stride = (width * channels * depth + 7) // 8
+    rows = _unfilter(zlib.decompress(b"".join(idat)), height, stride, max(1, channels * depth // 8))
+    if depth < 8:
+        bits = np.unpackbits(rows, axis=1).reshape(height, -1, depth)[:, :width]
+        samples = (bits * (1 << np.arange(depth - 1, -1, -1))).sum(axis=2).astype(np.uint8)
+    else:
+        samples = rows.reshape(height, width, channels)
+
+    rgba = np.empty((height, width, 4), dtype=np.uint8)
+    if ctype == 3:
+        if palette is None:
+            raise ValueError("palette PNG without PLTE")
+        index = samples if samples.ndim == 2 else samples[..., 0]
+        alpha = np.full(256, 255, dtype=np.uint8)
+        if trns:
+            alpha[:len(trns)] = np.frombuffer(trns, dtype=np.uint8)
+        full = np.zeros((256, 3), dtype=np.uint8)
+        full[:len(palette)] = palette
+        rgba[..., :3] = full[index]
+        rgba[..., 3] = alpha[index]
+    elif ctype in (0, 4):
+        gray = samples if samples.ndim == 2 else samples[..., 0]
+        if depth < 8:
+            gray = (gray.astype(np.uint16) * 255 // ((1 << depth) - 1)).astype(np.uint8)
+        rgba[..., :3] = gray[..., None]
+        rgba[..., 3] = samples[..., 1] if ctype == 4 else 255
+    else:
+        rgba[..., :channels] = samples
+        if channels == 3:
+            rgba[..., 3] = 255
+    return rgba
+
+
+def write_png(path: str, rgba: np.ndarray):
+    """Encode (h, w, 4) RGBA uint8 as a PNG (filter 0 compresses icon grids best here)"""
+    height, width = rgba.shape[:2]
+    raw = np.zeros((height, width * 4 + 1), dtype=np.uint8)
+    raw[:, 1:] = rgba.reshape(height, -1)
+
+    def chunk(kind: bytes, body: bytes) -> bytes:
+        return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+
+    png = PNG_SIGNATURE + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+    png += chunk(b"IDAT", zlib.compress(raw.tobytes(), 9)) + chunk(b"IEND", b"")
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(png)
+    os.replace(tmp, path)
+
+
+def read_ico(data: bytes) -> np.ndarray:
+    """Largest image of an ICO file (PNG or 24/32-bit BMP entry) as RGBA"""
+    count = struct.unpack("<H", data[4:6])[0]
+    entries = [struct.unpack("<BBBBHHII", data[6 + 16 * i:22 + 16 * i]) for i in range(count)]
+    if not entries:
+        raise ValueError("empty ICO")
+    _, _, _, _, _, _, size, offset = max(entries, key=lambda e: (e[0] or 256) * (e[1] or 256))
+    blob = data[offset:offset + size]
+    if blob.startswith(PNG_SIGNATURE):
+        return read_png(blob)
+
+    header_size, width, height2, _, bits = struct.unpack("<IiiHH", blob[:16])
+    height = height2 // 2
+    if bits not in (24, 32):
+        raise ValueError(f"unsupported ICO bitmap depth {bits}")
+    bpp = bits // 8
+    stride = (width * bpp + 3) & ~3
+    pixels = np.frombuffer(blob, dtype=np.uint8, count=stride * height, offset=header_size)
+    pixels = pixels.reshape(height, stride)[:, :width * bpp].reshape(height, width, bpp)[::-1]
+    rgba = np.empty((height, width, 4), dtype=np.uint8)
+    rgba[..., :3] = pixels[..., 2::-1]
+    if bpp == 4 and pixels[..., 3].any():
+        rgba[..., 3] = pixels[..., 3]
+    else:
+        # 1-bit AND mask follows the color data
+        mask_stride = ((width + 31) // 32) * 4
+        mask = np.frombuffer(blob, dtype=np.uint8, count=mask_stride * height,
+                             offset=header_size + stride * height).reshape(height, mask_stride)
+        transparent = np.unpackbits(mask, axis=1)[:, :width][::-1].astype(bool)
+        rgba[..., 3] = np.where(transparent, 0, 255)
+    return rgba
+
+
+def decode_icon(data: bytes) -> np.ndarray:
+    """RGBA pixels of one downloaded icon; ValueError when it can't be decoded"""
+    if Image is not None:
+        import io
+        try:
+            with Image.open(io.BytesIO(data)) as img:
+                return np.asarray(img.convert("RGBA"))
+        except Exception as e:
+            raise ValueError(str(e))
+    if data.startswith(PNG_SIGNATURE):
+        return read_png(data)
+    if data.startswith(ICO_SIGNATURE):
+        return read_ico(data)
+    raise ValueError("unsupported format (install Pillow for JPEG/GIF/WebP)")
+
+
+def fit_cell(rgba: np.ndarray, cell: int) -> np.ndarray:
+    """Scale to cell x cell: box average for whole-number shrink factors, else nearest neighbour"""
+    h, w = rgba.shape[:2]
+    if (h, w) == (cell, cell):
+        return rgba
+    if h == w and h > cell and h % cell == 0:
+        f = h // cell
+        return rgba.reshape(cell, f, cell, f, 4).mean(axis=(1, 3)).round().astype(np.uint8)
+    ys = (np.arange(cell) * h // cell).clip(0, h - 1)
+    xs = (np.arange(cell) * w // cell).clip(0, w - 1)
+    return rgba[ys][:, xs]
+
+
+# ============================================================================
+# SPRITE PACKING
+# ============================================================================
+
+def build_sprites(icon_dir: str = ICON_DIR, out_dir: str = SPRITE_DIR, cell: int = 32,
+                  per_sheet: int = 1024) -> Dict:
+    """
+    Pack the unique icons of icon_dir into sheets under out_dir and write the
+    domain index. Returns the index (see INDEX_FILENAME).
+    """
+    files = sorted(f for f in os.listdir(icon_dir) if f.endswith(".png"))
+
+    # 1. Identical files collapse by content hash
+    by_digest: Dict[str, List[str]] = {}
+    blobs: Dict[str, bytes] = {}
+    for name in files:
+        with open(os.path.join(icon_dir, name), "rb") as f:
+            data = f.read()
+        if not data:
+            continue
+        digest = hashlib.sha256(data).hexdigest()
+        by_digest.setdefault(digest, []).append(name[:-len(".png")])
+        blobs.setdefault(digest, data)
+
+    # 2. Decode each distinct file once; identical pixels collapse again
+    cells: List[np.ndarray] = []
+    slot_of_pixels: Dict[bytes, int] = {}
+    slot_of_domain: Dict[str, int] = {}
+    unpacked: Dict[str, str] = {}
+    for digest, domains in by_digest.items():
+        try:
+            pixels = fit_cell(decode_icon(blobs[digest]), cell)
+        except (ValueError, struct.error, zlib.error, IndexError):
+            for domain in domains:
+                unpacked[domain] = f"{domain}.png"
+            continue
+        key = hashlib.sha256(pixels.tobytes()).digest()
+        slot = slot_of_pixels.setdefault(key, len(cells))
+        if slot == len(cells):
+            cells.append(pixels)
+        for domain in domains:
+            slot_of_domain[domain] = slot
+
+    # 3. Grid-pack the unique cells, per_sheet cells per sheet
+    os.makedirs(out_dir, exist_ok=True)
+    sheets = []
+    columns = max(1, int(np.ceil(np.sqrt(min(per_sheet, max(1, len(cells)))))))
+    for start in range(0, len(cells), per_sheet):
+        chunk = cells[start:start + per_sheet]
+        rows = -(-len(chunk) // columns)
+        sheet = np.zeros((rows * cell, columns * cell, 4), dtype=np.uint8)
+        for i, pixels in enumerate(chunk):
+            y, x = divmod(i, columns)
+            sheet[y * cell:(y + 1) * cell, x * cell:(x + 1) * cell] = pixels
+        name = f"favicons-{len(sheets)}.png"
+        write_png(os.path.join(out_dir, name), sheet)
+        sheets.append({"file": name, "width": columns * cell, "height": rows * cell})
+
+    domains = {}
+    for domain, slot in sorted(slot_of_domain.items()):
+        sheet, i = divmod(slot, per_sheet)
+        y, x = divmod(i, columns)
+        domains[domain] = [sheet, x * cell, y * cell]
+
+    index = {"cell": cell, "sheets": sheets, "domains": domains, "unpacked": dict(sorted(unpacked.items()))}
+    tmp = os.path.join(out_dir, INDEX_FILENAME + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, separators=(",", ":"))
+    os.replace(tmp, os.path.join(out_dir, INDEX_FILENAME))
+
+    index["stats"] = {
+        "files": len(files),
+        "distinct_files": len(by_digest),
+        "distinct_icons": len(cells),
+        "packed_domains": len(domains),
+        "unpacked_domains": len(unpacked),
+    }
+    return index
+
+
+def main() -> int:
+    def option(name: str, default: int) -> int:
+        return int(sys.argv[sys.argv.index(name) + 1]) if name in sys.argv else default
+
+    start = time.perf_counter()
+    index = build_sprites(cell=option("--cell", 32), per_sheet=option("--per-sheet", 1024))
+    stats = index["stats"]
+    sheet_bytes = sum(os.path.getsize(os.path.join(SPRITE_DIR, s["file"])) for s in index["sheets"])
+
+    print(f"Packed favicons in {time.perf_counter() - start:.1f}s")
+    print(f"  {stats['files']} icon files -> {stats['distinct_files']} distinct files"
+          f" -> {stats['distinct_icons']} distinct icons")
+    print(f"  {len(index['sheets'])} sheet(s), {sheet_bytes:,} bytes, under {SPRITE_DIR}")
+    print(f"  requests on map load: {stats['packed_domains'] + stats['unpacked_domains']} icons"
+          f" -> {len(index['sheets']) + 1 + stats['unpacked_domains']}"
+          f" ({len(index['sheets'])} sheet(s) + index + {stats['unpacked_domains']} unpacked)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,28 +2,35 @@
 """
 Download favicons for school websites and save them under src/assets/favicons/.
 
-Sources scanned:
- - schools/matchmaking_index.csv (Website)
- - schools/trade_schools_curated.csv (website)
+Sources scanned (any column with "website" in its name):
+ - data/production/trade_schools_geocoded_fixed.csv
+ - data/production/matchmaking_index.csv
+ - schools/matchmaking_index.csv
+ - schools/trade_schools_curated.csv
 
 Usage:
-  python scripts/fetch-favicons.py
+  python scripts/fetch-favicons.py [--refresh] [--rescan]
+
+Domains are read from src/assets/favicons/domain_manifest.json, which is rebuilt
+from the sources only when one of them changes (or with --rescan).
+
+Existing icons are skipped unless --refresh is given, in which case they are
+revalidated with conditional GETs and only changed icons are rewritten.
 
 Requires: requests (see scripts/requirements.txt)
 """
 
-import csv
 import os
 import sys
 import time
-import urllib.parse
-from typing import Iterable, Set
 
-import requests
+from favicon_fetcher import FaviconFetcher
+from website_domains import MANIFEST_FILENAME, load_or_build_manifest
 
 
 REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 OUTPUT_DIR = os.path.join(REPO_ROOT, "src", "assets", "favicons")
+MANIFEST_PATH = os.path.join(OUTPUT_DIR, MANIFEST_FILENAME)
 
 SOURCES = [
     os.path.join(REPO_ROOT, "data", "production", "trade_schools_geocoded_fixed.csv"),
@@ -33,107 +40,27 @@ SOURCES = [
 ]
 
 
-def normalize_website(value: str) -> str:
-    if not value:
-        return ""
-    url = value.strip()
-    if not url:
-        return ""
-    # Add scheme if missing
-    if not url.startswith("http://") and not url.startswith("https://"):
-        url = "https://" + url
-    # Trim whitespace and stray characters
-    return url.strip()
-
-
-def extract_domain(url: str) -> str:
-    try:
-        parsed = urllib.parse.urlparse(url)
-        hostname = parsed.hostname or ""
-        return hostname.lower()
-    except Exception:
-        return ""
-
-
-def iter_websites_from_csv(path: str) -> Iterable[str]:
-    if not os.path.exists(path):
-        return []
-    with open(path, newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        # Heuristics for website columns
-        website_cols = [
-            c for c in reader.fieldnames or []
-            if c and "website" in c.lower()
-        ]
-        if not website_cols:
-            return []
-        for row in reader:
-            for col in website_cols:
-                val = (row.get(col) or "").strip()
-                if val:
-                    yield val
-
-
-def download_favicon(domain: str, out_path: str) -> bool:
-    # Use Google's favicon service (PNG)
-    url = f"https://www.google.com/s2/favicons?domain={domain}&sz=64"
-    try:
-        resp = requests.get(url, timeout=10)
-        if resp.status_code == 200 and resp.content:
-            with open(out_path, "wb") as f:
-                f.write(resp.content)
-            return True
-        return False
-    except Exception:
-        return False
-
-
 def main() -> int:
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-    websites: Set[str] = set()
-    for src in SOURCES:
-        for w in iter_websites_from_csv(src):
-            w_norm = normalize_website(w)
-            if w_norm:
-                websites.add(w_norm)
-
-    if not websites:
-        print("No websites found to fetch favicons for.")
-        return 0
-
-    domains: Set[str] = set()
-    for w in websites:
-        d = extract_domain(w)
-        if d:
-            domains.add(d)
-
+    # Distinct domains come from the manifest; the sources are only rescanned
+    # (website column only, one normalization per distinct value) when they change
+    domains = load_or_build_manifest(SOURCES, MANIFEST_PATH, rescan="--rescan" in sys.argv)
     if not domains:
         print("No valid domains extracted.")
         return 0
 
-    downloaded = 0
-    skipped = 0
-
-    for i, domain in enumerate(sorted(domains)):
-        out_file = os.path.join(OUTPUT_DIR, f"{domain}.png")
-        if os.path.exists(out_file) and os.path.getsize(out_file) > 0:
-            skipped += 1
-            continue
-        ok = download_favicon(domain, out_file)
-        if ok:
-            downloaded += 1
-        else:
-            # Remove empty/failed file if created
-            if os.path.exists(out_file) and os.path.getsize(out_file) == 0:
-                try:
-                    os.remove(out_file)
-                except Exception:
-                    pass
-        # Be gentle to the service
-        time.sleep(0.05)
-
-    print(f"Favicons done. Downloaded: {downloaded}, Skipped existing: {skipped}, Total domains: {len(domains)}")
+    # Parallel, connection-pooled fetch; --refresh revalidates existing icons
+    # with conditional GETs (ETag / Last-Modified kept in favicon_meta.json)
+    refresh = "--refresh" in sys.argv
+    start = time.perf_counter()
+    fetcher = FaviconFetcher(OUTPUT_DIR)
+    counts = fetcher.fetch_all(domains, refresh=refresh)
+    fetcher.close()
+
+    print(f"Favicons done in {time.perf_counter() - start:.1f}s. Downloaded: {counts['downloaded']}, "
+          f"Unchanged: {counts['unchanged']}, Skipped existing: {counts['skipped']}, "
+          f"Failed: {counts['failed']}, Total domains: {len(domains)}")
     print(f"Saved under: {OUTPUT_DIR}")
     return 0
 
@@ -5,88 +5,54 @@ Uses OpenAI or Anthropic to intelligently geocode based on name + state + city
 """
 
 import pandas as pd
-import json
-import time
 import os
-from typing import Dict, Optional, Tuple
-import requests
+import sys
+from typing import Optional, Tuple
 
-def get_coordinates_with_ai(school_name: str, city: str, state: str) -> Tuple[Optional[float], Optional[float]]:
+from geocode_cache import GeocodeCache
+from gazetteer import institution_jitter
+from geocode_providers import FallbackGeocoder, GazetteerProvider, NominatimProvider, OfflineProvider
+
+def build_geocoder(cache: GeocodeCache, offline_csv: Optional[str] = None,
+                   retry_errors: bool = True) -> FallbackGeocoder:
     """
-    Use multiple methods to get coordinates
+    Nominatim fallback chain, or an offline table lookup when offline_csv is given.
+    City-center queries are answered by the offline gazetteer first; cached
+    transport errors are retried unless retry_errors is False.
     """
-    # Method 1: Try Nominatim with full school name
-    query = f"{school_name}, {city}, {state}, USA"
-    url = "https://nominatim.openstreetmap.org/search"
-    params = {
-        'q': query,
-        'format': 'json',
-        'limit': 1,
-        'countrycodes': 'us'
-    }
-    headers = {'User-Agent': 'TradeSchoolMapper/1.0'}
-    
-    try:
-        response = requests.get(url, params=params, headers=headers, timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            if data:
-                lat = float(data[0]['lat'])
-                lon = float(data[0]['lon'])
-                print(f"✅ Found via full name: {school_name} -> ({lat}, {lon})")
-                return lat, lon
-    except:
-        pass
-    
-    time.sleep(1)  # Rate limiting
-    
-    # Method 2: Try with simplified name (remove "State", "Community", "Technical", etc)
-    simplified_name = school_name
-    for word in ['State', 'Community', 'Technical', 'College', 'Institute', 'Center', 'School', '-', 'Inc', 'LLC']:
-        simplified_name = simplified_name.replace(word, ' ')
-    simplified_name = ' '.join(simplified_name.split())  # Clean up spaces
-    
-    query = f"{simplified_name}, {city}, {state}, USA"
-    params['q'] = query
-    
-    try:
-        response = requests.get(url, params=params, headers=headers, timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            if data:
-                lat = float(data[0]['lat'])
-                lon = float(data[0]['lon'])
-                print(f"✅ Found via simplified: {school_name} -> ({lat}, {lon})")
-                return lat, lon
-    except:
-        pass
-    
-    time.sleep(1)
-    
-    # Method 3: Try just city and state
-    query = f"{city}, {state}, USA"
-    params['q'] = query
-    
+    provider = OfflineProvider.from_csv(offline_csv) if offline_csv else NominatimProvider()
+    return FallbackGeocoder([GazetteerProvider(), provider], cache=cache, retry_errors=retry_errors)
+
+
+def get_coordinates_with_ai(school_name: str, city: str, state: str,
+                            geocoder: Optional[FallbackGeocoder] = None) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Use multiple methods to get coordinates: full name, simplified name
+    (without "State", "Community", "Technical", ...), then the city center
+    """
+    own_cache = geocoder is None
+    geocoder = geocoder or build_geocoder(GeocodeCache())
     try:
-        response = requests.get(url, params=params, headers=headers, timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            if data:
-                lat = float(data[0]['lat'])
-                lon = float(data[0]['lon'])
-                # Add some random offset to avoid all schools in same city being at exact same point
-                import random
-                lat += random.uniform(-0.05, 0.05)
-                lon += random.uniform(-0.05, 0.05)
-                print(f"⚠️  Using city center for: {school_name} -> ({lat}, {lon})")
-                return lat, lon
-    except:
-        pass
-    
-    print(f"❌ Failed all methods for: {school_name}, {city}, {state}")
-    return None, None
+        match = geocoder.resolve(school_name, city, state)
+        if match is None:
+            print(f"❌ Failed all methods for: {school_name}, {city}, {state}")
+            return None, None
+        
+        lat, lon = match.lat, match.lon
+        if match.approximate:
+            # Offset per institution (deterministic) so schools in the same city don't stack
+            dlat, dlon = institution_jitter(school_name, city, state)
+            lat += dlat
+            lon += dlon
+            print(f"⚠️  Using {match.step} for: {school_name} -> ({lat}, {lon})")
+        else:
+            print(f"✅ Found via {match.step}: {school_name} -> ({lat}, {lon})")
+        return lat, lon
+    finally:
+        if own_cache:
+            geocoder.cache.close()
 
-def fix_missing_coordinates():
+def fix_missing_coordinates(offline_csv: Optional[str] = None):
     """
     Main function to fix missing coordinates
     """
@@ -106,7 +72,10 @@ def fix_missing_coordinates():
         print("✅ All schools already have coordinates!")
         return
     
-    # Process each missing school
+    # Process each missing school (every attempt, including failures, goes through
+    # the shared geocode cache)
+    geocode_cache = GeocodeCache()
+    geocoder = build_geocoder(geocode_cache, offline_csv)
     fixed_count = 0
     for idx, row in missing.iterrows():
         school_name = row['Institution Name']
@@ -116,7 +85,7 @@ def fix_missing_coordinates():
         print(f"\n[{fixed_count + 1}/{len(missing)}] Processing: {school_name}")
         
         # Get coordinates
-        lat, lon = get_coordinates_with_ai(school_name, city, state)
+        lat, lon = get_coordinates_with_ai(school_name, city, state, geocoder=geocoder)
         
         if lat is not None and lon is not None:
             # Update the dataframe
@@ -130,9 +99,10 @@ def fix_missing_coordinates():
             if fixed_count % 10 == 0:
                 df.to_csv('trade_schools_geocoded_fixed.csv', index=False)
                 print(f"💾 Saved progress: {fixed_count} schools fixed")
-        
-        # Rate limiting
-        time.sleep(0.5)
+    
+    geocode_cache.close()
+    print(f"\n🔎 Lookups: {geocoder.stats['lookups']} | cache hits: {geocoder.stats['cache_hits']}"
+          f" | transport errors: {geocoder.stats['errors']}")
     
     # Save final results
     df.to_csv('trade_schools_geocoded_fixed.csv', index=False)
@@ -156,5 +126,7 @@ def fix_missing_coordinates():
             print(f"   ... and {len(still_missing) - 10} more")
 
 if __name__ == "__main__":
-    fix_missing_coordinates()
+    # --offline <geocoded.csv> answers from a local table instead of Nominatim
+    offline_csv = sys.argv[sys.argv.index("--offline") + 1] if "--offline" in sys.argv else None
+    fix_missing_coordinates(offline_csv)
 
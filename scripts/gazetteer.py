@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Offline US places gazetteer for city/state geocoding fallbacks.
+
+Places are held in three parallel NumPy arrays (64-bit key hash, lat, lon) sorted
+by hash; a lookup hashes the normalized (city, state) and binary-searches the
+hash array, so city-level fallbacks resolve in microseconds with no network and
+no rate limit.
+
+The intended table is the public-domain Census Gazetteer places file
+(2020_Gaz_place_national.txt, ~32k places): `census` converts it and writes it
+to data/reference/us_places.csv. Until that file has been imported, the bundled
+table is a stopgap derived from the repo's own geocoded schools (`build`): the
+median coordinate per city over rows Nominatim resolved directly. Rows written
+by fix-missing-coordinates.py (fallback matches, possibly jittered city
+centers) are left out so the table never averages its own output. The stopgap
+only knows cities that already have a school, so it cannot resolve a school in
+a new city; Census places cover the 50 states, DC and Puerto Rico.
+
+Also provides deterministic per-institution jitter for approximate (city center)
+coordinates, so co-located schools are spread out identically on every run.
+
+Usage:
+  python scripts/gazetteer.py census 2020_Gaz_place_national.txt   # import the Census table
+  python scripts/gazetteer.py build [geocoded.csv ...]   # regenerate the school-derived stopgap
+  python scripts/gazetteer.py bench
+"""
+
+import hashlib
+import os
+import re
+import sys
+import time
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_PLACES_PATH = os.path.join(REPO_ROOT, "data", "reference", "us_places.csv")
+DEFAULT_GEOCODED_CSV = os.path.join(REPO_ROOT, "data", "production", "trade_schools_geocoded_fixed.csv")
+
+JITTER_DEGREES = 0.05
+
+US_STATES = {
+    "alabama": "AL", "alaska": "AK", "arizona": "AZ", "arkansas": "AR", "california": "CA", "colorado": "CO",
+    "connecticut": "CT", "delaware": "DE", "district of columbia": "DC", "florida": "FL", "georgia": "GA",
+    "hawaii": "HI", "idaho": "ID", "illinois": "IL", "indiana": "IN", "iowa": "IA", "kansas": "KS",
+    "kentucky": "KY", "louisiana": "LA", "maine": "ME", "maryland": "MD", "massachusetts": "MA",
+    "michigan": "MI", "minnesota": "MN", "mississippi": "MS", "missouri": "MO", "montana": "MT",
+    "nebraska": "NE", "nevada": "NV", "new hampshire": "NH", "new jersey": "NJ", "new mexico": "NM",
+    "new york": "NY", "north carolina": "NC", "north dakota": "ND", "ohio": "OH", "oklahoma": "OK",
+    "oregon": "OR", "pennsylvania": "PA", "rhode island": "RI", "south carolina": "SC", "south dakota": "SD",
+    "tennessee": "TN", "texas": "TX", "utah": "UT", "vermont": "VT", "virginia": "VA", "washington": "WA",
+    "west virginia": "WV", "wisconsin": "WI", "wyoming": "WY", "puerto rico": "PR",
+}
+_STATE_CODES = set(US_STATES.values())
+_COUNTRY_TOKENS = {"united states", "united states of america", "usa", "us", "u.s.", "u.s.a.", "north america"}
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+_SAINT = re.compile(r"^saint\b")
+_CENSUS_SUFFIX = re.compile(r"\s+(city|town|village|borough|CDP|municipality|comunidad|zona urbana)$")
+
+
+def normalize_place(city: str, state: str) -> str:
+    """'St. Louis', 'mo ' -> 'st louis|MO'"""
+    city = _PUNCTUATION.sub(" ", str(city).lower())
+    city = _SAINT.sub("st", _SPACES.sub(" ", city).strip())
+    return f"{city}|{str(state).strip().upper()}"
+
+
+def place_hash(city: str, state: str) -> int:
+    """Stable 64-bit key for a normalized (city, state)"""
+    digest = hashlib.blake2b(normalize_place(city, state).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def state_code(value: str) -> Optional[str]:
+    """Two-letter code for a US state name or code ("Ohio", "oh", "OH" -> "OH")"""
+    text = _SPACES.sub(" ", str(value or "")).strip()
+    if text.upper() in _STATE_CODES:
+        return text.upper()
+    return US_STATES.get(text.lower())
+
+
+def parse_us_location(text: str) -> Optional[Tuple[Optional[str], str]]:
+    """
+    (city or None, state code) from free-form "City, State[, United States[, North
+    America]]" strings; None when no US state can be found
+    """
+    parts = [p.strip() for p in str(text or "").split(",") if p.strip()]
+    while parts and parts[-1].lower() in _COUNTRY_TOKENS:
+        parts.pop()
+    for i in range(len(parts) - 1, -1, -1):
+        code = state_code(parts[i])
+        if code:
+            return (parts[i - 1] if i > 0 else None), code
+    return None
+
+
+def institution_jitter(name: str, city: str, state: str, degrees: float = JITTER_DEGREES) -> Tuple[float, float]:
+    """
+    (dlat, dlon) offset in [-degrees, degrees), seeded by the institution itself so
+    the same school always lands on the same point
+    """
+    key = f"{str(name).strip().lower()}|{normalize_place(city, state)}"
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+    u = np.frombuffer(digest, dtype="<u8") / float(2 ** 64)
+    return float((u[0] * 2 - 1) * degrees), float((u[1] * 2 - 1) * degrees)
+
+
+class Gazetteer:
+    """Sorted-hash index over (city, state) -> (lat, lon)"""
+
+    def __init__(self, cities: Iterable[str], states: Iterable[str], lats: Iterable[float], lons: Iterable[float]):
+        hashes = np.fromiter((place_hash(c, s) for c, s in zip(cities, states)), dtype=np.uint64)
+        lats = np.asarray(list(lats), dtype=np.float32)
+        lons = np.asarray(list(lons), dtype=np.float32)
+        # Sort by hash and keep the first row of any duplicate place
+        order = np.argsort(hashes, kind="stable")
+        hashes = hashes[order]
+        keep = np.ones(len(hashes), dtype=bool)
+        keep[1:] = hashes[1:] != hashes[:-1]
+        self.hashes = hashes[keep]
+        self.lats = lats[order][keep]
+        self.lons = lons[order][keep]
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "Gazetteer":
+        return cls(df["city"], df["state"], df["lat"], df["lon"])
+
+    @classmethod
+    def from_csv(cls, path: str = DEFAULT_PLACES_PATH) -> "Gazetteer":
+        """Bundled table with city, state, lat, lon columns"""
+        return cls.from_frame(pd.read_csv(path, dtype={"city": str, "state": str}))
+
+    @classmethod
+    def from_census(cls, path: str) -> "Gazetteer":
+        """Census Gazetteer places file (tab-separated USPS, NAME, INTPTLAT, INTPTLONG)"""
+        return cls.from_frame(census_places_table(path))
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.hashes.nbytes + self.lats.nbytes + self.lons.nbytes)
+
+    def lookup(self, city: str, state: str) -> Optional[Tuple[float, float]]:
+        if not city or not state:
+            return None
+        key = np.uint64(place_hash(city, state))
+        i = int(np.searchsorted(self.hashes, key))
+        if i < len(self.hashes) and self.hashes[i] == key:
+            return float(self.lats[i]), float(self.lons[i])
+        return None
+
+    def __contains__(self, place: Tuple[str, str]) -> bool:
+        return self.lookup(*place) is not None
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({"hash": self.hashes, "lat": self.lats, "lon": self.lons})
+
+
+_default: Optional[Gazetteer] = None
+
+
+def default_gazetteer() -> Gazetteer:
+    """The bundled table, loaded once per process"""
+    global _default
+    if _default is None:
+        _default = Gazetteer.from_csv()
+    return _default
+
+
+def fallback_rows(df: pd.DataFrame) -> pd.Series:
+    """
+    Rows fix-missing-coordinates.py filled in: their display_name is the bare
+    "name, city, state" it writes, where Nominatim's always ends in the country
+    """
+    if "display_name" not in df.columns or "Institution Name" not in df.columns:
+        return pd.Series(False, index=df.index)
+    written = df["Institution Name"].astype(str) + ", " + df["City"].astype(str) + ", " + df["State"].astype(str)
+    return df["display_name"] == written
+
+
+def build_places_table(geocoded_csvs: Iterable[str]) -> pd.DataFrame:
+    """
+    One row per (city, state): median coordinate of the schools there that
+    Nominatim resolved directly (fallback and jittered rows are excluded)
+    """
+    frames = []
+    for path in geocoded_csvs:
+        df = pd.read_csv(path)
+        frames.append(df.loc[~fallback_rows(df), ["City", "State", "lat", "lon"]])
+    df = pd.concat(frames, ignore_index=True).dropna()
+    df = df[df["State"].str.fullmatch(r"[A-Z]{2}") & ~df["City"].str.contains(r"\d")]
+    df = df.assign(key=[normalize_place(c, s) for c, s in zip(df["City"], df["State"])])
+    places = df.groupby("key", sort=True).agg(
+        city=("City", "first"), state=("State", "first"), lat=("lat", "median"), lon=("lon", "median"),
+        schools=("lat", "size")
+    )
+    return places.reset_index(drop=True).round({"lat": 5, "lon": 5})
+
+
+def census_places_table(path: str) -> pd.DataFrame:
+    """
+    Census Gazetteer places in the same city, state, lat, lon, schools schema as
+    build_places_table (schools is 0: the coordinate is the Census internal point)
+    """
+    df = pd.read_csv(path, sep="\t", dtype=str)
+    df.columns = df.columns.str.strip()
+    places = pd.DataFrame({
+        "city": df["NAME"].str.replace(_CENSUS_SUFFIX, "", regex=True).str.strip(),
+        "state": df["USPS"].str.strip(),
+        "lat": df["INTPTLAT"].astype(float),
+        "lon": df["INTPTLONG"].astype(float),
+        "schools": 0,
+    })
+    # "Springfield city" and "Springfield CDP" in one state: keep the first, as Gazetteer does
+    keys = [normalize_place(c, s) for c, s in zip(places["city"], places["state"])]
+    places = places[~pd.Series(keys, index=places.index).duplicated()]
+    return places.sort_values(["state", "city"]).reset_index(drop=True).round({"lat": 5, "lon": 5})
+
+
+def write_places_table(places: pd.DataFrame, path: str = DEFAULT_PLACES_PATH):
+    """Write a places table atomically (tmp file + rename)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    places.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def _bench(gazetteer: Gazetteer, n: int = 100_000):
+    places = pd.read_csv(DEFAULT_PLACES_PATH, dtype={"city": str, "state": str})
+    queries = list(zip(places["city"], places["state"])) + [("Nowhere", "ZZ")]
+    queries = (queries * (n // len(queries) + 1))[:n]
+    start = time.perf_counter()
+    hits = sum(gazetteer.lookup(c, s) is not None for c, s in queries)
+    elapsed = time.perf_counter() - start
+    print(f"{len(gazetteer):,} places in {gazetteer.nbytes:,} bytes")
+    print(f"{n:,} lookups in {elapsed:.3f}s ({elapsed / n * 1e6:.1f} µs each), {hits:,} hits")
+
+
+def main() -> int:
+    command = sys.argv[1] if len(sys.argv) > 1 else "bench"
+    if command == "build":
+        sources = sys.argv[2:] or [DEFAULT_GEOCODED_CSV]
+        places = build_places_table(sources)
+        write_places_table(places)
+        print(f"✓ Wrote {len(places)} places to {DEFAULT_PLACES_PATH}")
+    elif command == "census":
+        places = census_places_table(sys.argv[2])
+        write_places_table(places)
+        print(f"✓ Wrote {len(places):,} Census places to {DEFAULT_PLACES_PATH}")
+        _bench(Gazetteer.from_frame(places))
+    else:
+        _bench(default_gazetteer())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,9 +6,11 @@ Quick script to geocode the missing schools in RI and SD
 import pandas as pd
 import time
 import requests
-import pickle
 import os
 
+from gazetteer import default_gazetteer, institution_jitter
+from geocode_cache import GeocodeCache
+
 def geocode_with_nominatim(address, delay=1.0):
     """Geocode using free Nominatim API"""
     time.sleep(delay)
@@ -57,8 +59,9 @@ print(f"\nFound {len(missing_schools)} schools to geocode")
 df = pd.read_csv('trade_schools_geocoded_fixed.csv')
 print(f"Loaded {len(df)} existing geocoded schools")
 
-# Geocode the missing schools
+# Geocode the missing schools (reusing/recording results in the shared cache)
 print("\n🗺️  Starting geocoding...")
+geocode_cache = GeocodeCache()
 
 for i, school in enumerate(missing_schools):
     print(f"\n{i+1}. Geocoding: {school['Institution Name']}, {school['City']}, {school['State']}")
@@ -67,7 +70,18 @@ for i, school in enumerate(missing_schools):
     address = f"{school['Institution Name']}, {school['City']}, {school['State']}"
     
     # Geocode
-    result = geocode_with_nominatim(address, delay=1.1)
+    result = geocode_cache.get(address)
+    if result is None:
+        result = geocode_with_nominatim(address, delay=1.1)
+        geocode_cache.put(address, result, provider="nominatim")
+    
+    if not result['geocoded']:
+        # Fall back to the offline city center, offset per institution
+        center = default_gazetteer().lookup(school['City'], school['State'])
+        if center is not None:
+            dlat, dlon = institution_jitter(school['Institution Name'], school['City'], school['State'])
+            result = {'lat': center[0] + dlat, 'lon': center[1] + dlon,
+                      'display_name': f"{school['City']}, {school['State']} (city center)", 'geocoded': True}
     
     if result['geocoded']:
         print(f"  ✅ Success: {result['lat']:.6f}, {result['lon']:.6f}")
@@ -87,6 +101,8 @@ for i, school in enumerate(missing_schools):
     else:
         print(f"  ❌ Failed to geocode")
 
+geocode_cache.close()
+
 # Save updated data
 output_file = 'trade_schools_geocoded_fixed.csv'
 df.to_csv(output_file, index=False)
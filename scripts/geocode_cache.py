@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Shared SQLite geocode cache (WAL mode) used by every geocoding script.
+
+Each result is one upserted row keyed on a normalized address, so saving a new
+geocode costs O(1) and is durable as soon as put() returns; an interrupted run
+loses at most the request in flight. Rows record the provider and a UTC
+timestamp. An existing geocode_cache.pkl is imported once on first use.
+
+Usage:
+  with GeocodeCache() as cache:
+      hit = cache.get(address)
+      if hit is None:
+          cache.put(address, geocode_with_nominatim(address), provider="nominatim")
+"""
+
+import os
+import pickle
+import re
+import sqlite3
+from datetime import datetime, timezone
+from typing import Dict, Iterator, Optional, Tuple
+
+
+DEFAULT_CACHE_PATH = "geocode_cache.sqlite"
+LEGACY_PICKLE_PATH = "geocode_cache.pkl"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS geocodes (
+    key          TEXT PRIMARY KEY,
+    address      TEXT NOT NULL,
+    lat          REAL,
+    lon          REAL,
+    display_name TEXT,
+    confidence   TEXT,
+    geocoded     INTEGER NOT NULL,
+    provider     TEXT NOT NULL,
+    updated_at   TEXT NOT NULL
+)
+"""
+
+UPSERT = """
+INSERT INTO geocodes (key, address, lat, lon, display_name, confidence, geocoded, provider, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(key) DO UPDATE SET
+    address = excluded.address,
+    lat = excluded.lat,
+    lon = excluded.lon,
+    display_name = excluded.display_name,
+    confidence = excluded.confidence,
+    geocoded = excluded.geocoded,
+    provider = excluded.provider,
+    updated_at = excluded.updated_at
+"""
+
+_SPACES = re.compile(r"\s+")
+_COMMAS = re.compile(r"\s*,\s*")
+
+
+def normalize_address(address: str) -> str:
+    """Cache key: lowercase, single spaces, ', ' separators, no trailing punctuation"""
+    key = _SPACES.sub(" ", str(address).lower()).strip()
+    return _COMMAS.sub(", ", key).strip(" ,.")
+
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class GeocodeCache:
+    """Address -> geocode result store backed by one SQLite table"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, legacy_pickle: Optional[str] = LEGACY_PICKLE_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(SCHEMA)
+        self.conn.commit()
+        if legacy_pickle and os.path.exists(legacy_pickle) and len(self) == 0:
+            imported = self.import_pickle(legacy_pickle)
+            print(f"✓ Imported {imported} geocodes from {legacy_pickle} into {path}")
+
+    def __enter__(self) -> "GeocodeCache":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM geocodes").fetchone()[0]
+
+    def __contains__(self, address: str) -> bool:
+        row = self.conn.execute("SELECT 1 FROM geocodes WHERE key = ?", (normalize_address(address),)).fetchone()
+        return row is not None
+
+    @staticmethod
+    def _to_result(row: Tuple) -> Dict:
+        lat, lon, display_name, confidence, geocoded = row
+        result = {'lat': lat, 'lon': lon, 'display_name': display_name or '', 'geocoded': bool(geocoded)}
+        if confidence is not None:
+            result['confidence'] = confidence
+        return result
+
+    def get(self, address: str) -> Optional[Dict]:
+        """Cached result dict (lat, lon, display_name, geocoded[, confidence]) or None"""
+        row = self.conn.execute(
+            "SELECT lat, lon, display_name, confidence, geocoded FROM geocodes WHERE key = ?",
+            (normalize_address(address),)
+        ).fetchone()
+        return self._to_result(row) if row else None
+
+    def get_with_meta(self, address: str) -> Optional[Dict]:
+        """Like get(), plus the provider and updated_at of the stored row"""
+        row = self.conn.execute(
+            "SELECT lat, lon, display_name, confidence, geocoded, provider, updated_at FROM geocodes WHERE key = ?",
+            (normalize_address(address),)
+        ).fetchone()
+        if not row:
+            return None
+        return {**self._to_result(row[:5]), 'provider': row[5], 'updated_at': row[6]}
+
+    def _row(self, address: str, result: Dict, provider: str, updated_at: Optional[str]) -> Tuple:
+        return (
+            normalize_address(address), str(address),
+            result.get('lat'), result.get('lon'),
+            result.get('display_name') or '', result.get('confidence'),
+            int(bool(result.get('geocoded'))), provider, updated_at or _utc_now()
+        )
+
+    def put(self, address: str, result: Dict, provider: str = "nominatim", updated_at: Optional[str] = None):
+        """Upsert one result and commit it immediately"""
+        with self.conn:
+            self.conn.execute(UPSERT, self._row(address, result, provider, updated_at))
+
+    def put_many(self, items, provider: str = "nominatim"):
+        """Upsert (address, result) pairs in a single transaction"""
+        with self.conn:
+            self.conn.executemany(UPSERT, (self._row(a, r, provider, None) for a, r in items))
+
+    def items(self) -> Iterator[Tuple[str, Dict]]:
+        cursor = self.conn.execute("SELECT address, lat, lon, display_name, confidence, geocoded FROM geocodes")
+        for row in cursor:
+            yield row[0], self._to_result(row[1:])
+
+    def import_pickle(self, pickle_path: str, provider: str = "nominatim") -> int:
+        """One-time migration of the old {address: result} pickle cache"""
+        with open(pickle_path, 'rb') as f:
+            legacy = pickle.load(f)
+        stamp = datetime.fromtimestamp(os.path.getmtime(pickle_path), timezone.utc).isoformat(timespec="seconds")
+        with self.conn:
+            self.conn.executemany(UPSERT, (self._row(a, r, provider, stamp) for a, r in legacy.items()))
+        return len(legacy)
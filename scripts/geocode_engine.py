@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Concurrent, rate-aware geocoding engine.
+
+Requests are paced by a token bucket per provider instead of a fixed sleep before
+every call, so several lookups can be in flight while the provider's rate is
+respected; a slow or timed-out request no longer stalls the whole run. HTTP calls
+go through one pooled requests.Session (run on a small thread pool from asyncio),
+transient failures (timeouts, 429, 5xx) are retried with exponential backoff, and
+definitive answers are written to the shared GeocodeCache as they arrive.
+
+Usage:
+  results = geocode_addresses(addresses, cache=GeocodeCache())
+
+  # compare against the serial sleep-per-request loop on a local stub server
+  python scripts/geocode_engine.py [--n 200] [--latency 0.2] [--rate 20]
+"""
+
+import asyncio
+import json
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from geocode_cache import normalize_address
+
+
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
+USER_AGENT = "TradeSchoolAnalysis/1.0"
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+@dataclass
+class RateLimit:
+    """Sustained requests per second plus the burst allowed after idling"""
+    rate: float
+    burst: int = 1
+
+
+# Nominatim's usage policy allows at most one request per second
+PROVIDER_LIMITS = {
+    "nominatim": RateLimit(rate=1.0, burst=1),
+}
+
+
+def failed_result() -> Dict:
+    return {'lat': None, 'lon': None, 'display_name': '', 'confidence': 'failed', 'geocoded': False}
+
+
+def parse_nominatim(results: List[Dict]) -> Dict:
+    """Result dict in the shape used by add_geocoding_to_dataframe"""
+    if not results:
+        return failed_result()
+    result = results[0]
+    return {
+        'lat': float(result['lat']),
+        'lon': float(result['lon']),
+        'display_name': result.get('display_name', ''),
+        'confidence': 'high' if float(result.get('importance', 0)) > 0.5 else 'medium',
+        'geocoded': True
+    }
+
+
+# ============================================================================
+# RATE LIMITING
+# ============================================================================
+
+class TokenBucket:
+    """Async token bucket: acquire() waits until one request may start"""
+
+    def __init__(self, rate: float, burst: int = 1, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.clock = clock
+        self.updated = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+# ============================================================================
+# ENGINE
+# ============================================================================
+
+class GeocodeEngine:
+    """
+    Geocode many addresses concurrently against one provider.
+
+    `concurrency` bounds requests in flight (and the HTTP pool size); the token
+    bucket bounds how fast new ones start.
+    """
+
+    def __init__(self, provider: str = "nominatim", base_url: str = NOMINATIM_URL,
+                 limit: Optional[RateLimit] = None, concurrency: int = 4,
+                 max_retries: int = 3, backoff: float = 1.0, timeout: float = 10.0):
+        self.provider = provider
+        self.base_url = base_url
+        self.limit = limit or PROVIDER_LIMITS.get(provider, RateLimit(rate=1.0))
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.stats = {'requests': 0, 'retries': 0, 'errors': 0}
+
+    def close(self):
+        self.session.close()
+
+    def _request(self, address: str) -> requests.Response:
+        params = {'q': address, 'format': 'json', 'limit': 1, 'countrycodes': 'us'}
+        return self.session.get(self.base_url, params=params, timeout=self.timeout)
+
+    def _retry_delay(self, attempt: int, response: Optional[requests.Response]) -> float:
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return self.backoff * (2 ** attempt) * (0.5 + random.random() / 2)
+
+    async def geocode(self, address: str, bucket: TokenBucket, pool: ThreadPoolExecutor) -> Tuple[Dict, bool]:
+        """
+        (result, definitive) for one address. Definitive means the provider answered
+        (found or not found); exhausted retries on transport errors are not.
+        """
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.max_retries + 1):
+            await bucket.acquire()
+            response = None
+            self.stats['requests'] += 1
+            try:
+                response = await loop.run_in_executor(pool, self._request, address)
+                if response.status_code not in RETRY_STATUS:
+                    response.raise_for_status()
+                    return parse_nominatim(response.json()), True
+            except requests.HTTPError as e:
+                print(f"  ⚠ Geocoding failed for {address[:40]}... Error: {str(e)}")
+                return failed_result(), True
+            except (requests.RequestException, ValueError):
+                pass
+            if attempt < self.max_retries:
+                self.stats['retries'] += 1
+                await asyncio.sleep(self._retry_delay(attempt, response))
+        self.stats['errors'] += 1
+        return failed_result(), False
+
+    async def geocode_all(self, addresses: List[str], cache=None,
+                          progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Dict]:
+        """Geocode distinct addresses; results are cached as each one completes"""
+        bucket = TokenBucket(self.limit.rate, self.limit.burst)
+        slots = asyncio.Semaphore(self.concurrency)
+        results: Dict[str, Dict] = {}
+
+        async def one(address: str, pool: ThreadPoolExecutor):
+            async with slots:
+                result, definitive = await self.geocode(address, bucket, pool)
+            results[address] = result
+            if cache is not None and definitive:
+                cache.put(address, result, provider=self.provider)
+            if progress:
+                progress(len(results), len(addresses))
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            await asyncio.gather(*(one(a, pool) for a in addresses))
+        return results
+
+
+def geocode_addresses(addresses: Iterable[str], cache=None, engine: Optional[GeocodeEngine] = None,
+                      progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Dict]:
+    """
+    Address -> result for every address, answering from `cache` (a GeocodeCache)
+    where possible and geocoding the rest concurrently. Entries a fallback run
+    recorded as transport errors (confidence 'error') are retried, not reused.
+    """
+    addresses = list(dict.fromkeys(addresses))
+    # One lookup per normalized address (the cache key), shared by its spellings
+    representative = {}
+    for address in addresses:
+        representative.setdefault(normalize_address(address), address)
+
+    found: Dict[str, Dict] = {}
+    pending = []
+    for key, address in representative.items():
+        cached = cache.get(address) if cache is not None else None
+        if cached is not None and cached.get('confidence') != 'error':
+            found[key] = cached
+        else:
+            pending.append(address)
+
+    if pending:
+        own_engine = engine is None
+        engine = engine or GeocodeEngine()
+        try:
+            fetched = asyncio.run(engine.geocode_all(pending, cache=cache, progress=progress))
+        finally:
+            if own_engine:
+                engine.close()
+        found.update((normalize_address(a), r) for a, r in fetched.items())
+    return {address: found[normalize_address(address)] for address in addresses}
+
+
+# ============================================================================
+# LOCAL STUB SERVER
+# ============================================================================
+
+class StubGeocodeServer:
+    """
+    Nominatim-shaped /search endpoint on localhost for offline runs and tests.
+    Every `fail_every`-th request answers 503, and queries containing "nowhere"
+    return an empty result list. `statuses` scripts the status of the first
+    requests (a 200 there answers normally); error responses carry
+    `retry_after` as a Retry-After header when it is set. The arrival time of
+    every request is kept in `times`.
+    """
+
+    def __init__(self, latency: float = 0.2, fail_every: int = 0,
+                 statuses: Optional[List[int]] = None, retry_after: Optional[str] = None):
+        self.latency = latency
+        self.fail_every = fail_every
+        self.statuses = list(statuses or [])
+        self.retry_after = retry_after
+        self.hits = 0
+        self.times: List[float] = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with lock:
+                    stub.hits += 1
+                    hit = stub.hits
+                    stub.times.append(time.monotonic())
+                time.sleep(stub.latency)
+                status = stub.statuses[hit - 1] if hit <= len(stub.statuses) else 200
+                if stub.fail_every and hit % stub.fail_every == 0:
+                    status = 503
+                if status != 200:
+                    self.send_response(status)
+                    if stub.retry_after is not None:
+                        self.send_header('Retry-After', stub.retry_after)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                query = parse_qs(urlparse(self.path).query).get('q', [''])[0]
+                body = [] if 'nowhere' in query.lower() else [
+                    {'lat': str(30 + hit % 10), 'lon': str(-90 - hit % 10),
+                     'display_name': query, 'importance': 0.6}
+                ]
+                payload = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}/search"
+
+    def __enter__(self) -> "StubGeocodeServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _serial_baseline(url: str, addresses: List[str], delay: float) -> Dict[str, Dict]:
+    """The old loop: fixed sleep, then one blocking request per address"""
+    results = {}
+    for address in addresses:
+        time.sleep(delay)
+        try:
+            response = requests.get(url, params={'q': address, 'format': 'json', 'limit': 1},
+                                    headers={'User-Agent': USER_AGENT}, timeout=10)
+            response.raise_for_status()
+            results[address] = parse_nominatim(response.json())
+        except Exception:
+            results[address] = failed_result()
+    return results
+
+
+def main() -> int:
+    def option(name: str, default: float) -> float:
+        return float(sys.argv[sys.argv.index(name) + 1]) if name in sys.argv else default
+
+    n = int(option("--n", 200))
+    latency = option("--latency", 0.2)
+    rate = option("--rate", 20.0)
+    addresses = [f"School {i}, City {i % 50}, ST" for i in range(n)] + ["Nowhere Institute, Nowhere, ZZ"]
+
+    with StubGeocodeServer(latency=latency, fail_every=25) as stub:
+        print(f"Stub server at {stub.url} ({latency * 1000:.0f} ms latency, every 25th request fails)")
+        print(f"Geocoding {len(addresses)} addresses at {rate:.0f} req/s...")
+
+        delay = 1.0 / rate
+        start = time.perf_counter()
+        serial = _serial_baseline(stub.url, addresses, delay)
+        serial_time = time.perf_counter() - start
+
+        engine = GeocodeEngine(base_url=stub.url, limit=RateLimit(rate=rate, burst=2),
+                               concurrency=max(2, int(rate * latency) + 2), backoff=0.05)
+        start = time.perf_counter()
+        concurrent = geocode_addresses(addresses, engine=engine)
+        engine_time = time.perf_counter() - start
+        engine.close()
+
+    ok_serial = sum(r['geocoded'] for r in serial.values())
+    ok_engine = sum(r['geocoded'] for r in concurrent.values())
+    print(f"  serial sleep loop: {serial_time:6.2f}s | geocoded {ok_serial}/{len(addresses)}")
+    print(f"  concurrent engine: {engine_time:6.2f}s | geocoded {ok_engine}/{len(addresses)}"
+          f" | requests {engine.stats['requests']} | retries {engine.stats['retries']}"
+          f" | errors {engine.stats['errors']}")
+    print(f"  speedup: {serial_time / engine_time:.1f}x (rate floor {len(addresses) / rate:.2f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
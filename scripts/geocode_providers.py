@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Pluggable geocoding providers and a configurable fallback chain.
+
+A provider answers one query string. A FallbackGeocoder walks a list of query
+steps (full name, simplified name, city center, ...) and, for each step, its
+providers in order, stopping at the first hit. Every attempt - hits, "no result"
+answers and transport errors alike - is recorded in the shared GeocodeCache. A
+re-run never repeats a definitive miss, but transport errors (confidence 'error')
+are retried, as geocode_engine.geocode_addresses does for the same cache (pass
+retry_errors=False to treat them as final too). OfflineProvider answers from a local table for offline runs;
+GazetteerProvider resolves plain city/state queries from the offline gazetteer.
+
+Usage:
+  chain = FallbackGeocoder([GazetteerProvider(), NominatimProvider()], cache=GeocodeCache())
+  match = chain.resolve("Lincoln Technical Institute-Lincoln", "Lincoln", "RI")
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+import requests
+
+from gazetteer import Gazetteer, default_gazetteer
+from geocode_cache import GeocodeCache, normalize_address
+from geocode_engine import (NOMINATIM_URL, PROVIDER_LIMITS, RETRY_STATUS, USER_AGENT, RateLimit,
+                            failed_result, parse_nominatim)
+
+
+# ============================================================================
+# PROVIDERS
+# ============================================================================
+
+class GeocodeProvider:
+    """Base class: lookup(query) -> (result dict, definitive)"""
+    name = "provider"
+    cacheable = True
+
+    def lookup(self, query: str) -> Tuple[Dict, bool]:
+        raise NotImplementedError
+
+    def cache_key(self, query: str) -> str:
+        """Key in the shared cache; plain queries belong to Nominatim for compatibility"""
+        return query if self.name == "nominatim" else f"{self.name}: {query}"
+
+
+class NominatimProvider(GeocodeProvider):
+    """OpenStreetMap Nominatim, paced to its rate limit (no fixed sleep per call)"""
+    name = "nominatim"
+
+    def __init__(self, base_url: str = NOMINATIM_URL, limit: Optional[RateLimit] = None,
+                 timeout: float = 10.0, session: Optional[requests.Session] = None):
+        self.base_url = base_url
+        self.limit = limit or PROVIDER_LIMITS["nominatim"]
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.session.headers.setdefault('User-Agent', USER_AGENT)
+        self._next_slot = 0.0
+
+    def _wait_for_slot(self):
+        now = time.monotonic()
+        if now < self._next_slot:
+            time.sleep(self._next_slot - now)
+        self._next_slot = max(now, self._next_slot) + 1.0 / self.limit.rate
+
+    def lookup(self, query: str) -> Tuple[Dict, bool]:
+        self._wait_for_slot()
+        params = {'q': query, 'format': 'json', 'limit': 1, 'countrycodes': 'us'}
+        try:
+            response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+            if response.status_code in RETRY_STATUS:
+                return failed_result(), False
+            response.raise_for_status()
+            return parse_nominatim(response.json()), True
+        except requests.HTTPError:
+            return failed_result(), True
+        except (requests.RequestException, ValueError):
+            return failed_result(), False
+
+
+class OfflineProvider(GeocodeProvider):
+    """Answers from an in-memory {query: (lat, lon)} table; never touches the network"""
+    name = "offline"
+    cacheable = False
+
+    def __init__(self, table: Dict[str, Tuple[float, float]]):
+        self.table = {normalize_address(q): coords for q, coords in table.items()}
+
+    @classmethod
+    def from_csv(cls, path: str, query_columns: Sequence[str] = ("Institution Name", "City", "State"),
+                 suffix: str = "USA") -> "OfflineProvider":
+        """Table from a geocoded CSV (lat/lon columns); queries are '<cols>, USA' like the fallback steps"""
+        df = pd.read_csv(path).dropna(subset=["lat", "lon"])
+        queries = df[list(query_columns)].fillna("").astype(str).agg(", ".join, axis=1)
+        if suffix:
+            queries = queries + f", {suffix}"
+        return cls(dict(zip(queries, zip(df["lat"].astype(float), df["lon"].astype(float)))))
+
+    def lookup(self, query: str) -> Tuple[Dict, bool]:
+        coords = self.table.get(normalize_address(query))
+        if coords is None:
+            return failed_result(), True
+        lat, lon = coords
+        return {'lat': lat, 'lon': lon, 'display_name': query, 'confidence': 'offline', 'geocoded': True}, True
+
+
+class GazetteerProvider(GeocodeProvider):
+    """
+    Offline city centers for plain "City, ST[, USA]" queries (see gazetteer.py);
+    any other query is a definitive miss, answered without the network
+    """
+    name = "gazetteer"
+    cacheable = False
+
+    def __init__(self, gazetteer: Optional[Gazetteer] = None):
+        self.gazetteer = gazetteer or default_gazetteer()
+
+    def lookup(self, query: str) -> Tuple[Dict, bool]:
+        parts = [p.strip() for p in query.split(",")]
+        if parts and parts[-1].upper() == "USA":
+            parts = parts[:-1]
+        coords = self.gazetteer.lookup(*parts) if len(parts) == 2 else None
+        if coords is None:
+            return failed_result(), True
+        lat, lon = coords
+        return {'lat': lat, 'lon': lon, 'display_name': query, 'confidence': 'city', 'geocoded': True}, True
+
+
+# ============================================================================
+# FALLBACK CHAIN
+# ============================================================================
+
+SIMPLIFY_WORDS = ['State', 'Community', 'Technical', 'College', 'Institute', 'Center', 'School', '-', 'Inc', 'LLC']
+
+
+def simplify_school_name(school_name: str) -> str:
+    """Drop generic words ("State", "Community", "Technical", ...) from a school name"""
+    simplified = school_name
+    for word in SIMPLIFY_WORDS:
+        simplified = simplified.replace(word, ' ')
+    return ' '.join(simplified.split())
+
+
+@dataclass
+class FallbackStep:
+    """One query formulation; approximate steps locate the area, not the school"""
+    label: str
+    query: Callable[[str, str, str], Optional[str]]
+    approximate: bool = False
+
+
+DEFAULT_STEPS = [
+    FallbackStep("full name", lambda name, city, state: f"{name}, {city}, {state}, USA"),
+    FallbackStep("simplified", lambda name, city, state: f"{simplify_school_name(name)}, {city}, {state}, USA"),
+    FallbackStep("city center", lambda name, city, state: f"{city}, {state}, USA" if city or state else None,
+                 approximate=True),
+]
+
+
+@dataclass
+class GeocodeMatch:
+    lat: float
+    lon: float
+    step: str
+    provider: str
+    approximate: bool
+
+
+class FallbackGeocoder:
+    """Try each step's query against each provider in order; the first hit wins"""
+
+    def __init__(self, providers: Iterable[GeocodeProvider], cache: Optional[GeocodeCache] = None,
+                 steps: Optional[List[FallbackStep]] = None, retry_errors: bool = True):
+        self.providers = list(providers)
+        self.cache = cache
+        self.steps = steps or DEFAULT_STEPS
+        self.retry_errors = retry_errors
+        self.stats = {'cache_hits': 0, 'lookups': 0, 'errors': 0}
+
+    def lookup(self, provider: GeocodeProvider, query: str) -> Dict:
+        """One provider attempt, answered from or recorded in the cache"""
+        use_cache = self.cache is not None and provider.cacheable
+        key = provider.cache_key(query)
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None and not (self.retry_errors and cached.get('confidence') == 'error'):
+                self.stats['cache_hits'] += 1
+                return cached
+
+        self.stats['lookups'] += 1
+        result, definitive = provider.lookup(query)
+        if not definitive:
+            self.stats['errors'] += 1
+            result = {**result, 'confidence': 'error'}
+        if use_cache:
+            self.cache.put(key, result, provider=provider.name)
+        return result
+
+    def resolve(self, name: str, city: str, state: str) -> Optional[GeocodeMatch]:
+        tried = set()
+        for step in self.steps:
+            query = step.query(name, city, state)
+            if not query or normalize_address(query) in tried:
+                continue
+            tried.add(normalize_address(query))
+            for provider in self.providers:
+                result = self.lookup(provider, query)
+                if result['geocoded']:
+                    return GeocodeMatch(result['lat'], result['lon'], step.label, provider.name, step.approximate)
+        return None
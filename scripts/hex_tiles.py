@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Precompute H3 hex aggregation tiles for the hex-grid map.
+
+Run after geocoding. Every geocoded school is assigned its H3 cell at each map
+resolution once, here, instead of in the browser on every load and zoom. Per
+resolution, one tile holds the occupied cells with their boundary polygon,
+school count, program offerings and per-program counts, plus the member school
+indices so the page can re-aggregate for its filters without calling h3-js.
+
+Schools are built the way src/clean-map.html builds them: rows of the geocoded
+CSV with geocoded == True, joined to matchmaking_index.csv on
+name/state/city for their (deduplicated) programs.
+
+Output (default src/data/hex/):
+  hex-index.json   resolutions, source digests, school keys [name, state, city]
+  hex-r<N>.json    columnar tile for resolution N
+
+Usage:
+  python scripts/hex_tiles.py [--geo <csv>] [--programs <csv>] [--out <dir>]
+"""
+
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence
+
+import h3
+
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+GEO_CSV = os.path.join(REPO_ROOT, "src", "schools", "trade_schools_geocoded_fixed.csv")
+PROGRAMS_CSV = os.path.join(REPO_ROOT, "src", "schools", "matchmaking_index.csv")
+OUTPUT_DIR = os.path.join(REPO_ROOT, "src", "data", "hex")
+
+# The range clean-map.html's getH3Resolution() picks from (zoom <= 3 -> 2 ... zoom >= 12 -> 7)
+RESOLUTIONS = (2, 3, 4, 5, 6, 7)
+TILE_VERSION = 1
+COORD_SCALE = 100000  # boundaries stored in 1e-5 degree units (~1 m, far below the smallest hex drawn)
+
+
+@dataclass
+class HexSchool:
+    name: str
+    state: str
+    city: str
+    lat: float
+    lon: float
+    programs: List[str] = field(default_factory=list)
+
+    @property
+    def key(self) -> List[str]:
+        return [self.name, self.state, self.city]
+
+
+def _digest(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def load_hex_schools(geo_csv: str = GEO_CSV, programs_csv: str = PROGRAMS_CSV) -> List[HexSchool]:
+    """Geocoded schools with their programs, in geocoded-CSV order"""
+    programs: Dict[tuple, Dict[str, None]] = {}
+    if os.path.exists(programs_csv):
+        with open(programs_csv, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                key = (row.get("Institution Name") or "", row.get("State") or "", row.get("City") or "")
+                bucket = programs.setdefault(key, {})
+                if row.get("program"):
+                    bucket[row["program"]] = None
+
+    schools = []
+    with open(geo_csv, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            if row.get("geocoded") != "True" or not row.get("lat") or not row.get("lon"):
+                continue
+            try:
+                lat, lon = float(row["lat"]), float(row["lon"])
+            except ValueError:
+                continue
+            name, state, city = row.get("Institution Name") or "", row.get("State") or "", row.get("City") or ""
+            schools.append(HexSchool(name, state, city, lat, lon, list(programs.get((name, state, city), {}))))
+    return schools
+
+
+def cell_boundary(cell: str) -> List[int]:
+    """
+    Boundary as flat delta-coded integers: [lng0, lat0, dlng1, dlat1, ...] in
+    1e-5 degrees, first vertex absolute. Decoding and closing the ring gives what
+    h3-js cellToBoundary(cell, true) returns, to ~1 m.
+    """
+    flat, prev_lng, prev_lat = [], 0, 0
+    for lat, lng in h3.cell_to_boundary(cell):
+        x, y = round(lng * COORD_SCALE), round(lat * COORD_SCALE)
+        flat += [x - prev_lng, y - prev_lat]
+        prev_lng, prev_lat = x, y
+    return flat
+
+
+def build_tile(schools: Sequence[HexSchool], resolution: int, program_ids: Dict[str, int]) -> Dict:
+    """Columnar tile: one entry per occupied cell, most populated cell first"""
+    members: Dict[str, List[int]] = {}
+    for i, school in enumerate(schools):
+        members.setdefault(h3.latlng_to_cell(school.lat, school.lon, resolution), []).append(i)
+
+    cells = sorted(members, key=lambda c: (-len(members[c]), c))
+    tile = {
+        "version": TILE_VERSION,
+        "resolution": resolution,
+        "coord_scale": COORD_SCALE,
+        "cells": cells,
+        "boundaries": [],
+        "schools": [],
+        "program_instances": [],
+        "program_counts": [],
+        "members": [],
+    }
+    for cell in cells:
+        counts = Counter(p for i in members[cell] for p in schools[i].programs)
+        ranked = sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))
+        tile["boundaries"].append(cell_boundary(cell))
+        tile["schools"].append(len(members[cell]))
+        tile["program_instances"].append(sum(counts.values()))
+        # Flat [program id, count, program id, count, ...], largest first
+        tile["program_counts"].append([x for p, n in ranked for x in (program_ids[p], n)])
+        tile["members"].append(members[cell])
+    return tile
+
+
+def _write_json(path: str, payload: Dict):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def build_hex_tiles(geo_csv: str = GEO_CSV, programs_csv: str = PROGRAMS_CSV, out_dir: str = OUTPUT_DIR,
+                    resolutions: Sequence[int] = RESOLUTIONS) -> Dict:
+    """Write hex-index.json plus one tile per resolution; returns the index"""
+    schools = load_hex_schools(geo_csv, programs_csv)
+    program_names = sorted({p for s in schools for p in s.programs})
+    program_ids = {p: i for i, p in enumerate(program_names)}
+
+    os.makedirs(out_dir, exist_ok=True)
+    index = {
+        "version": TILE_VERSION,
+        "sources": {
+            os.path.basename(p): _digest(p) for p in (geo_csv, programs_csv) if os.path.exists(p)
+        },
+        "programs": program_names,
+        "schools": [s.key for s in schools],
+        "tiles": {},
+    }
+    for resolution in resolutions:
+        tile = build_tile(schools, resolution, program_ids)
+        filename = f"hex-r{resolution}.json"
+        _write_json(os.path.join(out_dir, filename), tile)
+        index["tiles"][str(resolution)] = {
+            "file": filename,
+            "cells": len(tile["cells"]),
+            "bytes": os.path.getsize(os.path.join(out_dir, filename)),
+        }
+    _write_json(os.path.join(out_dir, "hex-index.json"), index)
+    return index
+
+
+def main() -> int:
+    def option(name: str, default: str) -> str:
+        return sys.argv[sys.argv.index(name) + 1] if name in sys.argv else default
+
+    geo_csv = option("--geo", GEO_CSV)
+    programs_csv = option("--programs", PROGRAMS_CSV)
+    out_dir = option("--out", OUTPUT_DIR)
+    if not os.path.exists(geo_csv):
+        print(f"❌ Geocoded CSV not found: {geo_csv}")
+        return 1
+
+    start = time.perf_counter()
+    index = build_hex_tiles(geo_csv, programs_csv, out_dir)
+    elapsed = time.perf_counter() - start
+
+    print(f"✅ Hex tiles for {len(index['schools'])} schools, {len(index['programs'])} programs "
+          f"in {elapsed * 1000:.0f} ms")
+    for resolution, info in index["tiles"].items():
+        print(f"   r{resolution}: {info['cells']:5d} cells, {info['bytes'] / 1024:6.1f} KB  ({info['file']})")
+    print(f"📁 Saved under: {out_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
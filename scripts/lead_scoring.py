@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Re-weightable lead scoring over the Full DB signal columns.
+
+data/raw/Full DB-All Records_scored.csv ships fixed subtotal_A..D,
+negative_points, total_score and priority_tier columns. Here the scores are
+recomputed from the raw signals instead, so they can be re-tiered whenever the
+weights change.
+
+Every company is one row of a float feature matrix X (n x FEATURES): the
+eleven signal columns as shipped plus `negative_flags`, the number of entries
+in its `negatives` list. A weighting is a vector w over FEATURES, and
+
+  components = X * w  summed per COMPONENTS group   (A, B, C, D, negative)
+  total      = X @ w
+
+so scoring m candidate weightings at once is a single (m x F) @ (F x n)
+product, and their tier counts come from one comparison + count_nonzero per
+tier threshold. With DEFAULT_WEIGHTS (every signal at 1, -10 per negative
+flag) subtotal_C and subtotal_D are reproduced exactly. negative_points matches
+on all but one row (Scicon ships +10 with an empty negatives list), and
+subtotal_A / subtotal_B disagree on a handful of rows where the shipped file
+capped or bumped a subtotal by hand.
+
+Tiers: any negative flag disqualifies; otherwise the highest TIERS threshold
+the total reaches (below the lowest one is Disqualified as well).
+
+Rows appended later (LeadScorer.append) are featurized and scored on their
+own; existing rows are never recomputed.
+
+Usage:
+  scorer = LeadScorer.from_csv()
+  totals = scorer.score()                        # DEFAULT_WEIGHTS
+  tiers = scorer.tiers(scorer.score(weights))
+  counts = scorer.tier_counts_many(W)            # (m weightings x tiers)
+  new_totals = scorer.append(new_rows_frame)
+
+  # agreement with the shipped columns, re-weighting benchmark, incremental mode
+  python scripts/lead_scoring.py [--csv <csv>] [--weightings 1000] [--rows 10000] [--out <csv>]
+"""
+
+import ast
+import os
+import sys
+import time
+from functools import lru_cache
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+FULL_DB_CSV = os.path.join(REPO_ROOT, "data", "raw", "Full DB-All Records_scored.csv")
+
+SIGNALS = (
+    "industry_match", "certifications", "domestic_sourcing",
+    "revenue_size", "erp_mrp", "part_complexity",
+    "active_rfq", "fast_procurement", "reshoring_digital",
+    "warm_connection", "strategic_account",
+)
+FEATURES = SIGNALS + ("negative_flags",)
+
+# Component -> the features it sums, in the order of the shipped subtotal columns
+COMPONENTS: Dict[str, Tuple[str, ...]] = {
+    "A": ("industry_match", "certifications", "domestic_sourcing"),
+    "B": ("revenue_size", "erp_mrp", "part_complexity"),
+    "C": ("active_rfq", "fast_procurement", "reshoring_digital"),
+    "D": ("warm_connection", "strategic_account"),
+    "negative": ("negative_flags",),
+}
+
+DEFAULT_WEIGHTS = np.array([1.0] * len(SIGNALS) + [-10.0])
+
+# (tier, minimum total), highest first; a negative flag or a total below the last is Disqualified
+TIERS = (("High", 80.0), ("Medium", 60.0), ("Low", 35.0))
+DISQUALIFIED = "Disqualified"
+
+
+def _component_matrix() -> np.ndarray:
+    """(components x features) 0/1 matrix assigning each feature to its component"""
+    M = np.zeros((len(COMPONENTS), len(FEATURES)))
+    for i, members in enumerate(COMPONENTS.values()):
+        for feature in members:
+            M[i, FEATURES.index(feature)] = 1.0
+    return M
+
+
+@lru_cache(maxsize=4096)
+def _count_negatives(value) -> int:
+    """Entries in a negatives cell: "['Too small']" -> 1, "[]" / blank -> 0 (memoized; cells repeat)"""
+    if not isinstance(value, str) or not value.strip():
+        return 0
+    try:
+        parsed = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return 1
+    return len(parsed) if isinstance(parsed, (list, tuple)) else int(bool(parsed))
+
+
+def feature_matrix(frame: pd.DataFrame) -> np.ndarray:
+    """(rows x FEATURES) float64 matrix; missing or non-numeric signals count as 0"""
+    X = np.zeros((len(frame), len(FEATURES)))
+    for j, column in enumerate(SIGNALS):
+        if column not in frame.columns:
+            continue
+        values = frame[column]
+        if not pd.api.types.is_numeric_dtype(values):
+            values = pd.to_numeric(values, errors="coerce")
+        X[:, j] = values.fillna(0).to_numpy(float)
+    if "negatives" in frame.columns:
+        X[:, -1] = [_count_negatives(v) for v in frame["negatives"]]
+    return X
+
+
+# ============================================================================
+# SCORER
+# ============================================================================
+
+class LeadScorer:
+    """Feature matrix of a lead table, scored under any number of weightings"""
+
+    def __init__(self, frame: pd.DataFrame, tiers: Sequence[Tuple[str, float]] = TIERS):
+        self._frames = [frame.reset_index(drop=True)]
+        self._X = feature_matrix(self._frames[0])
+        self._n = len(self._X)
+        self.components = _component_matrix()
+        # Ascending thresholds; tier code = number reached, so 0 is below every tier
+        self.thresholds = np.array(sorted(t for _, t in tiers))
+        self.tier_names = (DISQUALIFIED,) + tuple(name for name, _ in sorted(tiers, key=lambda t: t[1]))
+
+    @classmethod
+    def from_csv(cls, path: str = FULL_DB_CSV, **kwargs) -> "LeadScorer":
+        return cls(pd.read_csv(path), **kwargs)
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """The lead table, including appended rows (concatenated on first access)"""
+        if len(self._frames) > 1:
+            self._frames = [pd.concat(self._frames, ignore_index=True)]
+        return self._frames[0]
+
+    @property
+    def X(self) -> np.ndarray:
+        return self._X[:self._n]
+
+    @staticmethod
+    def _weights(weights: Optional[np.ndarray]) -> np.ndarray:
+        w = DEFAULT_WEIGHTS if weights is None else np.asarray(weights, dtype=float)
+        if w.shape[-1] != len(FEATURES):
+            raise ValueError(f"weights need {len(FEATURES)} entries ({', '.join(FEATURES)}), got {w.shape[-1]}")
+        return w
+
+    # ------------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------------
+
+    def component_scores(self, weights: Optional[np.ndarray] = None, rows: slice = slice(None)) -> pd.DataFrame:
+        """Per-component subtotals (columns A, B, C, D, negative) under one weighting"""
+        w = self._weights(weights)
+        scores = (self.X[rows] * w) @ self.components.T
+        return pd.DataFrame(scores, columns=list(COMPONENTS))
+
+    def score(self, weights: Optional[np.ndarray] = None, rows: slice = slice(None)) -> np.ndarray:
+        """Total score per row: X @ w"""
+        return self.X[rows] @ self._weights(weights)
+
+    def score_many(self, weights: np.ndarray, rows: slice = slice(None)) -> np.ndarray:
+        """(weightings x rows) totals for a (weightings x FEATURES) matrix in one product"""
+        W = self._weights(np.atleast_2d(weights))
+        return W @ self.X[rows].T
+
+    # ------------------------------------------------------------------------
+    # Tiers
+    # ------------------------------------------------------------------------
+
+    def tier_codes(self, totals: np.ndarray, rows: slice = slice(None)) -> np.ndarray:
+        """Index into tier_names per total (any shape ending in rows); 0 = Disqualified"""
+        # One comparison per threshold beats searchsorted on large (weightings x rows) blocks
+        codes = np.zeros(np.shape(totals), dtype=np.int8)
+        for threshold in self.thresholds:
+            codes += totals >= threshold
+        codes[..., self.X[rows, -1] > 0] = 0
+        return codes
+
+    def tiers(self, totals: np.ndarray, rows: slice = slice(None)) -> np.ndarray:
+        return np.asarray(self.tier_names, dtype=object)[self.tier_codes(totals, rows)]
+
+    def tier_counts_many(self, weights: np.ndarray) -> np.ndarray:
+        """(weightings x tier_names) company counts per tier for every weighting"""
+        totals = self.score_many(weights)
+        eligible = self.X[:, -1] == 0
+        # Companies at or above each threshold, then differences between neighbouring tiers
+        at_least = np.stack([np.count_nonzero((totals >= t) & eligible, axis=1) for t in self.thresholds], axis=1)
+        at_least = np.hstack([np.full((len(totals), 1), len(self)), at_least, np.zeros((len(totals), 1), int)])
+        return at_least[:, :-1] - at_least[:, 1:]
+
+    # ------------------------------------------------------------------------
+    # Incremental mode
+    # ------------------------------------------------------------------------
+
+    def append(self, frame: pd.DataFrame, weights: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Add newly arrived rows and return their totals. Only the new rows are
+        featurized and scored; the matrix grows geometrically so repeated small
+        appends stay amortized O(new rows).
+        """
+        new = feature_matrix(frame)
+        needed = self._n + len(new)
+        if needed > len(self._X):
+            grown = np.zeros((max(needed, 2 * len(self._X)), len(FEATURES)))
+            grown[:self._n] = self._X[:self._n]
+            self._X = grown
+        self._X[self._n:needed] = new
+        rows = slice(self._n, needed)
+        self._n = needed
+        self._frames.append(frame)
+        return self.score(weights, rows)
+
+    def rescored(self, weights: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """The lead table with subtotal / negative_points / total_score / priority_tier recomputed"""
+        components = self.component_scores(weights)
+        totals = self.score(weights)
+        out = self.frame.copy()
+        for name in "ABCD":
+            out[f"subtotal_{name}"] = components[name].to_numpy()
+        out["negative_points"] = components["negative"].to_numpy()
+        out["total_score"] = totals
+        out["priority_tier"] = self.tiers(totals)
+        return out
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def random_weightings(m: int, seed: int = 0) -> np.ndarray:
+    """m weightings jittered around DEFAULT_WEIGHTS (each weight x 0.5..1.5)"""
+    rng = np.random.default_rng(seed)
+    return DEFAULT_WEIGHTS * rng.uniform(0.5, 1.5, size=(m, len(FEATURES)))
+
+
+def main() -> int:
+    def option(name: str, default: str) -> str:
+        return sys.argv[sys.argv.index(name) + 1] if name in sys.argv else default
+
+    path = option("--csv", FULL_DB_CSV)
+    m = int(option("--weightings", "1000"))
+    n = int(option("--rows", "10000"))
+    out_path = option("--out", "")
+    if not os.path.exists(path):
+        print(f"❌ Scored CSV not found: {path}")
+        return 1
+
+    scorer = LeadScorer.from_csv(path)
+    shipped = scorer.frame
+    components = scorer.component_scores()
+    totals = scorer.score()
+    print(f"Rescored {len(scorer)} companies from {len(FEATURES)} features")
+    for name in "ABCD":
+        same = (components[name].to_numpy() == shipped[f"subtotal_{name}"].to_numpy()).mean()
+        print(f"  subtotal_{name}: {same:6.1%} identical")
+    same = (components["negative"].to_numpy() == shipped["negative_points"].to_numpy()).mean()
+    print(f"  negative_points: {same:6.1%} identical")
+    print(f"  total_score: {(totals == shipped['total_score'].to_numpy()).mean():6.1%} identical")
+    print(f"  priority_tier: {(scorer.tiers(totals) == shipped['priority_tier'].to_numpy()).mean():6.1%} identical")
+
+    # Benchmark on n rows sampled from the real table
+    rng = np.random.default_rng(0)
+    bench = LeadScorer(shipped.iloc[rng.integers(0, len(shipped), n)])
+    W = random_weightings(m)
+    start = time.perf_counter()
+    counts = bench.tier_counts_many(W)
+    t_many = time.perf_counter() - start
+    start = time.perf_counter()
+    for w in W[:50]:
+        bench.tiers(bench.score(w)).tolist()
+    t_loop = (time.perf_counter() - start) * m / 50
+    print(f"{m} weightings x {n} companies re-tiered in {t_many * 1000:.1f} ms "
+          f"(vs ~{t_loop * 1000:.0f} ms one weighting at a time); "
+          f"Low-or-better ranges {counts[:, 1:].sum(axis=1).min()}..{counts[:, 1:].sum(axis=1).max()}")
+
+    # Incremental: append the table in batches of 100, scoring only what arrived
+    incremental = LeadScorer(bench.frame.iloc[:0])
+    start = time.perf_counter()
+    parts = [incremental.append(bench.frame.iloc[i:i + 100]) for i in range(0, n, 100)]
+    elapsed = time.perf_counter() - start
+    same = np.array_equal(np.concatenate(parts), bench.score())
+    print(f"Incremental: {n // 100} appends of 100 rows in {elapsed * 1000:.0f} ms, matches full rescore: {same}")
+
+    if out_path:
+        scorer.rescored().to_csv(out_path, index=False)
+        print(f"📁 Rescored table saved to: {out_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
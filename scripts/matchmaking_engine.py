@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Employer-to-school matchmaking over the raw exhibitor databases.
+
+Each company (FABTECH, AUSA, Full DB) gets a program-demand vector over
+program_taxonomy IDs from its industry / category labels (its description when
+the labels name no program), and a location from its HQ / city / state fields. Schools come from
+hex_tiles.load_hex_schools (geocoded CSV + matchmaking_index.csv programs).
+
+A company's score for a school is
+
+  program_weight * (demand . offered programs) / sum(demand)
+    + (1 - program_weight) * exp(-miles / geo_scale_miles)
+
+with the geographic term 0 for companies without a US location. Candidates
+come from an inverted program -> schools index, and companies with the same
+demand vector are scored together: one candidate set, one program-score
+vector, one (companies x candidates) distance matrix per group.
+
+Usage:
+  engine = MatchmakingEngine(load_hex_schools())
+  matches = engine.match(load_fabtech(), k=10)   # one list of SchoolMatch per company
+
+  # match all three databases, write data/analysis/company_school_matches.csv
+  # and report throughput against a per-company loop
+  python scripts/matchmaking_engine.py [--k 10] [--out <csv>]
+"""
+
+import csv
+import math
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from gazetteer import default_gazetteer, parse_us_location, state_code
+from hex_tiles import HexSchool, load_hex_schools
+from program_taxonomy import Taxonomy, default_taxonomy
+from school_index import chord_to_miles, haversine_miles, unit_vectors
+
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+RAW_DIR = os.path.join(REPO_ROOT, "data", "raw")
+FABTECH_CSV = os.path.join(RAW_DIR, "fabtech_full_database.csv")
+AUSA_CSV = os.path.join(RAW_DIR, "ausa_exhibitors.csv")
+FULL_DB_CSV = os.path.join(RAW_DIR, "Full DB-All Records_scored.csv")
+OUTPUT_CSV = os.path.join(REPO_ROOT, "data", "analysis", "company_school_matches.csv")
+
+PROGRAM_WEIGHT = 0.7
+GEO_SCALE_MILES = 150.0
+
+
+# ============================================================================
+# PROGRAM DEMAND
+# ============================================================================
+
+@dataclass
+class Company:
+    source: str
+    id: str
+    name: str
+    labels: List[str] = field(default_factory=list)
+    description: str = ""
+    city: Optional[str] = None
+    state: Optional[str] = None
+
+
+def demand_vector(company: Company, taxonomy: Optional[Taxonomy] = None) -> np.ndarray:
+    """
+    Votes per taxonomy program ID from the company's labels, or from its
+    description when the labels name no program
+    """
+    taxonomy = taxonomy or default_taxonomy()
+    vector = taxonomy.vector(company.labels)
+    if not vector.any() and company.description:
+        vector = taxonomy.vector(company.description)
+    return vector
+
+
+# ============================================================================
+# LOADERS
+# ============================================================================
+
+def _text(value) -> str:
+    return "" if value is None or (isinstance(value, float) and math.isnan(value)) else str(value).strip()
+
+
+def load_fabtech(path: str = FABTECH_CSV) -> List[Company]:
+    df = pd.read_csv(path, dtype=str)
+    companies = []
+    for row in df.to_dict("records"):
+        place = parse_us_location(_text(row.get("hq_location_detailed")))
+        if place is None and state_code(_text(row.get("location_parsed.state"))):
+            place = (_text(row.get("location_parsed.city")) or None, state_code(row["location_parsed.state"]))
+        city, state = place if place and place[1] else (None, None)
+        companies.append(Company(
+            "fabtech", _text(row.get("id")), _text(row.get("company_name")),
+            labels=[x for x in (_text(row.get("industry")), _text(row.get("industry_category"))) if x],
+            city=city, state=state,
+        ))
+    return companies
+
+
+def load_ausa(path: str = AUSA_CSV) -> List[Company]:
+    df = pd.read_csv(path, dtype=str)
+    companies = []
+    for i, row in enumerate(df.to_dict("records")):
+        state = state_code(_text(row.get("State/Province")))
+        country = _text(row.get("Country")).lower()
+        us = country in ("united states", "usa", "us", "")
+        companies.append(Company(
+            "ausa", f"ausa_{i}", _text(row.get("Company Name")),
+            description=_text(row.get("Description")),
+            city=(_text(row.get("City")) or None) if us and state else None,
+            state=state if us else None,
+        ))
+    return companies
+
+
+def load_full_db(path: str = FULL_DB_CSV) -> List[Company]:
+    df = pd.read_csv(path, dtype=str)
+    companies = []
+    for i, row in enumerate(df.to_dict("records")):
+        place = parse_us_location(_text(row.get("Location")))
+        city, state = place if place else (None, None)
+        companies.append(Company(
+            "full_db", f"fulldb_{i}", _text(row.get("Name")),
+            labels=[c.strip() for c in _text(row.get("Categories")).split(",") if c.strip()],
+            description=_text(row.get("Description")),
+            city=city, state=state,
+        ))
+    return companies
+
+
+# ============================================================================
+# ENGINE
+# ============================================================================
+
+@dataclass
+class SchoolMatch:
+    school: HexSchool
+    score: float
+    program_score: float
+    miles: Optional[float]
+    programs: List[str]
+
+
+class MatchmakingEngine:
+    def __init__(self, schools: Sequence[HexSchool], program_weight: float = PROGRAM_WEIGHT,
+                 geo_scale_miles: float = GEO_SCALE_MILES, taxonomy: Optional[Taxonomy] = None):
+        self.schools = list(schools)
+        self.program_weight = program_weight
+        self.geo_scale_miles = geo_scale_miles
+        self.taxonomy = taxonomy or default_taxonomy()
+
+        # School x program-ID matrix; all joins below are on taxonomy IDs
+        self.programs = self.taxonomy.programs
+        self.offered = self.taxonomy.membership(s.programs for s in self.schools)
+        # Inverted index: program -> schools offering it
+        self.program_schools = [np.flatnonzero(self.offered[:, j]) for j in range(len(self.programs))]
+        self.points = unit_vectors([s.lat for s in self.schools], [s.lon for s in self.schools])
+
+        # Fallback company location when only the state is known: median school position there
+        by_state: Dict[str, List[int]] = {}
+        for i, school in enumerate(self.schools):
+            by_state.setdefault(school.state, []).append(i)
+        self.state_centers = {
+            state: (float(np.median([self.schools[i].lat for i in idx])),
+                    float(np.median([self.schools[i].lon for i in idx])))
+            for state, idx in by_state.items()
+        }
+
+    def locate(self, company: Company) -> Optional[Tuple[float, float]]:
+        """(lat, lon) for a company: gazetteer city, else its state's center, else None"""
+        if not company.state:
+            return None
+        if company.city:
+            found = default_gazetteer().lookup(company.city, company.state)
+            if found:
+                return found
+        return self.state_centers.get(company.state)
+
+    def match(self, companies: Sequence[Company], k: int = 10) -> List[List[SchoolMatch]]:
+        """Top-k schools for every company, best first (empty when it demands nothing we teach)"""
+        demands = np.stack([demand_vector(c, self.taxonomy) for c in companies]) if companies else \
+            np.zeros((0, len(self.programs)), dtype=np.float64)
+        locations = [self.locate(c) for c in companies]
+
+        groups: Dict[bytes, List[int]] = {}
+        for i, vector in enumerate(demands):
+            if vector.any():
+                groups.setdefault(vector.tobytes(), []).append(i)
+
+        results: List[List[SchoolMatch]] = [[] for _ in companies]
+        for members in groups.values():
+            demand = demands[members[0]]
+            wanted = np.flatnonzero(demand)
+            candidates = np.unique(np.concatenate([self.program_schools[j] for j in wanted]))
+            if not len(candidates):
+                continue
+            program_score = self.offered[candidates] @ demand / demand.sum()
+
+            located = [i for i in members if locations[i] is not None]
+            miles = np.full((len(members), len(candidates)), np.nan)
+            if located:
+                q = unit_vectors([locations[i][0] for i in located], [locations[i][1] for i in located])
+                chord = np.sqrt(np.maximum(2.0 - 2.0 * (q @ self.points[candidates].T), 0.0))
+                rows = [members.index(i) for i in located]
+                miles[rows] = chord_to_miles(chord)
+            geo = np.where(np.isnan(miles), 0.0, np.exp(-np.nan_to_num(miles) / self.geo_scale_miles))
+            scores = self.program_weight * program_score[None, :] + (1 - self.program_weight) * geo
+
+            # Stable sort: ties go to the lower school index, as in match_one_by_one
+            best = np.argsort(-scores, axis=1, kind="stable")[:, :k]
+            for row, i in enumerate(members):
+                results[i] = [
+                    SchoolMatch(
+                        school=self.schools[candidates[c]],
+                        score=float(scores[row, c]),
+                        program_score=float(program_score[c]),
+                        miles=None if np.isnan(miles[row, c]) else float(miles[row, c]),
+                        programs=[self.programs[j] for j in wanted if self.offered[candidates[c], j]],
+                    )
+                    for c in best[row]
+                ]
+        return results
+
+    def match_one_by_one(self, companies: Sequence[Company], k: int = 10) -> List[List[Tuple[str, float]]]:
+        """Reference per-company loop over every school (haversine per pair)"""
+        offered_sets = [set(np.flatnonzero(row)) for row in self.offered]
+        out = []
+        for company in companies:
+            vector = demand_vector(company, self.taxonomy)
+            demand = {j: float(vector[j]) for j in np.flatnonzero(vector)}
+            total = sum(demand.values())
+            location = self.locate(company)
+            scored = []
+            for i, school in enumerate(self.schools):
+                overlap = sum(w for j, w in demand.items() if j in offered_sets[i])
+                if not overlap:
+                    continue
+                geo = 0.0
+                if location is not None:
+                    geo = math.exp(-haversine_miles(location[0], location[1], school.lat, school.lon)
+                                   / self.geo_scale_miles)
+                scored.append((self.program_weight * overlap / total + (1 - self.program_weight) * geo, i))
+            scored.sort(key=lambda item: (-item[0], item[1]))
+            out.append([(self.schools[i].name, s) for s, i in scored[:k]])
+        return out
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def write_matches(path: str, companies: Sequence[Company], matches: Sequence[List[SchoolMatch]]):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["source", "company_id", "company_name", "company_state", "rank", "institution_name",
+                         "school_city", "school_state", "score", "program_score", "miles", "shared_programs"])
+        for company, found in zip(companies, matches):
+            for rank, m in enumerate(found, 1):
+                writer.writerow([
+                    company.source, company.id, company.name, company.state or "", rank, m.school.name,
+                    m.school.city, m.school.state, f"{m.score:.4f}", f"{m.program_score:.4f}",
+                    "" if m.miles is None else f"{m.miles:.1f}", "|".join(m.programs),
+                ])
+
+
+def main() -> int:
+    def option(name: str, default: str) -> str:
+        return sys.argv[sys.argv.index(name) + 1] if name in sys.argv else default
+
+    k = int(option("--k", "10"))
+    out_path = option("--out", OUTPUT_CSV)
+
+    start = time.perf_counter()
+    engine = MatchmakingEngine(load_hex_schools())
+    print(f"Engine over {len(engine.schools)} schools, {len(engine.programs)} programs "
+          f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    companies: List[Company] = []
+    all_matches: List[List[SchoolMatch]] = []
+    for name, loader in (("FABTECH", load_fabtech), ("AUSA", load_ausa), ("Full DB", load_full_db)):
+        batch = loader()
+        start = time.perf_counter()
+        matches = engine.match(batch, k=k)
+        elapsed = time.perf_counter() - start
+        matched = sum(1 for m in matches if m)
+        located = sum(1 for c in batch if c.state)
+        print(f"  {name:8s} {len(batch):5d} companies ({located} US-located, {matched} matched) "
+              f"in {elapsed * 1000:7.1f} ms  ({len(batch) / elapsed:,.0f} companies/s)")
+        companies += batch
+        all_matches += matches
+
+    fabtech = [c for c in companies if c.source == "fabtech"]
+    start = time.perf_counter()
+    batched = engine.match(fabtech, k=k)
+    t_batched = time.perf_counter() - start
+    start = time.perf_counter()
+    reference = engine.match_one_by_one(fabtech, k=k)
+    t_loop = time.perf_counter() - start
+    same = all(
+        [m.school.name for m in b] == [name for name, _ in r] for b, r in zip(batched, reference)
+    )
+    print(f"FABTECH top-{k}: batched {t_batched * 1000:.1f} ms vs per-company loop {t_loop * 1000:.0f} ms "
+          f"({t_loop / t_batched:.0f}x), identical rankings: {same}")
+
+    write_matches(out_path, companies, all_matches)
+    print(f"📁 {sum(map(len, all_matches))} matches saved to: {out_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
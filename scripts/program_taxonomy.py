@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Industry / category / signal vocabulary -> canonical program taxonomy.
+
+The employer files describe demand in their own words: FABTECH `industry` and
+`industry_category`, Full DB `Categories` and `segment`, lead-score `Positive
+Signals`, free-text descriptions. The schools and the analyzer use program
+names (matchmaking_index.csv programs, program_categories,
+supply_chain_critical_skills). Every synonym rule here names the canonical
+programs a phrase implies; all rules are compiled into one word-level trie, so
+a record is tokenized once and mapped in a single left-to-right pass however
+many rules there are (longest phrase wins at each position).
+
+Programs are identified by their integer position in PROGRAMS; downstream code
+builds its matrices over these IDs instead of comparing strings.
+
+Usage:
+  taxonomy = default_taxonomy()
+  taxonomy.program_ids("Sheet Metal, Tool; Die & Mold Making")   # [14, 9, 0]
+  taxonomy.vector(["Machinery", "Manufacturing & Machinery"])    # float counts per program ID
+
+  # map every employer record, per-source coverage and throughput vs per-rule searches
+  python scripts/program_taxonomy.py
+"""
+
+import os
+import re
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+
+# Canonical programs: the school program names plus the analyzer's extra skills
+PROGRAMS: Tuple[str, ...] = (
+    "CAD/CAM Drafting",
+    "CDL Training",
+    "Construction",
+    "Diesel & Automotive Tech",
+    "Electrical",
+    "Electronics",
+    "Electronics Technology",
+    "HVAC",
+    "Machine & Mechanical Systems",
+    "Machining",
+    "Manufacturing Technology",
+    "Mechatronics",
+    "Plumbing & Pipefitting",
+    "Robotics & Automation",
+    "Welding",
+    "Woodworking & Carpentry",
+)
+
+# Phrase -> programs it implies. Phrases are matched case-insensitively on word
+# boundaries; a trailing "*" makes a stem ("weld*" matches weld, welder, welding).
+SYNONYMS: Dict[str, Tuple[str, ...]] = {
+    # Program names and their spellings in the analyzer / school data
+    "cad/cam drafting": ("CAD/CAM Drafting",),
+    "cdl training": ("CDL Training",),
+    "cdl": ("CDL Training",),
+    "commercial driv*": ("CDL Training",),
+    "truck driv*": ("CDL Training",),
+    "diesel & automotive tech": ("Diesel & Automotive Tech",),
+    "diesel mechanics": ("Diesel & Automotive Tech",),
+    "diesel*": ("Diesel & Automotive Tech",),
+    "automotive": ("Diesel & Automotive Tech", "Welding", "Manufacturing Technology"),
+    "electronics technology": ("Electronics Technology",),
+    "machine & mechanical systems": ("Machine & Mechanical Systems",),
+    "manufacturing technology": ("Manufacturing Technology",),
+    "plumbing & pipefitting": ("Plumbing & Pipefitting",),
+    "plumb*": ("Plumbing & Pipefitting",),
+    "pipefitt*": ("Plumbing & Pipefitting",),
+    "robotics & automation": ("Robotics & Automation",),
+    "robot*": ("Robotics & Automation", "Mechatronics"),
+    "woodworking & carpentry": ("Woodworking & Carpentry",),
+    "woodworking": ("Woodworking & Carpentry",),
+    "carpent*": ("Woodworking & Carpentry",),
+    "mechatronic*": ("Mechatronics",),
+    "hvac": ("HVAC",),
+    "climate control": ("HVAC",),
+    "thermal management": ("HVAC",),
+    "weld*": ("Welding",),
+    "machining": ("Machining", "CAD/CAM Drafting"),
+    "machinist*": ("Machining",),
+    "machine shop": ("Machining",),
+    "cnc": ("Machining",),
+    "electronic*": ("Electronics", "Electronics Technology"),
+    "electrical": ("Electrical",),
+    "power systems": ("Electrical",),
+    "power generation": ("Electrical",),
+    "power distribution": ("Electrical",),
+    "construction": ("Construction", "Welding", "Electrical", "Plumbing & Pipefitting"),
+    "construct*": ("Construction",),
+    "drafting": ("CAD/CAM Drafting",),
+    "cad": ("CAD/CAM Drafting",),
+    "engineering design": ("CAD/CAM Drafting",),
+    "automation": ("Robotics & Automation", "Mechatronics"),
+    "autonom*": ("Robotics & Automation", "Mechatronics"),
+    "vehicle*": ("Diesel & Automotive Tech",),
+    "engine": ("Diesel & Automotive Tech",),
+    "manufactur*": ("Manufacturing Technology",),
+    "fabricat*": ("Welding", "Manufacturing Technology"),
+    "metal*": ("Welding", "Manufacturing Technology"),
+
+    # FABTECH industry
+    "machinery": ("Machining", "Machine & Mechanical Systems", "Manufacturing Technology", "CAD/CAM Drafting"),
+    "mechanical or industrial engineering": ("Machine & Mechanical Systems", "CAD/CAM Drafting",
+                                             "Manufacturing Technology", "Mechatronics"),
+    "mining & metals": ("Welding", "Machining"),
+    "electrical/electronic manufacturing": ("Electronics", "Electronics Technology", "Electrical"),
+    "industrial automation": ("Robotics & Automation", "Mechatronics", "Electrical"),
+    "building materials": ("Construction", "Woodworking & Carpentry"),
+    "oil & energy": ("Welding", "Plumbing & Pipefitting", "Electrical"),
+    "utilities": ("Electrical", "Plumbing & Pipefitting"),
+    "facilities services": ("HVAC", "Electrical", "Plumbing & Pipefitting"),
+    "environmental services": ("HVAC",),
+    "plastics": ("Manufacturing Technology",),
+    "packaging & containers": ("Manufacturing Technology",),
+    "chemicals": ("Manufacturing Technology",),
+    "glass, ceramics & concrete": ("Construction", "Manufacturing Technology"),
+    "aviation & aerospace": ("Machining", "Electronics Technology", "Mechatronics"),
+    "airlines/aviation": ("Diesel & Automotive Tech", "Electronics Technology"),
+    "semiconductors": ("Electronics Technology", "Electronics"),
+    "medical devices": ("Machining", "Manufacturing Technology"),
+
+    # FABTECH industry_category
+    "manufacturing & machinery": ("Machining", "Manufacturing Technology", "Machine & Mechanical Systems"),
+    "metals & materials": ("Welding", "Machining"),
+    "construction & building": ("Construction", "Welding", "Electrical", "HVAC", "Plumbing & Pipefitting"),
+    "transportation & aerospace": ("Diesel & Automotive Tech", "Machining"),
+    "chemicals & energy": ("Manufacturing Technology", "Electrical"),
+    "electronics & technology": ("Electronics", "Electronics Technology"),
+    "environmental & sustainability": ("HVAC",),
+
+    # Full DB Categories
+    "fabrication": ("Welding", "Manufacturing Technology"),
+    "sheet metal": ("Welding", "Machining"),
+    "electro-mechanical assembly": ("Electronics", "Mechatronics", "Electrical"),
+    "engineering & design services": ("CAD/CAM Drafting",),
+    "stamping": ("Manufacturing Technology", "Machining"),
+    "die casting": ("Manufacturing Technology", "Machining"),
+    "investment casting": ("Manufacturing Technology", "Machining"),
+    "sand mold casting": ("Manufacturing Technology", "Machining"),
+    "forging": ("Manufacturing Technology", "Machining"),
+    "extrusions": ("Manufacturing Technology",),
+    "wire harness": ("Electrical", "Electronics"),
+    "3d printing": ("Manufacturing Technology", "CAD/CAM Drafting"),
+    "tube modification": ("Manufacturing Technology", "Welding"),
+    "springs & wire forming": ("Manufacturing Technology",),
+    "gears": ("Machining", "Machine & Mechanical Systems"),
+    "tool; die & mold making": ("Machining", "CAD/CAM Drafting"),
+    "die & mold making": ("Machining", "CAD/CAM Drafting"),
+    "tool": ("Machining",),
+    "injection molding": ("Manufacturing Technology",),
+    "compression molding": ("Manufacturing Technology",),
+    "rtv molding": ("Manufacturing Technology",),
+    "structural foam molding": ("Manufacturing Technology",),
+    "blow molding": ("Manufacturing Technology",),
+    "rotational molding": ("Manufacturing Technology",),
+    "thermoforming": ("Manufacturing Technology",),
+    "printed circuit boards": ("Electronics Technology", "Electronics"),
+
+    # Full DB segment
+    "aerospace/defense": ("Machining", "Electronics Technology"),
+    "general manufacturing": ("Manufacturing Technology",),
+    "medical": ("Machining", "Manufacturing Technology"),
+
+    # Lead-score Positive Signals (process/compliance signals like itar, erp, mes imply no program)
+    "additive manufacturing": ("Manufacturing Technology", "CAD/CAM Drafting"),
+    "assembly": ("Manufacturing Technology",),
+    "composite*": ("Manufacturing Technology",),
+    "pcb*": ("Electronics Technology",),
+    "electronics manufacturing services": ("Electronics", "Electronics Technology"),
+}
+
+
+_TOKEN = re.compile(r"[a-z0-9]+|\|")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word tokens; "|" is kept as a field separator no phrase can span"""
+    return _TOKEN.findall(text.lower())
+
+
+def _phrase_pattern(phrase: str) -> str:
+    """Stand-alone regex for one phrase (the per-rule baseline in the benchmark)"""
+    words = tokenize(phrase.rstrip("*"))
+    tail = r"\w*" if phrase.endswith("*") else r"\b"
+    return r"\b" + r"\W+".join(re.escape(w) for w in words) + tail
+
+
+class Taxonomy:
+    """
+    All synonym rules compiled into one word-level trie: phrases are keyed by
+    their first token (stems resolved once per distinct token and memoized),
+    and a record's tokens are scanned left to right, taking the longest phrase
+    that matches at each position.
+    """
+
+    def __init__(self, synonyms: Dict[str, Tuple[str, ...]] = SYNONYMS, programs: Sequence[str] = PROGRAMS):
+        self.programs = tuple(programs)
+        self.program_index = {p: i for i, p in enumerate(self.programs)}
+        self._lower_index = {p.lower(): i for i, p in enumerate(self.programs)}
+        # Longest phrase first, so "tool; die & mold making" wins over "tool"
+        self.phrases = sorted(synonyms, key=lambda p: (-len(tokenize(p.rstrip("*"))), -len(p), p))
+        self.rule_ids: List[Tuple[int, ...]] = [
+            tuple(self.program_index[p] for p in synonyms[phrase]) for phrase in self.phrases
+        ]
+        # rule -> (tokens, last token is a stem)
+        self._rules = [(tokenize(p.rstrip("*")), p.endswith("*")) for p in self.phrases]
+        self._by_first: Dict[str, List[int]] = {}
+        self._stem_first: List[Tuple[str, int]] = []
+        for rule, (tokens, stem) in enumerate(self._rules):
+            if stem and len(tokens) == 1:
+                self._stem_first.append((tokens[0], rule))
+            else:
+                self._by_first.setdefault(tokens[0], []).append(rule)
+        self._candidates: Dict[str, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.programs)
+
+    def _starting_with(self, token: str) -> List[int]:
+        """Rules whose first token matches `token`, longest first (memoized per token)"""
+        found = self._candidates.get(token)
+        if found is None:
+            found = self._by_first.get(token, []) + [r for stem, r in self._stem_first if token.startswith(stem)]
+            found.sort()
+            self._candidates[token] = found
+        return found
+
+    def _matches_at(self, tokens: List[str], i: int, rule: int) -> bool:
+        words, stem = self._rules[rule]
+        if i + len(words) > len(tokens):
+            return False
+        last = len(words) - 1
+        for j, word in enumerate(words):
+            token = tokens[i + j]
+            if token != word and not (stem and j == last and token.startswith(word)):
+                return False
+        return True
+
+    def program_id(self, name: str) -> Optional[int]:
+        """ID of a canonical program name (case-insensitive), else of the first program a synonym maps to"""
+        exact = self._lower_index.get(str(name).strip().lower())
+        if exact is not None:
+            return exact
+        ids = self.program_ids(name)
+        return ids[0] if ids else None
+
+    def _text(self, text: Union[str, Iterable[str]]) -> str:
+        return text if isinstance(text, str) else " | ".join(t for t in text if t)
+
+    def rule_hits(self, text: Union[str, Iterable[str]]) -> List[int]:
+        """Index (into self.phrases) of every rule matched, in one left-to-right pass"""
+        tokens = tokenize(self._text(text))
+        hits, i = [], 0
+        while i < len(tokens):
+            for rule in self._starting_with(tokens[i]):
+                if self._matches_at(tokens, i, rule):
+                    hits.append(rule)
+                    i += len(self._rules[rule][0])
+                    break
+            else:
+                i += 1
+        return hits
+
+    def vector(self, text: Union[str, Iterable[str]]) -> np.ndarray:
+        """Per-program vote counts for a record: each matched phrase votes for its programs"""
+        counts = np.zeros(len(self.programs), dtype=np.float64)
+        for rule in self.rule_hits(text):
+            for pid in self.rule_ids[rule]:
+                counts[pid] += 1.0
+        return counts
+
+    def program_ids(self, text: Union[str, Iterable[str]]) -> List[int]:
+        """Distinct program IDs a record maps to, in first-seen order"""
+        seen: Dict[int, None] = {}
+        for rule in self.rule_hits(text):
+            for pid in self.rule_ids[rule]:
+                seen.setdefault(pid, None)
+        return list(seen)
+
+    def program_names(self, text: Union[str, Iterable[str]]) -> List[str]:
+        return [self.programs[i] for i in self.program_ids(text)]
+
+    def membership(self, program_lists: Iterable[Iterable[str]]) -> np.ndarray:
+        """(records x programs) 0/1 matrix from lists of canonical program names"""
+        rows = [[self.program_id(p) for p in programs] for programs in program_lists]
+        matrix = np.zeros((len(rows), len(self.programs)), dtype=np.float64)
+        for i, ids in enumerate(rows):
+            matrix[i, [j for j in ids if j is not None]] = 1.0
+        return matrix
+
+
+_default: Optional[Taxonomy] = None
+
+
+def default_taxonomy() -> Taxonomy:
+    """The built-in rules, compiled once per process"""
+    global _default
+    if _default is None:
+        _default = Taxonomy()
+    return _default
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def _records() -> Dict[str, List[List[str]]]:
+    import pandas as pd
+
+    raw = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "raw")
+
+    def fields(path: str, columns: Sequence[str]) -> List[List[str]]:
+        df = pd.read_csv(os.path.join(raw, path), dtype=str, usecols=list(columns)).fillna("")
+        return df[list(columns)].values.tolist()
+
+    return {
+        "FABTECH industry/category": fields("fabtech_full_database.csv", ["industry", "industry_category"]),
+        "Full DB categories/segment": fields("Full DB-All Records_scored.csv", ["Categories", "segment"]),
+        "Lead-score signals": fields("lead_scores.csv", ["Positive Signals"]),
+        "AUSA descriptions": fields("ausa_exhibitors.csv", ["Description"]),
+    }
+
+
+def main() -> int:
+    start = time.perf_counter()
+    taxonomy = default_taxonomy()
+    print(f"Compiled {len(taxonomy.phrases)} synonym rules over {len(taxonomy)} programs "
+          f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    # Baseline: one regex search per rule per record
+    separate = [re.compile(_phrase_pattern(p), re.IGNORECASE) for p in taxonomy.phrases]
+
+    for source, records in _records().items():
+        texts = [taxonomy._text(r) for r in records]
+        start = time.perf_counter()
+        mapped = [taxonomy.program_ids(t) for t in texts]
+        t_one = time.perf_counter() - start
+        start = time.perf_counter()
+        for t in texts:
+            [i for i, rx in enumerate(separate) if rx.search(t)]
+        t_rules = time.perf_counter() - start
+        covered = sum(1 for m in mapped if m)
+        print(f"  {source:28s} {len(texts):5d} records, {covered:5d} mapped | one pass {t_one * 1000:6.1f} ms, "
+              f"per-rule searches {t_rules * 1000:7.1f} ms ({t_rules / t_one:.0f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
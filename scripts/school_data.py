@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Loading, cleaning and deduplicating the raw trade school CSV.
+
+Shared by tradeschool-analysis.py and the geocoding/favicon scripts. The
+cleaned frame has the canonical analysis columns (Institution Name, Address,
+Programs, Contact Email, Website, Contact Name, Contacts, State, City,
+Program_List, Program_Count) and can be served from a content-hashed cache
+(see dataset_cache.py) so repeat runs skip parsing entirely.
+"""
+
+import itertools
+import time
+from typing import Optional, Set
+
+import numpy as np
+import pandas as pd
+
+from dataset_cache import cached_columns, cached_frame
+from school_parsing import (
+    extract_cities, extract_states, normalize_program_series, parse_phones, program_lists
+)
+
+
+# Bump whenever clean_school_frame / fold_contact_rows / dedup output changes,
+# so cached cleaned frames are rebuilt.
+CLEANING_VERSION = "1"
+
+
+SCHOOL_COLUMN_ALIASES = {
+    "Institution Name": "institution_name",
+    "Address": "address",
+    "Programs": "programs",
+    "Contact Email": "contact_email",
+    "Website": "website",
+    "Contact Name": "contact_name",
+}
+
+
+CONTACT_COLUMN_ALIASES = {
+    "name": ("Contact Name", "contact_name"),
+    "position": ("Position", "contact_position"),
+    "email": ("Contact Email", "contact_email"),
+    "phone": ("Contact Number", "contact_phone"),
+}
+
+
+def _institution_names(raw: pd.DataFrame) -> Optional[pd.Series]:
+    return raw.get("Institution Name", raw.get("institution_name"))
+
+
+def is_institution_row(raw: pd.DataFrame) -> np.ndarray:
+    """True for rows that start an institution, False for contact-only continuation rows"""
+    names = _institution_names(raw)
+    if names is None:
+        return np.ones(len(raw), dtype=bool)
+    return (names.notna() & (names.astype(str).str.strip() != "")).to_numpy()
+
+
+def fold_contact_rows(raw: pd.DataFrame) -> pd.DataFrame:
+    """
+    Attach continuation rows (blank Institution Name, extra contact only) to the
+    institution above them, in one linear pass. Returns the institution rows with a
+    `Contacts` list of {name, position, email, phone} dicts; continuation rows that
+    precede any institution are dropped.
+    """
+    head = is_institution_row(raw)
+    group = np.cumsum(head)
+    
+    contacts = pd.DataFrame(index=raw.index)
+    for key, names in CONTACT_COLUMN_ALIASES.items():
+        source = next((raw[c] for c in names if c in raw.columns), None)
+        contacts[key] = source if source is not None else None
+    contacts["phone"] = parse_phones(contacts["phone"])
+    contacts = contacts.astype(object).where(contacts.notna(), None)
+    
+    keep = contacts.notna().any(axis=1).to_numpy() & (group > 0)
+    records = pd.Series(contacts[keep].to_dict("records"), index=contacts.index[keep], dtype=object)
+    by_group = records.groupby(group[keep]).agg(list)
+    
+    folded = raw[head].copy()
+    folded["Contacts"] = [by_group.get(g, []) for g in group[head]]
+    return folded
+
+
+def clean_school_frame(raw: pd.DataFrame) -> pd.DataFrame:
+    """Clean and standardize raw school rows into the canonical analysis columns"""
+    raw = fold_contact_rows(raw)
+    
+    def col(name):
+        missing = pd.Series(index=raw.index, dtype=object)
+        return raw.get(name, raw.get(SCHOOL_COLUMN_ALIASES[name], missing))
+    
+    df = pd.DataFrame(index=raw.index)
+    df["Institution Name"] = col("Institution Name").astype(str).str.strip()
+    df["Address"] = col("Address").astype(str).str.strip()
+    df["Programs"] = normalize_program_series(col("Programs"))
+    df["Contact Email"] = col("Contact Email")
+    df["Website"] = col("Website")
+    df["Contact Name"] = col("Contact Name")
+    df["Contacts"] = raw["Contacts"]
+    
+    # Extract geographic info
+    df["State"] = extract_states(df["Address"])
+    df["City"] = extract_cities(df["Address"])
+    
+    # Create program lists
+    df["Program_List"] = program_lists(df["Programs"])
+    df["Program_Count"] = df["Program_List"].str.len()
+    
+    # Remove empty rows
+    return df[~(df["Institution Name"].isna() & df["Address"].isna())].copy()
+
+
+LOCATION_PARTS = ("location_parsed.city", "location_parsed.state", "location_parsed.country")
+
+
+def canonical_school_columns(raw: pd.DataFrame) -> pd.DataFrame:
+    """
+    raw (one output row per input row, nothing folded or dropped) plus whichever
+    of Institution Name / Address / City / State / Program_Count it lacks, taken
+    from the snake_case aliases or derived. City and State come from the address,
+    or from the location_parsed.* parts (which are its comma-split pieces) when
+    there is no address column.
+    """
+    df = raw.copy()
+    for name, alias in SCHOOL_COLUMN_ALIASES.items():
+        if name not in df.columns and alias in df.columns:
+            df[name] = df[alias]
+
+    if "Address" in df.columns:
+        address = df["Address"]
+    elif any(c in df.columns for c in LOCATION_PARTS):
+        parts = df[[c for c in LOCATION_PARTS if c in df.columns]].astype(object)
+        address = parts.apply(lambda r: ", ".join(str(v).strip() for v in r if pd.notna(v)), axis=1)
+    else:
+        address = pd.Series(index=df.index, dtype=object)
+    if "State" not in df.columns:
+        df["State"] = extract_states(address)
+    if "City" not in df.columns:
+        df["City"] = extract_cities(address)
+    if "Program_Count" not in df.columns and "Programs" in df.columns:
+        df["Program_Count"] = program_lists(df["Programs"]).str.len()
+    return df
+
+
+def school_dedup_keys(df: pd.DataFrame) -> pd.Series:
+    """Case-insensitive name + address key used to drop duplicate institutions"""
+    return (
+        df["Institution Name"].fillna("").str.lower().str.strip() + " | " +
+        df["Address"].fillna("").str.lower().str.strip()
+    )
+
+
+def iter_school_chunks(csv_path: str, chunksize: int):
+    """
+    Stream a raw school CSV as cleaned, globally deduplicated chunks.
+    Only the columns the analysis uses are parsed, and dedup state is one
+    64-bit hash per distinct institution, so memory stays bounded by the
+    chunk size plus the cleaned output. The last institution of each chunk is
+    held back so continuation rows in the next chunk still fold into it.
+    """
+    wanted = set(SCHOOL_COLUMN_ALIASES) | set(SCHOOL_COLUMN_ALIASES.values())
+    wanted |= {c for names in CONTACT_COLUMN_ALIASES.values() for c in names}
+    seen: Set[int] = set()
+    pending = None
+    for raw in itertools.chain(pd.read_csv(csv_path, chunksize=chunksize, usecols=lambda c: c in wanted), [None]):
+        if raw is None:
+            if pending is None:
+                break
+            ready = pending
+        else:
+            if pending is not None:
+                raw = pd.concat([pending, raw])
+            heads = np.flatnonzero(is_institution_row(raw))
+            split = heads[-1] if len(heads) else 0
+            ready, pending = raw.iloc[:split], raw.iloc[split:]
+            if ready.empty:
+                continue
+        df = clean_school_frame(ready)
+        hashes = pd.util.hash_pandas_object(school_dedup_keys(df), index=False).to_numpy()
+        # Set membership keeps the global dedup O(rows) instead of re-scanning every earlier hash per chunk
+        fresh = np.zeros(len(hashes), dtype=bool)
+        for i, h in enumerate(hashes.tolist()):
+            if h not in seen:
+                seen.add(h)
+                fresh[i] = True
+        yield df[fresh]
+
+
+def load_school_data(csv_path: str, chunksize: Optional[int] = None) -> pd.DataFrame:
+    """Load, clean and deduplicate the raw school CSV (streamed when chunksize is set)"""
+    if chunksize:
+        chunks = list(iter_school_chunks(csv_path, chunksize))
+        return pd.concat(chunks) if chunks else clean_school_frame(pd.DataFrame(columns=list(SCHOOL_COLUMN_ALIASES)))
+    df = clean_school_frame(pd.read_csv(csv_path))
+    return df[~school_dedup_keys(df).duplicated()].copy()
+
+
+def load_cleaned_schools(csv_path: str, chunksize: Optional[int] = None,
+                         cache_dir: Optional[str] = None, refresh: bool = False) -> pd.DataFrame:
+    """
+    Cleaned, deduplicated school frame for csv_path, served from the columnar
+    cache when the file and CLEANING_VERSION are unchanged.
+    """
+    start = time.perf_counter()
+    df = cached_frame(
+        csv_path, lambda: load_school_data(csv_path, chunksize=chunksize),
+        version=CLEANING_VERSION, cache_dir=cache_dir, refresh=refresh
+    )
+    print(f"   Loaded {len(df)} cleaned institutions in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return df
+
+
+def cached_school_columns(csv_path: str, columns, cache_dir: Optional[str] = None) -> Optional[pd.DataFrame]:
+    """Selected columns of an up-to-date cleaned cache, or None if it has not been built"""
+    return cached_columns(csv_path, CLEANING_VERSION, list(columns), cache_dir=cache_dir)
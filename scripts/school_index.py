@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Spatial index over the geocoded schools: k-nearest and radius queries with
+program filters, single or batched.
+
+Schools are placed on the unit sphere as 3-D vectors and held in a static
+KD-tree (NumPy arrays, leaf buckets of `leaf_size`). Straight-line chord
+distance is monotonic in great-circle distance, so box pruning on the chord is
+exact and results are reported as great-circle miles. Program filters are a
+boolean school x program matrix, applied inside the leaves so pruning still
+holds for filtered k-nearest queries.
+
+Batched radius queries walk the leaves once and test every query point
+against each leaf's box in one vectorized step; batched k-nearest runs the
+per-point search with the filter mask computed once.
+
+Schools come from hex_tiles.load_hex_schools (geocoded CSV joined to
+matchmaking_index.csv), the same list the hex tiles are built from.
+
+Usage:
+  index = SchoolIndex.from_csv()
+  index.within(41.5, -81.7, miles=50, programs=["Welding"])   # [(HexSchool, miles), ...]
+  index.nearest(41.5, -81.7, k=5)
+  index.within_many(points, miles=50, programs=["Welding"])   # one list per point
+
+  # index vs brute force on random query points
+  python scripts/school_index.py [--queries 2000] [--miles 50] [--program Welding]
+"""
+
+import heapq
+import math
+import sys
+import time
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from hex_tiles import GEO_CSV, PROGRAMS_CSV, HexSchool, load_hex_schools
+
+
+EARTH_RADIUS_MILES = 3958.8
+
+
+def unit_vectors(lats, lons) -> np.ndarray:
+    """(n, 3) unit-sphere coordinates for degree latitudes/longitudes"""
+    lat = np.radians(np.asarray(lats, dtype=np.float64))
+    lon = np.radians(np.asarray(lons, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+
+def miles_to_chord(miles: float) -> float:
+    return 2.0 * math.sin(min(miles / EARTH_RADIUS_MILES, math.pi) / 2.0)
+
+
+def chord_to_miles(chord):
+    return 2.0 * EARTH_RADIUS_MILES * np.arcsin(np.clip(np.asarray(chord) / 2.0, 0.0, 1.0))
+
+
+def haversine_miles(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance, one pair at a time (the brute-force baseline)"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * math.asin(min(1.0, math.sqrt(a)))
+
+
+class SchoolIndex:
+    """
+    Static KD-tree over schools. Node arrays: `start`/`stop` into the permuted
+    point order, bounding box `box_min`/`box_max`, children `left`/`right`
+    (-1 for leaves).
+    """
+
+    def __init__(self, schools: Sequence[HexSchool], leaf_size: int = 16):
+        self.schools = list(schools)
+        self.leaf_size = max(1, leaf_size)
+        points = unit_vectors([s.lat for s in self.schools], [s.lon for s in self.schools])
+
+        self.programs = sorted({p for s in self.schools for p in s.programs})
+        self._program_ids = {p.lower(): i for i, p in enumerate(self.programs)}
+        membership = np.zeros((len(self.schools), len(self.programs)), dtype=bool)
+        for i, school in enumerate(self.schools):
+            for p in school.programs:
+                membership[i, self._program_ids[p.lower()]] = True
+
+        self._build(points)
+        # Leaf-ordered copies, so a leaf is one contiguous slice
+        self.points = points[self.order]
+        self.membership = membership[self.order]
+
+    @classmethod
+    def from_csv(cls, geo_csv: str = GEO_CSV, programs_csv: str = PROGRAMS_CSV, leaf_size: int = 16) -> "SchoolIndex":
+        return cls(load_hex_schools(geo_csv, programs_csv), leaf_size=leaf_size)
+
+    def __len__(self) -> int:
+        return len(self.schools)
+
+    # ------------------------------------------------------------------ build
+
+    def _build(self, points: np.ndarray):
+        order = np.arange(len(points))
+        start, stop, left, right, box_min, box_max = [], [], [], [], [], []
+
+        def node(lo: int, hi: int) -> int:
+            idx = len(start)
+            block = points[order[lo:hi]]
+            start.append(lo)
+            stop.append(hi)
+            left.append(-1)
+            right.append(-1)
+            box_min.append(block.min(axis=0) if hi > lo else np.zeros(3))
+            box_max.append(block.max(axis=0) if hi > lo else np.zeros(3))
+            if hi - lo > self.leaf_size:
+                axis = int(np.argmax(box_max[idx] - box_min[idx]))
+                mid = (lo + hi) // 2
+                part = np.argpartition(block[:, axis], mid - lo)
+                order[lo:hi] = order[lo:hi][part]
+                left[idx] = node(lo, mid)
+                right[idx] = node(mid, hi)
+            return idx
+
+        node(0, len(points))
+        self.order = order
+        self.start = np.array(start)
+        self.stop = np.array(stop)
+        self.left = np.array(left)
+        self.right = np.array(right)
+        self.box_min = np.array(box_min)
+        self.box_max = np.array(box_max)
+        self.leaves = np.flatnonzero(self.left < 0)
+
+    # ---------------------------------------------------------------- filters
+
+    def program_mask(self, programs: Optional[Sequence[str]], match: str = "any") -> Optional[np.ndarray]:
+        """Leaf-ordered mask of schools offering any (or all) of `programs`; None = no filter"""
+        if match not in ("any", "all"):
+            raise ValueError(f"match must be 'any' or 'all', not {match!r}")
+        if not programs:
+            return None
+        ids = [self._program_ids.get(p.lower()) for p in programs]
+        if match == "all" and any(i is None for i in ids):
+            return np.zeros(len(self.schools), dtype=bool)
+        ids = [i for i in ids if i is not None]
+        if not ids:
+            return np.zeros(len(self.schools), dtype=bool)
+        columns = self.membership[:, ids]
+        return columns.all(axis=1) if match == "all" else columns.any(axis=1)
+
+    def _results(self, positions, chords) -> List[Tuple[HexSchool, float]]:
+        miles = chord_to_miles(chords)
+        return [(self.schools[self.order[p]], float(m)) for p, m in zip(positions, miles)]
+
+    # ---------------------------------------------------------------- queries
+
+    def _box_gap(self, nodes, q: np.ndarray) -> np.ndarray:
+        """Chord distance from q to each node's box (0 inside)"""
+        gap = np.maximum(self.box_min[nodes] - q, 0) + np.maximum(q - self.box_max[nodes], 0)
+        return np.sqrt((gap * gap).sum(axis=-1))
+
+    def _within_point(self, q: np.ndarray, chord: float, mask: Optional[np.ndarray]):
+        positions, chords = [], []
+        stack = [0]
+        while stack:
+            n = stack.pop()
+            if self._box_gap(n, q) > chord:
+                continue
+            if self.left[n] < 0:
+                lo, hi = self.start[n], self.stop[n]
+                d = np.sqrt(((self.points[lo:hi] - q) ** 2).sum(axis=1))
+                hit = d <= chord
+                if mask is not None:
+                    hit &= mask[lo:hi]
+                positions.append(np.flatnonzero(hit) + lo)
+                chords.append(d[hit])
+            else:
+                stack += [self.left[n], self.right[n]]
+        if not positions:
+            return np.array([], dtype=int), np.array([])
+        positions, chords = np.concatenate(positions), np.concatenate(chords)
+        ranked = np.argsort(chords, kind="stable")
+        return positions[ranked], chords[ranked]
+
+    def _nearest_point(self, q: np.ndarray, k: int, mask: Optional[np.ndarray]):
+        if k <= 0:
+            return [], np.empty(0)
+        best: List[Tuple[float, int]] = []  # max-heap of (-chord, position)
+        frontier = [(0.0, 0)]
+        while frontier:
+            gap, n = heapq.heappop(frontier)
+            if len(best) == k and gap > -best[0][0]:
+                break
+            if self.left[n] < 0:
+                lo, hi = self.start[n], self.stop[n]
+                d = np.sqrt(((self.points[lo:hi] - q) ** 2).sum(axis=1))
+                candidates = np.arange(lo, hi) if mask is None else np.flatnonzero(mask[lo:hi]) + lo
+                for p in candidates:
+                    c = float(d[p - lo])
+                    if len(best) < k:
+                        heapq.heappush(best, (-c, int(p)))
+                    elif c < -best[0][0]:
+                        heapq.heapreplace(best, (-c, int(p)))
+            else:
+                for child in (self.left[n], self.right[n]):
+                    heapq.heappush(frontier, (float(self._box_gap(child, q)), int(child)))
+        best.sort(key=lambda item: (-item[0], item[1]))
+        return [p for _, p in best], np.array([-c for c, _ in best])
+
+    def within(self, lat: float, lon: float, miles: float, programs: Optional[Sequence[str]] = None,
+               match: str = "any") -> List[Tuple[HexSchool, float]]:
+        """Schools within `miles` of (lat, lon), nearest first"""
+        q = unit_vectors([lat], [lon])[0]
+        return self._results(*self._within_point(q, miles_to_chord(miles), self.program_mask(programs, match)))
+
+    def nearest(self, lat: float, lon: float, k: int = 5, programs: Optional[Sequence[str]] = None,
+                match: str = "any") -> List[Tuple[HexSchool, float]]:
+        """The k schools nearest to (lat, lon), nearest first"""
+        q = unit_vectors([lat], [lon])[0]
+        return self._results(*self._nearest_point(q, k, self.program_mask(programs, match)))
+
+    def nearest_many(self, points: Sequence[Tuple[float, float]], k: int = 5,
+                     programs: Optional[Sequence[str]] = None, match: str = "any") -> List[List[Tuple[HexSchool, float]]]:
+        """nearest() for many (lat, lon) points"""
+        mask = self.program_mask(programs, match)
+        queries = unit_vectors([p[0] for p in points], [p[1] for p in points])
+        return [self._results(*self._nearest_point(q, k, mask)) for q in queries]
+
+    def within_many(self, points: Sequence[Tuple[float, float]], miles: float,
+                    programs: Optional[Sequence[str]] = None, match: str = "any") -> List[List[Tuple[HexSchool, float]]]:
+        """
+        within() for many (lat, lon) points: each leaf is visited once and
+        tested against all query points at once.
+        """
+        mask = self.program_mask(programs, match)
+        chord = miles_to_chord(miles)
+        queries = unit_vectors([p[0] for p in points], [p[1] for p in points])
+        hits: List[List[np.ndarray]] = [[] for _ in range(len(queries))]
+        dists: List[List[np.ndarray]] = [[] for _ in range(len(queries))]
+
+        for leaf in self.leaves:
+            lo, hi = self.start[leaf], self.stop[leaf]
+            if hi == lo:
+                continue
+            near = np.flatnonzero(self._box_gap(leaf, queries) <= chord)
+            if not len(near):
+                continue
+            leaf_mask = None if mask is None else mask[lo:hi]
+            d = np.sqrt(((queries[near, None, :] - self.points[None, lo:hi, :]) ** 2).sum(axis=2))
+            inside = d <= chord
+            if leaf_mask is not None:
+                inside &= leaf_mask[None, :]
+            for row, qi in enumerate(near):
+                cols = np.flatnonzero(inside[row])
+                if len(cols):
+                    hits[qi].append(cols + lo)
+                    dists[qi].append(d[row, cols])
+
+        out = []
+        for h, d in zip(hits, dists):
+            if not h:
+                out.append([])
+                continue
+            positions, chords = np.concatenate(h), np.concatenate(d)
+            ranked = np.argsort(chords, kind="stable")
+            out.append(self._results(positions[ranked], chords[ranked]))
+        return out
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def brute_force_within(schools: Sequence[HexSchool], lat: float, lon: float, miles: float,
+                       program: Optional[str] = None) -> List[Tuple[HexSchool, float]]:
+    """Full scan with per-row haversine (what answering this took before the index)"""
+    found = []
+    for school in schools:
+        if program and program not in school.programs:
+            continue
+        d = haversine_miles(lat, lon, school.lat, school.lon)
+        if d <= miles:
+            found.append((school, d))
+    return sorted(found, key=lambda item: item[1])
+
+
+def main() -> int:
+    def option(name: str, default: str) -> str:
+        return sys.argv[sys.argv.index(name) + 1] if name in sys.argv else default
+
+    n_queries = int(option("--queries", "2000"))
+    miles = float(option("--miles", "50"))
+    program = option("--program", "Welding")
+    k = int(option("--k", "10"))
+
+    start = time.perf_counter()
+    index = SchoolIndex.from_csv()
+    print(f"Indexed {len(index)} schools ({len(index.leaves)} leaves) in "
+          f"{(time.perf_counter() - start) * 1000:.1f} ms")
+
+    # Query points spread over the lower 48
+    rng = np.random.default_rng(0)
+    points = list(zip(rng.uniform(25.0, 49.0, n_queries), rng.uniform(-124.0, -67.0, n_queries)))
+    print(f"{n_queries} query points, {program} within {miles:g} miles, k={k}")
+
+    start = time.perf_counter()
+    brute = [brute_force_within(index.schools, lat, lon, miles, program) for lat, lon in points]
+    t_brute = time.perf_counter() - start
+    print(f"  brute force (haversine loop): {t_brute * 1000:8.1f} ms")
+
+    start = time.perf_counter()
+    single = [index.within(lat, lon, miles, [program]) for lat, lon in points]
+    t_single = time.perf_counter() - start
+    print(f"  index, one query at a time:   {t_single * 1000:8.1f} ms  ({t_brute / t_single:.1f}x)")
+
+    start = time.perf_counter()
+    batched = index.within_many(points, miles, [program])
+    t_batch = time.perf_counter() - start
+    print(f"  index, batched:               {t_batch * 1000:8.1f} ms  ({t_brute / t_batch:.1f}x)")
+
+    def names(results):
+        return [[(s.name, s.state, s.city) for s, _ in r] for r in results]
+
+    same = names(brute) == names(single) == names(batched)
+    worst = max((abs(a[1] - b[1]) for r1, r2 in zip(brute, batched) for a, b in zip(r1, r2)), default=0.0)
+    print(f"  identical results: {same} (max distance difference {worst:.2e} mi, "
+          f"{sum(map(len, brute))} hits)")
+
+    start = time.perf_counter()
+    brute_knn = []
+    for lat, lon in points:
+        ranked = sorted((haversine_miles(lat, lon, s.lat, s.lon), i) for i, s in enumerate(index.schools)
+                        if program in s.programs)
+        brute_knn.append([index.schools[i].name for _, i in ranked[:k]])
+    t_brute_knn = time.perf_counter() - start
+    start = time.perf_counter()
+    knn = index.nearest_many(points, k, [program])
+    t_knn = time.perf_counter() - start
+    print(f"  k-nearest: brute force {t_brute_knn * 1000:.1f} ms, index {t_knn * 1000:.1f} ms "
+          f"({t_brute_knn / t_knn:.1f}x), identical: {brute_knn == [[s.name for s, _ in r] for r in knn]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
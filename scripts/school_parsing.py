@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Vectorized address and program parsing for trade school frames.
+
+Column-at-a-time equivalents of the per-row helpers in tradeschool-analysis.py
+(clean_phone, extract_state_from_address, extract_city_from_address,
+normalize_programs, to_program_list). Every pattern is compiled once at import
+and applied through pandas .str methods, so a whole column is parsed per call.
+
+Usage (micro-benchmark against the per-row functions):
+  python scripts/school_parsing.py [input.csv] [--rows N]
+"""
+
+import re
+import sys
+import time
+from typing import Dict
+
+import pandas as pd
+
+
+NON_DIGIT = re.compile(r"\D")
+STATE_PATTERN = re.compile(r",\s*([A-Z]{2})\s+\d")
+CITY_PATTERN = re.compile(r",([^,]*),[^,]*$")
+PROGRAM_SEPARATOR = re.compile(r"\s*,\s*")
+REPEATED_COMMAS = re.compile(r",+")
+
+
+def _as_text(values: pd.Series) -> pd.Series:
+    """Object string view of a column with missing values kept as NaN"""
+    return values.astype(object).where(values.notna()).astype(str).where(values.notna())
+
+
+def parse_phones(values: pd.Series) -> pd.Series:
+    """Phone numbers reduced to digits; missing or digit-free values become None"""
+    digits = _as_text(values).str.replace(NON_DIGIT, "", regex=True)
+    return digits.where(digits.str.len() > 0, None).astype(object)
+
+
+def extract_states(addresses: pd.Series) -> pd.Series:
+    """Two-letter state code that precedes the ZIP code (', ST 12345')"""
+    return _as_text(addresses).str.extract(STATE_PATTERN, expand=False)
+
+
+def extract_cities(addresses: pd.Series) -> pd.Series:
+    """Second-to-last comma-separated address part, when there are at least three parts"""
+    return _as_text(addresses).str.extract(CITY_PATTERN, expand=False).str.strip()
+
+
+def normalize_program_series(programs: pd.Series) -> pd.Series:
+    """Program strings with pipes and commas unified into a tight comma-separated list"""
+    text = _as_text(programs).fillna("")
+    return (
+        text.str.replace("|", ",", regex=False)
+        .str.strip()
+        .str.replace(PROGRAM_SEPARATOR, ",", regex=True)
+        .str.replace(REPEATED_COMMAS, ",", regex=True)
+        .str.strip(", ")
+    )
+
+
+def program_lists(programs: pd.Series) -> pd.Series:
+    """Program lists from raw or normalized program strings"""
+    normalized = normalize_program_series(programs)
+    lists = normalized.str.split(",")
+    return lists.where(normalized != "", pd.Series([[] for _ in range(len(lists))], index=lists.index))
+
+
+# ============================================================================
+# MICRO-BENCHMARK
+# ============================================================================
+
+def _load_per_row_reference():
+    """Import the per-row helpers from the hyphenated analysis script"""
+    import importlib.util
+    import os
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tradeschool-analysis.py")
+    spec = importlib.util.spec_from_file_location("tradeschool_analysis", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def benchmark(df: pd.DataFrame, repeat: int = 3) -> Dict[str, Dict[str, float]]:
+    """
+    Rows/sec of the per-row Series.apply helpers versus the vectorized parsers.
+    Expects Address, Programs and phone columns in canonical or raw naming.
+    """
+    ref = _load_per_row_reference()
+    address = df.get("Address", df.get("address"))
+    programs = df.get("Programs", df.get("programs"))
+    phone = df.get("Contact Number", df.get("contact_phone", df.get("phone")))
+
+    cases = {
+        "phone": (lambda: phone.apply(ref.clean_phone), lambda: parse_phones(phone)),
+        "state": (lambda: address.apply(ref.extract_state_from_address), lambda: extract_states(address)),
+        "city": (lambda: address.apply(ref.extract_city_from_address), lambda: extract_cities(address)),
+        "programs": (
+            lambda: programs.apply(ref.normalize_programs).apply(ref.to_program_list),
+            lambda: program_lists(programs),
+        ),
+    }
+
+    results = {}
+    for name, (per_row, vectorized) in cases.items():
+        timings = {}
+        for label, fn in (("per_row", per_row), ("vectorized", vectorized)):
+            best = min(_timed(fn) for _ in range(repeat))
+            timings[label] = len(df) / best if best > 0 else float("inf")
+
+        expected, actual = per_row(), vectorized()
+        mismatches = int((expected.astype(object).fillna("") != actual.astype(object).fillna("")).sum())
+        results[name] = {**timings, "speedup": timings["vectorized"] / timings["per_row"], "mismatches": mismatches}
+    return results
+
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main() -> int:
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    rows = 100_000
+    if "--rows" in sys.argv:
+        rows = int(sys.argv[sys.argv.index("--rows") + 1])
+        args = [a for a in args if a != str(rows)]
+    input_csv = args[0] if args else "trade_schools_curated.csv"
+
+    base = pd.read_csv(input_csv)
+    df = pd.concat([base] * max(1, -(-rows // len(base))), ignore_index=True).head(rows)
+    print(f"Benchmarking {len(df):,} rows from {input_csv}")
+
+    for name, r in benchmark(df).items():
+        print(f"  {name:<9} per-row: {r['per_row']:>12,.0f} rows/s | vectorized: {r['vectorized']:>12,.0f} rows/s"
+              f" | {r['speedup']:.1f}x | mismatches: {r['mismatches']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,12 +8,18 @@ import pandas as pd
 import numpy as np
 import re
 import json
+import functools
 import os
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 from collections import Counter
 
+from compact_frame import CompactSchoolFrame, ProgramLists, memory_report
+from school_data import load_cleaned_schools, load_school_data
+from workforce_scenarios import (DEFAULT_STATE_ECONOMICS, TAX_REVENUE_RATE, TRAINING_COST_PER_PERSON,
+                                 calculate_priority, estimate_skill_demand, run_scenario_sweep)
+
 # Set random seed for reproducibility
 np.random.seed(42)
 
@@ -61,6 +67,27 @@ def to_program_list(s: str) -> List[str]:
         return []
     return [p.strip() for p in re.split(r"[|,]", s) if p.strip()]
 
+def build_program_matrix(program_lists: pd.Series) -> Tuple[List[str], np.ndarray]:
+    """
+    Build a boolean school x program membership matrix from Program_List.
+    Columns follow first-appearance order; returns (programs, matrix).
+    """
+    encoded = ProgramLists.from_lists(program_lists)
+    return encoded.programs, encoded.to_matrix()
+
+def _memoized(method):
+    """Cache a no-argument analyzer method until the analyzer's frame changes"""
+    @functools.wraps(method)
+    def wrapper(self):
+        key = method.__name__
+        if key in self._cache:
+            self.cache_hits += 1
+            return self._cache[key]
+        self.cache_misses += 1
+        result = self._cache[key] = method(self)
+        return result
+    return wrapper
+
 # ============================================================================
 # DATA CLASSES
 # ============================================================================
@@ -81,8 +108,7 @@ class WorkforceGap:
 class TradeSchoolAnalyzer:
     """Core analysis engine for trade school data"""
     
-    def __init__(self, df: pd.DataFrame):
-        self.df = df.copy()
+    def __init__(self, df: pd.DataFrame, copy: bool = True):
         self.program_categories = {
             'Transportation': ['Diesel & Automotive Tech', 'Diesel Mechanics', 'CDL Training'],
             'Manufacturing': ['Machine & Mechanical Systems', 'CAD/CAM Drafting', 'Electronics', 'Machining'],
@@ -90,33 +116,77 @@ class TradeSchoolAnalyzer:
             'Skilled Trades': ['Welding', 'HVAC', 'Plumbing & Pipefitting', 'Electrical'],
             'Advanced Manufacturing': ['CAD/CAM Drafting', 'Electronics', 'Machine & Mechanical Systems', 'Robotics']
         }
-    
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache = {}
+        self.df = df.copy() if copy else df
+    
+    @property
+    def df(self) -> pd.DataFrame:
+        return self._df
+    
+    @df.setter
+    def df(self, df: pd.DataFrame):
+        """Assigning a new frame rebuilds the program matrix and drops cached results"""
+        self._df = df
+        self.programs, self.program_matrix = build_program_matrix(df["Program_List"])
+        self.program_index = {p: i for i, p in enumerate(self.programs)}
+        self.invalidate_cache()
+    
+    def invalidate_cache(self):
+        """Drop memoized results (call after mutating self.df in place)"""
+        self._cache.clear()
+    
+    def cache_info(self) -> Dict[str, int]:
+        """Hit/miss counters for the memoized analyses"""
+        return {"hits": self.cache_hits, "misses": self.cache_misses, "cached": len(self._cache)}
+    
+    def _program_mask(self, programs: List[str]) -> np.ndarray:
+        """Boolean row mask of schools offering any of the given programs"""
+        cols = [self.program_index[p] for p in programs if p in self.program_index]
+        if not cols:
+            return np.zeros(len(self.df), dtype=bool)
+        return self.program_matrix[:, cols].any(axis=1)
+    
+    def _state_program_presence(self) -> pd.DataFrame:
+        """State x program boolean table: does any school in the state offer it"""
+        presence = pd.DataFrame(self.program_matrix, columns=self.programs)
+        return presence.groupby(self.df["State"].to_numpy()).any()
+    
+    @_memoized
     def geographic_distribution(self) -> pd.DataFrame:
         """Analyze geographic distribution of schools and programs"""
         grp = self.df.groupby("State", dropna=False).agg(
             total_schools=("Institution Name", "count"),
             total_program_offerings=("Program_Count", "sum"),
-            unique_programs=("Program_List", lambda x: len(set(p for lst in x for p in lst)))
-        ).reset_index().sort_values("total_schools", ascending=False)
-        return grp
+        )
+        presence = pd.DataFrame(self.program_matrix, index=self.df.index)
+        unique_programs = presence.groupby(self.df["State"], dropna=False).any().sum(axis=1)
+        grp["unique_programs"] = unique_programs.reindex(grp.index).fillna(0).astype(int)
+        return grp.reset_index().sort_values("total_schools", ascending=False)
     
+    @_memoized
     def program_availability(self) -> pd.DataFrame:
         """Analyze program availability across institutions"""
-        all_programs = [p for lst in self.df["Program_List"] for p in lst]
-        if len(all_programs) == 0:
+        if not self.programs:
             return pd.DataFrame(columns=["program", "count", "penetration_pct"])
         
-        vc = pd.Series(all_programs).value_counts().reset_index()
-        vc.columns = ["program", "count"]
+        counts = self.program_matrix.sum(axis=0)
+        order = np.argsort(-counts, kind="stable")
+        vc = pd.DataFrame({
+            "program": [self.programs[i] for i in order],
+            "count": counts[order].astype(int)
+        })
         total_schools = len(self.df)
         vc["penetration_pct"] = (vc["count"] / total_schools * 100).round(2)
         return vc
     
+    @_memoized
     def skill_clusters(self) -> Dict[str, Dict]:
         """Identify geographic clusters of specific skills"""
         clusters = {}
         for cat, progs in self.program_categories.items():
-            mask = self.df["Program_List"].apply(lambda lst: any(p in lst for p in progs))
+            mask = self._program_mask(progs)
             sub = self.df[mask]
             state_counts = sub["State"].value_counts(dropna=True)
             total = int(sub.shape[0])
@@ -129,6 +199,7 @@ class TradeSchoolAnalyzer:
             }
         return clusters
     
+    @_memoized
     def workforce_gaps(self) -> Dict[str, Dict]:
         """Identify workforce gaps and underserved areas"""
         states = self.df["State"].dropna().unique().tolist()
@@ -138,11 +209,12 @@ class TradeSchoolAnalyzer:
         critical_programs = ["HVAC", "Plumbing & Pipefitting", "Electronics", 
                            "Machine & Mechanical Systems", "Welding", "Diesel & Automotive Tech"]
         
+        presence = self._state_program_presence()
         for prog in critical_programs:
-            states_with = set(
-                self.df[self.df["Program_List"].apply(lambda lst: prog in lst)]["State"]
-                .dropna().unique().tolist()
-            )
+            if prog in presence.columns:
+                states_with = set(presence.index[presence[prog].to_numpy()])
+            else:
+                states_with = set()
             coverage_pct = round(len(states_with) / max(1, len(states)) * 100, 1)
             missing = [s for s in states if s not in states_with]
             program_coverage[prog] = {
@@ -176,6 +248,7 @@ class TradeSchoolAnalyzer:
             "recommendations": recs
         }
     
+    @_memoized
     def executive_summary(self) -> Dict:
         """Generate executive summary of all analyses"""
         geo = self.geographic_distribution()
@@ -217,8 +290,8 @@ class TradeSchoolAnalyzer:
 class SupplyChainWorkforceOptimizer:
     """Optimize workforce development for supply chain needs"""
     
-    def __init__(self, df: pd.DataFrame):
-        self.df = df.copy()
+    def __init__(self, df: pd.DataFrame, copy: bool = True):
+        self.df = df.copy() if copy else df
         self.df["Program_Array"] = self.df["Program_List"]
         self.df["Quality_Score"] = (
             self.df["Contact Email"].notna().astype(int) +
@@ -264,61 +337,123 @@ class SupplyChainWorkforceOptimizer:
                 'logistics_hub_score': float(np.random.uniform(0.3, 1.0))
             } for s in states_present
         }
-    
-    def _estimate_skill_demand(self, state: str, sector: str) -> int:
-        """Estimate workforce demand for a skill in a state"""
-        base_demand = 10
-        econ = self.state_economic_data.get(state, {
-            'unemployment_rate': 5.0,
-            'job_growth_rate': 1.0,
-            'manufacturing_index': 100.0,
-            'logistics_hub_score': 0.5
-        })
-        
-        multiplier = (
-            (1 + econ['job_growth_rate'] / 100.0) *
-            (econ['manufacturing_index'] / 100.0) *
-            (1 + econ['logistics_hub_score'])
-        )
-        sector_mult = self.supply_chain_critical_skills[sector]['demand_multiplier']
-        return max(int(round(base_demand * multiplier * sector_mult)), 1)
-    
-    def _calculate_priority(self, state: str, sector: str, gap_size: int) -> float:
-        """Calculate priority score for addressing a workforce gap"""
-        econ = self.state_economic_data.get(state, {
-            'unemployment_rate': 5.0,
-            'logistics_hub_score': 0.5
-        })
         
-        sector_importance = {
+        self.sector_importance = {
             'Transportation': 1.5,
             'Infrastructure': 1.4,
             'Manufacturing': 1.3,
             'Energy': 1.2,
             'Warehousing': 1.1
-        }[sector]
-        
-        economic_factor = econ['unemployment_rate'] / 5.0 + econ['logistics_hub_score'] * 2.0
-        return float(gap_size) * sector_importance * economic_factor
+        }
+        self.training_cost = TRAINING_COST_PER_PERSON
+    
+    def _economic_frame(self, states) -> pd.DataFrame:
+        """State economic inputs as a state-indexed frame (defaults for unknown states)"""
+        econ = pd.DataFrame.from_dict(self.state_economic_data, orient="index")
+        econ = econ.reindex(index=list(states), columns=list(DEFAULT_STATE_ECONOMICS))
+        return econ.fillna(DEFAULT_STATE_ECONOMICS)
+    
+    def _skill_pairs(self) -> pd.DataFrame:
+        """One row per (sector, skill) pair with its sector-level parameters"""
+        return pd.DataFrame([
+            {
+                "sector": sector,
+                "skill": skill,
+                "demand_multiplier": meta["demand_multiplier"],
+                "sector_importance": self.sector_importance[sector]
+            }
+            for sector, meta in self.supply_chain_critical_skills.items()
+            for skill in meta["skills"]
+        ])
+    
+    def _state_skill_capacity(self) -> pd.DataFrame:
+        """State x program table of how many schools offer each program"""
+        exploded = (
+            self.df[["State", "Program_Array"]]
+            .reset_index(drop=True)
+            .explode("Program_Array")
+            .dropna()
+            .reset_index()
+            .drop_duplicates(subset=["index", "Program_Array"])
+        )
+        return exploded.groupby(["State", "Program_Array"]).size().unstack(fill_value=0)
     
     def calculate_workforce_gaps(self) -> List[WorkforceGap]:
         """Calculate and prioritize workforce gaps"""
-        gaps = []
+        states = self.df["State"].dropna().unique()
+        pairs = self._skill_pairs()
+        if len(states) == 0 or pairs.empty:
+            return []
         
-        for state in self.df["State"].dropna().unique():
-            state_df = self.df[self.df["State"] == state]
-            
-            for sector, meta in self.supply_chain_critical_skills.items():
-                for skill in meta["skills"]:
-                    capacity = int(sum(1 for progs in state_df["Program_Array"] if skill in progs))
-                    demand = self._estimate_skill_demand(state, sector)
-                    gap = demand - capacity
-                    
-                    if gap > 0:
-                        prio = self._calculate_priority(state, sector, gap)
-                        gaps.append(WorkforceGap(state, skill, capacity, demand, gap, prio))
+        econ_df = self._economic_frame(states)
+        econ = {c: econ_df[c].to_numpy() for c in econ_df.columns}
+        capacity = (
+            self._state_skill_capacity()
+            .reindex(index=states, columns=pairs["skill"], fill_value=0)
+            .to_numpy()
+        )
+        demand = estimate_skill_demand(econ, pairs["demand_multiplier"].to_numpy())
+        gap = demand - capacity
+        priority = calculate_priority(econ, pairs["sector_importance"].to_numpy(), gap)
+        
+        # Row-major flattening keeps the state -> sector -> skill order for ties
+        state_idx, pair_idx = np.nonzero(gap > 0)
+        order = np.argsort(-priority[state_idx, pair_idx], kind="stable")
+        state_idx, pair_idx = state_idx[order], pair_idx[order]
+        skills = pairs["skill"].to_numpy()
+        
+        return [
+            WorkforceGap(
+                str(states[i]), str(skills[j]), int(capacity[i, j]),
+                int(demand[i, j]), int(gap[i, j]), float(priority[i, j])
+            )
+            for i, j in zip(state_idx, pair_idx)
+        ]
+    
+    def scenario_base(self) -> Dict:
+        """Baseline arrays shared by every scenario (plain NumPy, cheap to ship to workers)"""
+        states = self.df["State"].dropna().unique().tolist()
+        sectors = list(self.supply_chain_critical_skills)
+        pairs = self._skill_pairs()
+        econ = self._economic_frame(states)
+        capacity = (
+            self._state_skill_capacity()
+            .reindex(index=states, columns=pairs["skill"], fill_value=0)
+            .to_numpy()
+        )
+        return {
+            "states": states,
+            "sectors": sectors,
+            "econ": {c: econ[c].to_numpy() for c in econ.columns},
+            "capacity": capacity,
+            "pair_sector": pairs["sector"].map({s: i for i, s in enumerate(sectors)}).to_numpy(),
+            "pair_skill": pairs["skill"].to_numpy(dtype=object),
+            "sector_importance": pairs["sector_importance"].to_numpy(),
+            "demand_multiplier": np.array(
+                [self.supply_chain_critical_skills[s]["demand_multiplier"] for s in sectors]),
+            "average_salary": np.array(
+                [self.supply_chain_critical_skills[s]["average_salary"] for s in sectors], dtype=float),
+            "training_cost": float(self.training_cost),
+        }
+    
+    def run_scenarios(self, scenarios: pd.DataFrame, top_n: Optional[int] = None,
+                      workers: int = 0, chunk_size: int = 250) -> pd.DataFrame:
+        """
+        Rank workforce gaps and ROI for a whole table of what-if parameter sets.
+        
+        Each row of `scenarios` is one run; its index becomes the `scenario` column.
+        Recognized columns (missing or NaN cells keep the optimizer's baseline):
+          demand_multiplier, average_salary   - all sectors; `<name>.<Sector>` for one sector
+          training_cost                       - per-person training cost
+          unemployment_rate, job_growth_rate,
+          manufacturing_index,
+          logistics_hub_score                 - all states; `<name>.<ST>` for one state
         
-        return sorted(gaps, key=lambda g: g.priority_score, reverse=True)
+        Returns one row per positive gap, ranked by priority within each scenario.
+        With workers > 0 the table is split into chunk_size blocks and evaluated in a
+        process pool; otherwise everything runs in a single vectorized pass.
+        """
+        return run_scenario_sweep(self.scenario_base(), scenarios, top_n, workers=workers, chunk_size=chunk_size)
     
     def investment_recommendations(self) -> Dict:
         """Generate investment recommendations based on gaps"""
@@ -331,7 +466,7 @@ class SupplyChainWorkforceOptimizer:
             "gap_size": g.gap_size,
             "priority_score": round(g.priority_score, 2),
             "action": f"Expand {g.skill} training by {g.gap_size} seats",
-            "estimated_cost": g.gap_size * 15000
+            "estimated_cost": g.gap_size * self.training_cost
         } for g in gaps[:15]]
         
         # ROI calculations
@@ -345,8 +480,8 @@ class SupplyChainWorkforceOptimizer:
             
             if sector:
                 avg_salary = self.supply_chain_critical_skills[sector]["average_salary"]
-                training_cost = 15000
-                tax_rev = avg_salary * 0.25
+                training_cost = self.training_cost
+                tax_rev = avg_salary * TAX_REVENUE_RATE
                 roi_years = training_cost / tax_rev if tax_rev else None
                 
                 roi[f"{g.state}:{g.skill}"] = {
@@ -363,13 +498,17 @@ class SupplyChainWorkforceOptimizer:
 # MAIN EXECUTION FUNCTION
 # ============================================================================
 
-def run_complete_analysis(csv_path: str, output_dir: str = ".") -> Dict:
+def run_complete_analysis(csv_path: str, output_dir: str = ".", chunksize: Optional[int] = None,
+                          use_cache: bool = False) -> Dict:
     """
     Run complete analysis on trade school data
     
     Args:
         csv_path: Path to the CSV file with trade school data
         output_dir: Directory to save output files
+        chunksize: Stream the CSV in chunks of this many rows (None reads it whole)
+        use_cache: Reuse the cleaned-frame cache in .cache/ next to csv_path while
+                   the file and cleaning version are unchanged
     
     Returns:
         Dictionary with file paths and summary statistics
@@ -379,43 +518,24 @@ def run_complete_analysis(csv_path: str, output_dir: str = ".") -> Dict:
     print("US TRADE SCHOOL SUPPLY CHAIN ANALYSIS")
     print("=" * 70)
     
-    # Load and process data
+    # Load, clean and deduplicate (chunk by chunk when chunksize is set)
     print("\n1. Loading and processing data...")
-    df = pd.read_csv(csv_path)
-    
-    # Clean and standardize
-    print("2. Cleaning and standardizing...")
-    df["Institution Name"] = df.get("Institution Name", df.get("institution_name", "")).astype(str).str.strip()
-    df["Address"] = df.get("Address", df.get("address", "")).astype(str).str.strip()
-    df["Programs"] = df.get("Programs", df.get("programs", "")).apply(normalize_programs)
-    df["Contact Email"] = df.get("Contact Email", df.get("contact_email", ""))
-    df["Website"] = df.get("Website", df.get("website", ""))
-    df["Contact Name"] = df.get("Contact Name", df.get("contact_name", ""))
-    
-    # Extract geographic info
-    df["State"] = df["Address"].apply(extract_state_from_address)
-    df["City"] = df["Address"].apply(extract_city_from_address)
-    
-    # Create program lists
-    df["Program_List"] = df["Programs"].apply(to_program_list)
-    df["Program_Count"] = df["Program_List"].apply(len)
-    
-    # Remove empty rows
-    df = df[~(df["Institution Name"].isna() & df["Address"].isna())].copy()
-    
-    # Deduplicate
-    df["dedup_key"] = (
-        df["Institution Name"].fillna("").str.lower().str.strip() + " | " + 
-        df["Address"].fillna("").str.lower().str.strip()
-    )
-    df = df.drop_duplicates(subset=["dedup_key"]).drop(columns=["dedup_key"])
+    print("2. Cleaning and standardizing" + (f" in chunks of {chunksize:,} rows..." if chunksize else "..."))
+    if use_cache:
+        df = load_cleaned_schools(csv_path, chunksize=chunksize)
+    else:
+        df = load_school_data(csv_path, chunksize=chunksize)
     
     print(f"   Processed {len(df)} institutions across {df['State'].nunique()} states")
     
+    # Compact frame and its memory report, taken before the analyzers add working columns to df
+    compact = CompactSchoolFrame.from_frame(df)
+    mem = memory_report(df, compact)
+    
     # Run analyses
     print("\n3. Running analyses...")
-    analyzer = TradeSchoolAnalyzer(df)
-    optimizer = SupplyChainWorkforceOptimizer(df)
+    analyzer = TradeSchoolAnalyzer(df, copy=False)
+    optimizer = SupplyChainWorkforceOptimizer(df, copy=False)
     
     # Generate outputs
     print("4. Generating outputs...")
@@ -438,10 +558,10 @@ def run_complete_analysis(csv_path: str, output_dir: str = ".") -> Dict:
     with open(opt_path, "w") as f:
         json.dump(opt_payload, f, indent=2, default=str)
     
-    # Matchmaking index
-    matchmaking = df.explode("Program_List")[
-        ["Institution Name", "State", "City", "Program_List", "Contact Email", "Website"]
-    ].rename(columns={"Program_List": "program"})
+    # Matchmaking index (exploded from integer program codes, not object lists)
+    matchmaking = compact.matchmaking_frame(
+        ["Institution Name", "State", "City", "program", "Contact Email", "Website"]
+    )
     mm_path = os.path.join(output_dir, "matchmaking_index.csv")
     matchmaking.to_csv(mm_path, index=False)
     
@@ -464,6 +584,12 @@ def run_complete_analysis(csv_path: str, output_dir: str = ".") -> Dict:
     for idx, row in prog_df.head(5).iterrows():
         print(f"  {row['program']}: {row['count']} institutions ({row['penetration_pct']}%)")
     
+    print(f"Compact frame: {mem['object_frame_bytes'] / 1e6:.2f} MB -> {mem['compact_frame_bytes'] / 1e6:.2f} MB "
+          f"({mem['saved_bytes'] / max(1, mem['object_frame_bytes']) * 100:.0f}% saved)")
+    
+    cache = analyzer.cache_info()
+    print(f"\nAnalysis cache: {cache['hits']} hits / {cache['misses']} misses")
+    
     print("\nTOP 5 IMMEDIATE PRIORITIES:")
     for i, priority in enumerate(recs['immediate_priorities'][:5], 1):
         print(f"  {i}. {priority['state']} - {priority['skill']}")
@@ -482,7 +608,9 @@ def run_complete_analysis(csv_path: str, output_dir: str = ".") -> Dict:
             "total_institutions": summary['overview']['total_institutions'],
             "states_covered": summary['overview']['states_covered'],
             "unique_programs": summary['overview']['unique_programs'],
-            "matchmaking_pairs": len(matchmaking)
+            "matchmaking_pairs": len(matchmaking),
+            "analysis_cache": analyzer.cache_info(),
+            "memory": mem
         }
     }
 
@@ -533,63 +661,40 @@ def add_geocoding_to_dataframe(df: pd.DataFrame, use_cache: bool = True) -> pd.D
     """
     Add lat/lon geocoding to dataframe with caching and progress tracking
     """
-    import os
-    import pickle
+    from geocode_cache import GeocodeCache, normalize_address
+    from geocode_engine import geocode_addresses
     
-    cache_file = "geocode_cache.pkl"
+    # Persistent SQLite cache (each new result is committed as it arrives);
+    # an in-memory store when caching is disabled
+    geocode_cache = GeocodeCache() if use_cache else GeocodeCache(":memory:", legacy_pickle=None)
+    print(f"✓ {len(geocode_cache)} cached geocodes available")
     
-    # Load existing cache
-    geocode_cache = {}
-    if use_cache and os.path.exists(cache_file):
-        try:
-            with open(cache_file, 'rb') as f:
-                geocode_cache = pickle.load(f)
-            print(f"✓ Loaded {len(geocode_cache)} cached geocodes")
-        except Exception as e:
-            print(f"⚠ Could not load cache: {e}")
-    
-    geocoded_data = []
-    new_geocodes = 0
-    failed = 0
-    
-    print(f"\n🗺️  Geocoding {len(df)} addresses...")
-    for idx, row in df.iterrows():
-        # Build full address
+    # Build full addresses
+    addresses = []
+    for _, row in df.iterrows():
         address_parts = [
             str(row.get('Address', '')),
             str(row.get('City', '')),
             str(row.get('State', ''))
         ]
-        address = ', '.join([p for p in address_parts if p and p != 'nan']).strip()
-        
-        # Check cache first
-        if address in geocode_cache:
-            geocoded_data.append(geocode_cache[address])
-        else:
-            # Geocode new address
-            result = geocode_with_nominatim(address, delay=1.1)
-            geocode_cache[address] = result
-            geocoded_data.append(result)
-            
-            if result['geocoded']:
-                new_geocodes += 1
-            else:
-                failed += 1
-            
-            # Progress update
-            if (idx + 1) % 25 == 0:
-                print(f"  Progress: {idx+1}/{len(df)} ({((idx+1)/len(df)*100):.1f}%) | New: {new_geocodes} | Failed: {failed}")
-            
-            # Save cache periodically
-            if new_geocodes % 100 == 0 and new_geocodes > 0:
-                with open(cache_file, 'wb') as f:
-                    pickle.dump(geocode_cache, f)
-                print(f"  💾 Cache saved ({new_geocodes} new geocodes)")
+        addresses.append(', '.join([p for p in address_parts if p and p != 'nan']).strip())
     
-    # Final cache save
-    if use_cache:
-        with open(cache_file, 'wb') as f:
-            pickle.dump(geocode_cache, f)
+    distinct = {normalize_address(a): a for a in addresses}
+    uncached = [a for a in distinct.values() if a not in geocode_cache]
+    
+    def progress(done: int, total: int):
+        if done % 25 == 0 or done == total:
+            print(f"  Progress: {done}/{total} ({done / total * 100:.1f}%) new lookups")
+    
+    # Cache hits are answered directly; the rest are geocoded concurrently under
+    # Nominatim's rate limit
+    print(f"\n🗺️  Geocoding {len(df)} addresses ({len(uncached)} not cached)...")
+    results = geocode_addresses(addresses, cache=geocode_cache, progress=progress)
+    geocoded_data = [results[a] for a in addresses]
+    new_geocodes = sum(1 for a in uncached if results[a]['geocoded'])
+    failed = len(uncached) - new_geocodes
+    
+    geocode_cache.close()
     
     success_rate = ((new_geocodes) / max(1, new_geocodes + failed)) * 100
     print(f"✓ Geocoding complete: {new_geocodes} new | {failed} failed | {success_rate:.1f}% success rate")
@@ -659,6 +764,8 @@ if __name__ == "__main__":
     
     # Configuration
     csv_file = "trade_schools_curated.csv"  # Input file - READY TO GO!
+    chunksize = None  # e.g. 50_000 to stream the full national registry
+    use_cache = True  # Reuse the cleaned frame from .cache/ until the CSV changes
     enable_geocoding = True  # Set to True to add lat/lon coordinates - LET'S MAP THIS!
     
     print("="*70)
@@ -669,7 +776,7 @@ if __name__ == "__main__":
     print()
     
     # Step 1: Run core analysis
-    results = run_complete_analysis(csv_file)
+    results = run_complete_analysis(csv_file, chunksize=chunksize, use_cache=use_cache)
     
     # Step 2: Optional geocoding enrichment
     if enable_geocoding:
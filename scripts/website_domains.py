@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Streaming, deduplicating website -> domain extraction for the favicon sources.
+
+Each source CSV is read once with csv.reader, keeping only its website
+column(s); every distinct raw value is normalized once (LRU-memoized, so the
+exploded matchmaking_index.csv's one-row-per-program repeats cost a set lookup).
+When school_data's cleaned-frame cache is up to date for a source, its Website
+column is read from there instead. Per-source timings are printed, not stored.
+
+The resulting domain set is written to a manifest together with each source's
+SHA-256. Freshness is keyed on content only, so the checked-in manifest stays
+valid on a fresh checkout. fetch-favicons.py reads the manifest and only
+rescans when a source has actually changed.
+
+Stdlib only, like fetch-favicons.py (the cache path needs pandas and is skipped
+without it).
+
+Usage:
+  domains, stats = collect_domains(SOURCES)
+  domains = load_or_build_manifest(SOURCES, manifest_path)
+
+  # rebuild the manifest and print per-source timings
+  python scripts/website_domains.py [manifest.json]
+"""
+
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+import urllib.parse
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+
+MANIFEST_FILENAME = "domain_manifest.json"
+MANIFEST_VERSION = 2
+
+
+@lru_cache(maxsize=65536)
+def normalize_website(value: str) -> str:
+    if not value:
+        return ""
+    url = value.strip()
+    if not url:
+        return ""
+    # Add scheme if missing
+    if not url.startswith("http://") and not url.startswith("https://"):
+        url = "https://" + url
+    # Trim whitespace and stray characters
+    return url.strip()
+
+
+@lru_cache(maxsize=65536)
+def extract_domain(url: str) -> str:
+    try:
+        parsed = urllib.parse.urlparse(url)
+        hostname = parsed.hostname or ""
+        return hostname.lower()
+    except Exception:
+        return ""
+
+
+def website_domain(value: str) -> str:
+    """Lower-cased hostname for a raw website cell ("" if there is none)"""
+    url = normalize_website(value)
+    return extract_domain(url) if url else ""
+
+
+def website_columns(fieldnames: Sequence[str]) -> List[int]:
+    """Indices of header columns that look like website columns"""
+    return [i for i, c in enumerate(fieldnames) if c and "website" in c.lower()]
+
+
+def websites_from_cache(path: str) -> Optional[List[str]]:
+    """Website column of the cleaned-frame cache for path, if one is up to date"""
+    try:
+        from school_data import cached_school_columns
+    except ImportError:  # pandas/numpy not installed: scan the CSV instead
+        return None
+    cached = cached_school_columns(path, ["Website"])
+    if cached is None or "Website" not in cached.columns:
+        return None
+    return [str(w).strip() for w in cached["Website"].dropna() if str(w).strip()]
+
+
+def iter_distinct_websites(path: str, stats: Optional["SourceStats"] = None) -> Iterator[str]:
+    """Each distinct non-empty website cell of a source, in file order"""
+    if not os.path.exists(path):
+        return
+    seen: Set[str] = set()
+    cached = websites_from_cache(path)
+    if cached is not None:
+        if stats is not None:
+            stats.rows = len(cached)
+        for value in cached:
+            if value not in seen:
+                seen.add(value)
+                yield value
+        return
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        columns = website_columns(next(reader, []))
+        if not columns:
+            return
+        for row in reader:
+            if stats is not None:
+                stats.rows += 1
+            for i in columns:
+                if i >= len(row):
+                    continue
+                value = row[i].strip()
+                if value and value not in seen:
+                    seen.add(value)
+                    yield value
+
+
+# ============================================================================
+# DOMAIN COLLECTION
+# ============================================================================
+
+@dataclass
+class SourceStats:
+    path: str
+    rows: int = 0
+    distinct_websites: int = 0
+    new_domains: int = 0
+    seconds: float = 0.0
+
+
+def collect_domains(sources: Sequence[str]) -> Tuple[List[str], List[SourceStats]]:
+    """Sorted distinct domains across all sources, plus per-source stats"""
+    domains: Set[str] = set()
+    all_stats = []
+    for path in sources:
+        stats = SourceStats(path)
+        start = time.perf_counter()
+        for value in iter_distinct_websites(path, stats):
+            stats.distinct_websites += 1
+            domain = website_domain(value)
+            if domain and domain not in domains:
+                domains.add(domain)
+                stats.new_domains += 1
+        stats.seconds = time.perf_counter() - start
+        all_stats.append(stats)
+    return sorted(domains), all_stats
+
+
+def print_source_stats(all_stats: Sequence[SourceStats]):
+    for s in all_stats:
+        if not os.path.exists(s.path):
+            print(f"   - {os.path.basename(s.path)}: missing")
+            continue
+        if not s.rows:
+            print(f"   - {os.path.basename(s.path)}: no website column ({s.seconds * 1000:.1f} ms)")
+            continue
+        print(f"   - {os.path.basename(s.path)}: {s.rows} rows, {s.distinct_websites} distinct websites, "
+              f"{s.new_domains} new domains in {s.seconds * 1000:.1f} ms")
+
+
+# ============================================================================
+# MANIFEST
+# ============================================================================
+
+def _file_sha256(path: str, block_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def source_signature(path: str) -> Optional[Dict]:
+    """
+    Content hash of a source (None if missing). No size/mtime is recorded:
+    those differ per checkout and would make the committed manifest churn.
+    """
+    if not os.path.exists(path):
+        return None
+    return {"sha256": _file_sha256(path)}
+
+
+def _source_key(path: str, manifest_path: str) -> str:
+    """Source path relative to the manifest, so a checked-in manifest is portable"""
+    base = os.path.dirname(os.path.abspath(manifest_path))
+    return os.path.relpath(os.path.abspath(path), base).replace(os.sep, "/")
+
+
+def _same_content(old: Optional[Dict], new: Optional[Dict]) -> bool:
+    if old is None or new is None:
+        return old is new
+    return old.get("sha256") == new.get("sha256")
+
+
+def load_manifest(manifest_path: str) -> Optional[Dict]:
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("version") == MANIFEST_VERSION else None
+
+
+def build_manifest(sources: Sequence[str], manifest_path: str, verbose: bool = True) -> Dict:
+    """Scan every source and write the manifest atomically (tmp file + rename)"""
+    domains, all_stats = collect_domains(sources)
+    if verbose:
+        print_source_stats(all_stats)
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "sources": {_source_key(p, manifest_path): source_signature(p) for p in sources},
+        "domains": domains,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(manifest_path)), exist_ok=True)
+    tmp = manifest_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp, manifest_path)
+    return manifest
+
+
+def load_or_build_manifest(sources: Sequence[str], manifest_path: str, rescan: bool = False,
+                           verbose: bool = True) -> List[str]:
+    """Domains from the manifest if every source is unchanged, else from a fresh scan"""
+    manifest = None if rescan else load_manifest(manifest_path)
+    if manifest is not None:
+        recorded = manifest.get("sources", {})
+        keys = {p: _source_key(p, manifest_path) for p in sources}
+        current = {keys[p]: source_signature(p) for p in sources}
+        if set(current) == set(recorded) and all(_same_content(recorded[p], current[p]) for p in current):
+            if verbose:
+                print(f"   Domain manifest up to date: {len(manifest['domains'])} domains")
+            return manifest["domains"]
+        if verbose:
+            print("   Sources changed; rescanning")
+    return build_manifest(sources, manifest_path, verbose=verbose)["domains"]
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main() -> int:
+    repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    sources = [
+        os.path.join(repo_root, "data", "production", "trade_schools_geocoded_fixed.csv"),
+        os.path.join(repo_root, "data", "production", "matchmaking_index.csv"),
+        os.path.join(repo_root, "schools", "matchmaking_index.csv"),
+        os.path.join(repo_root, "schools", "trade_schools_curated.csv"),
+    ]
+    manifest_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        repo_root, "src", "assets", "favicons", MANIFEST_FILENAME)
+
+    start = time.perf_counter()
+    manifest = build_manifest(sources, manifest_path)
+    print(f"{len(manifest['domains'])} domains in {(time.perf_counter() - start) * 1000:.1f} ms "
+          f"(normalize cache: {normalize_website.cache_info().hits} hits, "
+          f"{normalize_website.cache_info().misses} misses)")
+
+    start = time.perf_counter()
+    load_or_build_manifest(sources, manifest_path)
+    print(f"Manifest reload in {(time.perf_counter() - start) * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Vectorized what-if scenarios for the supply chain workforce optimizer.
+
+SupplyChainWorkforceOptimizer (tradeschool-analysis.py) reduces its state
+economics, sector parameters and state x skill capacity to plain NumPy arrays
+(scenario_base()); evaluate_scenarios ranks the workforce gaps of a whole table
+of parameter sets against them in one broadcast pass. The functions live in
+this importable module so a process pool can pickle them by reference: the
+hyphenated analysis script can only be loaded through importlib, and its
+functions cannot be found again by name in a worker.
+
+Usage:
+  grid = build_scenario_grid(training_cost=[12000, 15000], **{"demand_multiplier.Energy": [1.4, 2.0]})
+  ranked = run_scenario_sweep(optimizer.scenario_base(), grid, top_n=10, workers=4)
+"""
+
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_STATE_ECONOMICS = {
+    'unemployment_rate': 5.0,
+    'job_growth_rate': 1.0,
+    'manufacturing_index': 100.0,
+    'logistics_hub_score': 0.5
+}
+
+TRAINING_COST_PER_PERSON = 15000
+TAX_REVENUE_RATE = 0.25
+
+
+def estimate_skill_demand(econ: Dict[str, np.ndarray], sector_mult: np.ndarray) -> np.ndarray:
+    """
+    Estimate workforce demand for every (state, skill) pair.
+    econ arrays are (..., states) and sector_mult is (..., pairs); result is (..., states, pairs).
+    """
+    base_demand = 10
+    multiplier = (
+        (1 + econ['job_growth_rate'] / 100.0) *
+        (econ['manufacturing_index'] / 100.0) *
+        (1 + econ['logistics_hub_score'])
+    )
+    demand = np.round(base_demand * multiplier[..., :, None] * sector_mult[..., None, :])
+    return np.maximum(demand.astype(int), 1)
+
+
+def calculate_priority(econ: Dict[str, np.ndarray], sector_importance: np.ndarray,
+                       gap_size: np.ndarray) -> np.ndarray:
+    """Calculate priority scores for every (state, skill) gap, broadcasting like estimate_skill_demand"""
+    economic_factor = econ['unemployment_rate'] / 5.0 + econ['logistics_hub_score'] * 2.0
+    return gap_size.astype(float) * sector_importance[..., None, :] * economic_factor[..., :, None]
+
+
+def _resolve_scenario_param(scenarios: pd.DataFrame, name: str, keys: List[str],
+                            baseline: np.ndarray) -> np.ndarray:
+    """
+    Per-scenario values of one parameter, shape (scenarios, keys).
+    A plain `name` column overrides every key, a `name.<key>` column overrides one key,
+    and missing/NaN cells keep the baseline value.
+    """
+    values = np.tile(np.asarray(baseline, dtype=float), (len(scenarios), 1))
+    if name in scenarios.columns:
+        col = scenarios[name].to_numpy(dtype=float)
+        values = np.where(np.isnan(col)[:, None], values, col[:, None])
+    for j, key in enumerate(keys):
+        col_name = f"{name}.{key}"
+        if col_name in scenarios.columns:
+            col = scenarios[col_name].to_numpy(dtype=float)
+            values[:, j] = np.where(np.isnan(col), values[:, j], col)
+    return values
+
+
+def evaluate_scenarios(base: Dict, scenarios: pd.DataFrame, top_n: Optional[int] = None) -> pd.DataFrame:
+    """
+    Evaluate a block of scenarios against a precomputed optimizer baseline in one pass.
+    `base` comes from SupplyChainWorkforceOptimizer.scenario_base(); see run_scenario_sweep.
+    """
+    states, sectors = base["states"], base["sectors"]
+    pair_sector = base["pair_sector"]
+    
+    econ = {
+        field: _resolve_scenario_param(scenarios, field, states, base["econ"][field])
+        for field in DEFAULT_STATE_ECONOMICS
+    }
+    sector_mult = _resolve_scenario_param(scenarios, "demand_multiplier", sectors, base["demand_multiplier"])
+    salary = _resolve_scenario_param(scenarios, "average_salary", sectors, base["average_salary"])
+    training_cost = _resolve_scenario_param(
+        scenarios, "training_cost", [], [base["training_cost"]]
+    )[:, 0]
+    
+    # (scenarios, states, pairs)
+    demand = estimate_skill_demand(econ, sector_mult[:, pair_sector])
+    gap = demand - base["capacity"][None, :, :]
+    priority = calculate_priority(econ, base["sector_importance"], gap)
+    
+    scen_idx, state_idx, pair_idx = np.nonzero(gap > 0)
+    prio = priority[scen_idx, state_idx, pair_idx]
+    order = np.lexsort((-prio, scen_idx))
+    scen_idx, state_idx, pair_idx, prio = scen_idx[order], state_idx[order], pair_idx[order], prio[order]
+    
+    group_start = np.searchsorted(scen_idx, scen_idx, side="left")
+    rank = np.arange(len(scen_idx)) - group_start + 1
+    if top_n is not None:
+        keep = rank <= top_n
+        scen_idx, state_idx, pair_idx, prio, rank = (
+            scen_idx[keep], state_idx[keep], pair_idx[keep], prio[keep], rank[keep]
+        )
+    
+    gap_size = gap[scen_idx, state_idx, pair_idx]
+    cost = training_cost[scen_idx]
+    avg_salary = salary[scen_idx, pair_sector[pair_idx]]
+    tax_rev = avg_salary * TAX_REVENUE_RATE
+    with np.errstate(divide="ignore", invalid="ignore"):
+        payback = np.where(tax_rev != 0, np.round(cost / tax_rev, 1), np.nan)
+    
+    return pd.DataFrame({
+        "scenario": scenarios.index.to_numpy()[scen_idx],
+        "rank": rank,
+        "state": np.asarray(states, dtype=object)[state_idx],
+        "sector": np.asarray(sectors, dtype=object)[pair_sector[pair_idx]],
+        "skill": base["pair_skill"][pair_idx],
+        "current_capacity": base["capacity"][state_idx, pair_idx],
+        "estimated_demand": demand[scen_idx, state_idx, pair_idx],
+        "gap_size": gap_size,
+        "priority_score": prio,
+        "estimated_cost": gap_size * cost,
+        "training_cost_per_person": cost,
+        "average_post_training_salary": avg_salary,
+        "estimated_annual_tax_revenue": tax_rev,
+        "roi_payback_period_years": payback,
+        "five_year_net_benefit": np.trunc(tax_rev * 5 - cost),
+    })
+
+
+def build_scenario_grid(**axes) -> pd.DataFrame:
+    """
+    Cartesian product of parameter values as a scenario table, e.g.
+    build_scenario_grid(training_cost=[12000, 15000], **{"demand_multiplier.Energy": [1.4, 2.0]})
+    """
+    names = list(axes)
+    rows = list(itertools.product(*(axes[n] for n in names)))
+    grid = pd.DataFrame(rows, columns=names)
+    grid.index.name = "scenario"
+    return grid
+
+
+def run_scenario_sweep(base: Dict, scenarios: pd.DataFrame, top_n: Optional[int] = None,
+                       workers: int = 0, chunk_size: int = 250) -> pd.DataFrame:
+    """
+    Validate the scenario columns against `base`, then evaluate every scenario:
+    in one vectorized pass, or with workers > 0 in chunk_size blocks on a process
+    pool. Both paths return the same rows in the same order.
+    """
+    known = {"training_cost"} | set(DEFAULT_STATE_ECONOMICS) | {"demand_multiplier", "average_salary"}
+    known |= {f"{f}.{s}" for f in DEFAULT_STATE_ECONOMICS for s in base["states"]}
+    known |= {f"{f}.{s}" for f in ("demand_multiplier", "average_salary") for s in base["sectors"]}
+    unknown = [c for c in scenarios.columns if c not in known]
+    if unknown:
+        raise ValueError(f"Unknown scenario parameters: {unknown}")
+    
+    if workers <= 0 or len(scenarios) <= chunk_size:
+        return evaluate_scenarios(base, scenarios, top_n)
+    
+    chunks = [scenarios.iloc[i:i + chunk_size] for i in range(0, len(scenarios), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(evaluate_scenarios, [base] * len(chunks), chunks, [top_n] * len(chunks)))
+    return pd.concat(results, ignore_index=True)
@@ -0,0 +1,53 @@
+"""ai-data-enrichment.py and BatchEnricher against FakeClient"""
+
+import importlib.util
+import os
+
+import pytest
+
+from ai_batch import BatchEnricher, FakeClient
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CURATED_CSV = os.path.join(REPO_ROOT, "schools", "trade_schools_curated.csv")
+
+
+@pytest.fixture(scope="module")
+def enrichment():
+    path = os.path.join(REPO_ROOT, "scripts", "ai-data-enrichment.py")
+    spec = importlib.util.spec_from_file_location("ai_data_enrichment", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_default_input_sends_one_request_per_batch(enrichment, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    client = FakeClient(enrichment.fake_responder)
+    out = enrichment.run_ai_enrichment(CURATED_CSV, output_csv=str(tmp_path / "out.csv"), client=client)
+    # 1032 distinct institutions, 10 per prompt, for each of the two passes
+    assert len(out) == 1032
+    assert client.calls == 2 * 104
+    assert out["ai_state"].nunique() > 40
+
+    # A rerun is answered entirely from the checkpoint
+    again = FakeClient(enrichment.fake_responder)
+    enrichment.run_ai_enrichment(CURATED_CSV, output_csv=str(tmp_path / "out.csv"), client=again)
+    assert again.calls == 0
+
+
+def test_empty_records_are_not_collapsed(enrichment):
+    client = FakeClient(enrichment.fake_responder)
+    enricher = BatchEnricher(client, enrichment.ADDRESS_TASK, "model")
+    records = [{"Institution Name": "A Tech", "Address": "1 Main St, Troy, NY 12180"}, {}, {"Address": ""}]
+    results = enricher.run(records)
+    assert client.calls == 1
+    assert enricher.stats["empty"] == 2
+    assert results[0]["confidence"] == "high"
+    assert [r["confidence"] for r in results[1:]] == ["failed", "failed"]
+
+
+def test_records_without_any_task_field_are_rejected(enrichment):
+    enricher = BatchEnricher(FakeClient(enrichment.fake_responder), enrichment.ADDRESS_TASK, "model")
+    with pytest.raises(ValueError):
+        enricher.run([{"institution_name": "A Tech"}, {"institution_name": "B Tech"}])
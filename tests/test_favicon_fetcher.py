@@ -0,0 +1,89 @@
+"""FaviconFetcher against the local StubFaviconServer"""
+
+import os
+
+from favicon_fetcher import FaviconFetcher, StubFaviconServer, favicon_path, load_meta
+
+
+def fetch_all(stub, output_dir, domains, refresh=False, concurrency=8, per_host=4):
+    fetcher = FaviconFetcher(str(output_dir), url_template=stub.url_template,
+                             concurrency=concurrency, per_host=per_host, timeout=5)
+    try:
+        return fetcher.fetch_all(domains, refresh=refresh)
+    finally:
+        fetcher.close()
+
+
+def domains(n):
+    return [f"shop{i}.com" for i in range(n)]
+
+
+def test_per_host_cap_bounds_requests_in_flight(tmp_path):
+    with StubFaviconServer(latency=0.05) as stub:
+        counts = fetch_all(stub, tmp_path, domains(30), concurrency=16, per_host=3)
+    assert counts["downloaded"] == 30
+    assert stub.max_in_flight <= 3
+    # The pool is wider than the cap, so the cap is what limited it
+    assert stub.max_in_flight >= 2
+
+
+def test_refresh_revalidates_with_if_none_match(tmp_path):
+    names = domains(5)
+    with StubFaviconServer(latency=0.0) as stub:
+        assert fetch_all(stub, tmp_path, names)["downloaded"] == 5
+        for d in names:
+            os.utime(favicon_path(str(tmp_path), d), ns=(1, 1))
+        counts = fetch_all(stub, tmp_path, names, refresh=True)
+    assert counts == {"downloaded": 0, "unchanged": 5, "skipped": 0, "failed": 0}
+    assert stub.not_modified == 5
+    # 304 leaves the files alone
+    assert all(os.stat(favicon_path(str(tmp_path), d)).st_mtime_ns == 1 for d in names)
+    meta = load_meta(str(tmp_path))
+    assert all(meta[d]["etag"] for d in names)
+
+
+def test_unchanged_bytes_without_validators_are_not_rewritten(tmp_path):
+    names = domains(4)
+    with StubFaviconServer(latency=0.0, validators=False) as stub:
+        fetch_all(stub, tmp_path, names)
+        for d in names:
+            os.utime(favicon_path(str(tmp_path), d), ns=(1, 1))
+        counts = fetch_all(stub, tmp_path, names, refresh=True)
+        assert counts["unchanged"] == 4
+        assert stub.not_modified == 0
+        assert all(os.stat(favicon_path(str(tmp_path), d)).st_mtime_ns == 1 for d in names)
+
+        # New bytes: the sha256 differs, so the file is replaced
+        stub.revision = "-v2"
+        counts = fetch_all(stub, tmp_path, names, refresh=True)
+    assert counts["downloaded"] == 4
+    with open(favicon_path(str(tmp_path), names[0]), "rb") as f:
+        assert f.read().endswith(b"-v2")
+    assert all(os.stat(favicon_path(str(tmp_path), d)).st_mtime_ns != 1 for d in names)
+
+
+def test_failures_are_counted_and_leave_no_file(tmp_path):
+    names = domains(6)
+    broken = set(names[:2])
+    with StubFaviconServer(latency=0.0, fail_domains=broken) as stub:
+        counts = fetch_all(stub, tmp_path, names)
+        assert counts == {"downloaded": 4, "unchanged": 0, "skipped": 0, "failed": 2}
+        meta = load_meta(str(tmp_path))
+        for d in broken:
+            assert not os.path.exists(favicon_path(str(tmp_path), d))
+            assert d not in meta
+
+        # Without refresh the downloaded icons are skipped and the broken ones retried
+        counts = fetch_all(stub, tmp_path, names)
+    assert counts == {"downloaded": 0, "unchanged": 0, "skipped": 4, "failed": 2}
+
+
+def test_unreachable_server_counts_as_failed(tmp_path):
+    with StubFaviconServer(latency=0.0) as stub:
+        template = stub.url_template
+    fetcher = FaviconFetcher(str(tmp_path), url_template=template, timeout=1)
+    try:
+        counts = fetcher.fetch_all(domains(3))
+    finally:
+        fetcher.close()
+    assert counts["failed"] == 3
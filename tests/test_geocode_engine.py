@@ -0,0 +1,115 @@
+"""GeocodeEngine against the local StubGeocodeServer"""
+
+import pytest
+
+from geocode_cache import GeocodeCache
+from geocode_engine import GeocodeEngine, RateLimit, StubGeocodeServer, geocode_addresses
+
+
+def make_engine(stub, rate=100.0, burst=1, concurrency=4, max_retries=3, backoff=0.01):
+    return GeocodeEngine(base_url=stub.url, limit=RateLimit(rate=rate, burst=burst),
+                         concurrency=concurrency, max_retries=max_retries, backoff=backoff, timeout=5)
+
+
+def geocode(stub, addresses, cache=None, **kwargs):
+    engine = make_engine(stub, **kwargs)
+    try:
+        return geocode_addresses(addresses, cache=cache, engine=engine), engine
+    finally:
+        engine.close()
+
+
+def test_rate_limit_paces_request_starts():
+    addresses = [f"School {i}, Town, ST" for i in range(6)]
+    with StubGeocodeServer(latency=0.0) as stub:
+        results, _ = geocode(stub, addresses, rate=10.0, burst=1, concurrency=4)
+    assert all(r['geocoded'] for r in results.values())
+    gaps = [b - a for a, b in zip(stub.times, stub.times[1:])]
+    # One token per 0.1 s, a little slack for scheduling jitter
+    assert min(gaps) >= 0.08
+    assert stub.times[-1] - stub.times[0] >= 0.45
+
+
+def test_burst_allows_back_to_back_starts():
+    with StubGeocodeServer(latency=0.0) as stub:
+        geocode(stub, ["A, B, ST", "C, D, ST", "E, F, ST"], rate=1.0, burst=3, concurrency=3)
+    assert stub.times[-1] - stub.times[0] < 0.5
+
+
+@pytest.mark.parametrize("status", [429, 500, 502, 503, 504])
+def test_transient_status_is_retried(status):
+    with StubGeocodeServer(latency=0.0, statuses=[status, status]) as stub:
+        results, engine = geocode(stub, ["Retry Tech, Dayton, OH"])
+    assert results["Retry Tech, Dayton, OH"]['geocoded']
+    assert stub.hits == 3
+    assert engine.stats['retries'] == 2
+    assert engine.stats['errors'] == 0
+
+
+def test_backoff_grows_between_attempts():
+    with StubGeocodeServer(latency=0.0, statuses=[503, 503, 503]) as stub:
+        geocode(stub, ["Slow Tech, Akron, OH"], backoff=0.1, max_retries=3)
+    gaps = [b - a for a, b in zip(stub.times, stub.times[1:])]
+    # Jittered exponential backoff: attempt n waits backoff * 2**n * [0.5, 1)
+    assert gaps[0] >= 0.05
+    assert gaps[2] >= 0.2
+    assert gaps[2] > gaps[0]
+
+
+def test_retry_after_header_is_honoured():
+    with StubGeocodeServer(latency=0.0, statuses=[429], retry_after="1") as stub:
+        results, _ = geocode(stub, ["Patient Tech, Erie, PA"], backoff=0.01)
+    assert results["Patient Tech, Erie, PA"]['geocoded']
+    assert stub.times[1] - stub.times[0] >= 0.95
+
+
+def test_exhausted_retries_are_not_cached(tmp_path):
+    with GeocodeCache(str(tmp_path / "geocode.sqlite"), legacy_pickle=None) as cache:
+        with StubGeocodeServer(latency=0.0, statuses=[503] * 3) as stub:
+            results, engine = geocode(stub, ["Down Tech, Flint, MI"], cache=cache, max_retries=2)
+        assert not results["Down Tech, Flint, MI"]['geocoded']
+        assert stub.hits == 3
+        assert engine.stats['errors'] == 1
+        assert cache.get("Down Tech, Flint, MI") is None
+
+
+def test_not_found_is_definitive_and_cached(tmp_path):
+    with GeocodeCache(str(tmp_path / "geocode.sqlite"), legacy_pickle=None) as cache:
+        with StubGeocodeServer(latency=0.0) as stub:
+            results, _ = geocode(stub, ["Nowhere Institute, Nowhere, ZZ"], cache=cache)
+        assert not results["Nowhere Institute, Nowhere, ZZ"]['geocoded']
+        assert cache.get("Nowhere Institute, Nowhere, ZZ") == {
+            'lat': None, 'lon': None, 'display_name': '', 'confidence': 'failed', 'geocoded': False
+        }
+
+
+def test_cached_transport_errors_are_retried(tmp_path):
+    # FallbackGeocoder records transport failures under the same key with confidence 'error'
+    error = {'lat': None, 'lon': None, 'display_name': '', 'confidence': 'error', 'geocoded': False}
+    with GeocodeCache(str(tmp_path / "geocode.sqlite"), legacy_pickle=None) as cache:
+        cache.put("Flaky Tech, Provo, UT", error)
+        with StubGeocodeServer(latency=0.0) as stub:
+            results, _ = geocode(stub, ["Flaky Tech, Provo, UT"], cache=cache)
+        assert stub.hits == 1
+        assert results["Flaky Tech, Provo, UT"]['geocoded']
+        assert cache.get("Flaky Tech, Provo, UT")['geocoded']
+
+
+def test_cache_hits_skip_the_provider(tmp_path):
+    addresses = ["Cached Tech, Macon, GA", "Other Tech, Rome, GA"]
+    with GeocodeCache(str(tmp_path / "geocode.sqlite"), legacy_pickle=None) as cache:
+        with StubGeocodeServer(latency=0.0) as stub:
+            first, _ = geocode(stub, addresses, cache=cache)
+            assert stub.hits == 2
+            # Same addresses, different spelling of one: both answered from the cache
+            second, _ = geocode(stub, ["cached tech,  macon, GA.", "Other Tech, Rome, GA"], cache=cache)
+            assert stub.hits == 2
+    assert second["cached tech,  macon, GA."]['lat'] == first["Cached Tech, Macon, GA"]['lat']
+    assert second["Other Tech, Rome, GA"] == first["Other Tech, Rome, GA"]
+
+
+def test_spellings_of_one_address_share_a_request():
+    with StubGeocodeServer(latency=0.0) as stub:
+        results, _ = geocode(stub, ["Dup Tech, Waco, TX", "dup tech, waco, tx"])
+    assert stub.hits == 1
+    assert results["Dup Tech, Waco, TX"] == results["dup tech, waco, tx"]
@@ -0,0 +1,49 @@
+"""FallbackGeocoder caching against a scripted provider"""
+
+from geocode_cache import GeocodeCache
+from geocode_engine import failed_result
+from geocode_providers import FallbackGeocoder, FallbackStep, GeocodeProvider
+
+
+class ScriptedProvider(GeocodeProvider):
+    """Answers from a list of (result, definitive) pairs, one per call"""
+    name = "nominatim"
+
+    def __init__(self, answers):
+        self.answers = list(answers)
+        self.calls = 0
+
+    def lookup(self, query):
+        self.calls += 1
+        return self.answers.pop(0)
+
+
+HIT = {'lat': 41.5, 'lon': -81.7, 'display_name': 'Hit', 'confidence': 'high', 'geocoded': True}
+STEPS = [FallbackStep("full name", lambda name, city, state: f"{name}, {city}, {state}, USA")]
+
+
+def resolve_twice(tmp_path, answers, **kwargs):
+    provider = ScriptedProvider(answers)
+    with GeocodeCache(str(tmp_path / "geocode.sqlite"), legacy_pickle=None) as cache:
+        first = FallbackGeocoder([provider], cache=cache, steps=STEPS, **kwargs).resolve("Tri-C", "Cleveland", "OH")
+        second = FallbackGeocoder([provider], cache=cache, steps=STEPS, **kwargs).resolve("Tri-C", "Cleveland", "OH")
+    return provider, first, second
+
+
+def test_definitive_miss_is_cached(tmp_path):
+    provider, first, second = resolve_twice(tmp_path, [(failed_result(), True), (HIT, True)])
+    assert first is None and second is None
+    assert provider.calls == 1
+
+
+def test_transport_error_is_retried_by_default(tmp_path):
+    provider, first, second = resolve_twice(tmp_path, [(failed_result(), False), (HIT, True)])
+    assert first is None
+    assert provider.calls == 2
+    assert (second.lat, second.lon) == (41.5, -81.7)
+
+
+def test_transport_error_is_final_when_retry_disabled(tmp_path):
+    provider, _, second = resolve_twice(tmp_path, [(failed_result(), False), (HIT, True)], retry_errors=False)
+    assert second is None
+    assert provider.calls == 1
@@ -0,0 +1,51 @@
+"""Scenario sweeps: the process pool matches the single vectorized pass"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from workforce_scenarios import build_scenario_grid, evaluate_scenarios, run_scenario_sweep
+
+
+SECTORS = ["Manufacturing", "Energy"]
+
+
+@pytest.fixture
+def base():
+    rng = np.random.default_rng(7)
+    states = ["OH", "PA", "TX"]
+    return {
+        "states": states,
+        "sectors": SECTORS,
+        "econ": {
+            "unemployment_rate": rng.uniform(3, 7, len(states)),
+            "job_growth_rate": rng.uniform(-0.5, 3, len(states)),
+            "manufacturing_index": rng.uniform(80, 120, len(states)),
+            "logistics_hub_score": rng.uniform(0.3, 1, len(states)),
+        },
+        "capacity": rng.integers(0, 30, (len(states), 3)),
+        "pair_sector": np.array([0, 0, 1]),
+        "pair_skill": np.array(["Welding", "CAD/CAM Drafting", "HVAC"], dtype=object),
+        "sector_importance": np.array([1.3, 1.3, 1.2]),
+        "demand_multiplier": np.array([1.6, 1.4]),
+        "average_salary": np.array([52000.0, 60000.0]),
+        "training_cost": 15000.0,
+    }
+
+
+def test_pooled_sweep_matches_serial(base):
+    grid = build_scenario_grid(**{
+        "training_cost": [9000, 12000, 15000, 18000],
+        "demand_multiplier.Energy": [1.0, 1.4, 2.0, 3.0],
+        "job_growth_rate.TX": [0.0, 2.5, 5.0],
+    })
+    serial = run_scenario_sweep(base, grid, top_n=4)
+    pooled = run_scenario_sweep(base, grid, top_n=4, workers=2, chunk_size=10)
+    assert len(serial) > len(grid)
+    pd.testing.assert_frame_equal(serial, pooled)
+    pd.testing.assert_frame_equal(serial, evaluate_scenarios(base, grid, top_n=4))
+
+
+def test_unknown_parameters_are_rejected(base):
+    with pytest.raises(ValueError, match="demand_multiplier.Mining"):
+        run_scenario_sweep(base, pd.DataFrame({"demand_multiplier.Mining": [2.0]}))